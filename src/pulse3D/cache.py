@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""Caching of intermediate analysis results that are reused across recordings."""
+from collections import OrderedDict
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from nptyping import NDArray
+import numpy as np
+import structlog
+
+from .constants import DEFAULT_ARRAY_CACHE_MAX_ENTRIES
+from .constants import DEFAULT_WAVEFORM_CACHE_MAX_SIZE
+
+log = structlog.getLogger()
+
+
+def create_cache_key(*parts: Any) -> str:
+    """Create a key for ArrayCache from the given parts.
+
+    Args:
+        parts: values that uniquely identify the cached array. Their str representations are hashed
+
+    Returns:
+        The hex digest of the hash of all the parts
+    """
+    key_hash = hashlib.sha256()
+    for part in parts:
+        key_hash.update(str(part).encode())
+        # separate each part so that ("ab", "c") and ("a", "bc") produce different keys
+        key_hash.update(b"\0")
+    return key_hash.hexdigest()
+
+
+def hash_file_contents(file_objs: Iterable[Any]) -> str:
+    """Create a hash of the contents of the given files.
+
+    Args:
+        file_objs: paths to files or binary file-like objects
+
+    Returns:
+        The hex digest of the hash of the contents of all the files
+    """
+    content_hash = hashlib.sha256()
+    for file_obj in file_objs:
+        if isinstance(file_obj, str):
+            with open(file_obj, "rb") as f:
+                _update_hash_from_file_obj(content_hash, f)
+        else:
+            _update_hash_from_file_obj(content_hash, file_obj)
+    return content_hash.hexdigest()
+
+
+def get_file_stats(file_paths: Iterable[str]) -> List[Tuple[str, int, int]]:
+    """Get the absolute path, size, and modification time of the given files.
+
+    These are much cheaper to get than a hash of the contents of the files, so they can be used to find the
+    cache entries of files which have not been modified since the entries were created.
+
+    Args:
+        file_paths: paths to files
+
+    Returns:
+        The absolute path, size in bytes, and modification time in nanoseconds of each file
+    """
+    file_stats = []
+    for file_path in file_paths:
+        stat_result = os.stat(file_path)
+        file_stats.append((os.path.abspath(file_path), stat_result.st_size, stat_result.st_mtime_ns))
+    return file_stats
+
+
+def _update_hash_from_file_obj(content_hash: Any, file_obj: Any) -> None:
+    original_pos = file_obj.tell()
+    file_obj.seek(0)
+    while chunk := file_obj.read(1024**2):
+        content_hash.update(chunk)
+    file_obj.seek(original_pos)
+
+
+class ArrayCache:
+    """A small in-memory LRU cache of arrays, optionally backed by a dir of .npy files.
+
+    Args:
+        cache_dir: dir to store cached arrays in so they persist across processes. If None, arrays are
+            only cached in memory
+        max_entries: max number of arrays to keep in memory. The least recently used array is removed
+            when this is exceeded. Arrays stored on disk are not removed
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = DEFAULT_ARRAY_CACHE_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("'max_entries' must be >= 1")
+
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or (self.cache_dir is not None and os.path.isfile(self._get_path(key)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[NDArray]:
+        """Get the cached array for the given key, or None if there is no cached array."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        if self.cache_dir is None:
+            return None
+
+        try:
+            arr = np.load(self._get_path(key), allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.exception(f"Unable to load cached array {key}")
+            return None
+
+        self._add_to_memory(key, arr)
+        return arr
+
+    def set(self, key: str, arr: NDArray) -> None:
+        """Cache a copy of the given array under the given key."""
+        arr = np.array(arr)
+        self._add_to_memory(key, arr)
+
+        if self.cache_dir is None:
+            return
+
+        # write to a temp file first so that other processes never load a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, arr, allow_pickle=False)
+            os.replace(tmp_path, self._get_path(key))
+        except Exception:
+            log.exception(f"Unable to store cached array {key}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _add_to_memory(self, key: str, arr: NDArray) -> None:
+        self._entries[key] = arr
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")  # type: ignore
+
+
+class WaveformCache:
+    """A size-bounded on-disk cache of sets of arrays, such as the processed waveforms of a recording.
+
+    Each entry is stored as a dir of .npy files which are memory-mapped when loaded. Once the total size
+    of all entries exceeds `max_size`, the least recently used entries are removed.
+
+    Aliases can be pointed at keys so that an entry can also be found by a key which is cheaper to create,
+    such as one created from the stats of the input files instead of their contents.
+
+    Args:
+        cache_dir: dir to store the entries in. Can be shared by multiple processes
+        max_size: max total size in bytes of all entries
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_WAVEFORM_CACHE_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("'max_size' must be >= 1")
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isdir(self._get_path(key))
+
+    def get(self, key: str) -> Optional[Dict[str, NDArray]]:
+        """Get the cached arrays for the given key, or None if there is no entry for it.
+
+        The arrays are memory-mapped copy-on-write, so modifying them will not modify the cached entry.
+        """
+        entry_path = self._get_path(key)
+        try:
+            arrays = {
+                os.path.splitext(file_name)[0]: np.load(
+                    os.path.join(entry_path, file_name), mmap_mode="c", allow_pickle=False
+                )
+                for file_name in os.listdir(entry_path)
+            }
+            # mark this entry as most recently used
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.exception(f"Unable to load cached entry {key}")
+            return None
+
+        return arrays
+
+    def get_alias(self, alias: str) -> Optional[str]:
+        """Get the key the given alias points to, or None if there is no such alias."""
+        try:
+            with open(self._get_alias_path(alias)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set_alias(self, alias: str, key: str) -> None:
+        """Point the given alias at the given key."""
+        # write to a temp file first so that other processes never read a partially written alias
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".alias.tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(key)
+            os.replace(tmp_path, self._get_alias_path(alias))
+        except Exception:
+            log.exception(f"Unable to store cache alias {alias}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def set(self, key: str, arrays: Dict[str, NDArray]) -> None:
+        """Store the given arrays under the given key, then remove old entries if the cache is too large."""
+        if key in self:
+            # another process already stored this entry
+            return
+
+        # write to a temp dir first so that other processes never load a partially written entry
+        tmp_entry_path = tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp_entry_path, f"{name}.npy"), arr, allow_pickle=False)
+            os.rename(tmp_entry_path, self._get_path(key))
+        except Exception:
+            log.exception(f"Unable to store cached entry {key}")
+            shutil.rmtree(tmp_entry_path, ignore_errors=True)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry_name in os.listdir(self.cache_dir):
+            entry_path = os.path.join(self.cache_dir, entry_name)
+            if entry_name.endswith(".tmp") or not os.path.isdir(entry_path):
+                continue
+            try:
+                entry_size = sum(
+                    os.path.getsize(os.path.join(entry_path, file_name))
+                    for file_name in os.listdir(entry_path)
+                )
+                entries.append((os.path.getmtime(entry_path), entry_size, entry_path))
+            except FileNotFoundError:
+                # another process removed this entry
+                continue
+
+        total_size = sum(entry_size for _, entry_size, _ in entries)
+        # remove least recently used entries first
+        for _, entry_size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            log.info(f"Removing cached entry {os.path.basename(entry_path)}")
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= entry_size
+
+        # remove the aliases of the entries that were removed
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(".alias"):
+                alias = os.path.splitext(file_name)[0]
+                if (key := self.get_alias(alias)) is not None and key not in self:
+                    try:
+                        os.remove(self._get_alias_path(alias))
+                    except FileNotFoundError:
+                        # another process removed this alias
+                        continue
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _get_alias_path(self, alias: str) -> str:
+        return os.path.join(self.cache_dir, f"{alias}.alias")
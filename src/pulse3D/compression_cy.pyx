@@ -5,6 +5,9 @@
 """Compressions arrays of Mantarray magnetic data ."""
 from typing import Any
 
+cimport cython
+from libc.math cimport fabs
+from libc.math cimport sqrt
 from libc.stdint cimport int64_t
 from nptyping import NDArray
 import numpy as np
@@ -12,6 +15,23 @@ cimport numpy as np
 np.import_array()
 
 cdef float R_SQUARE_CUTOFF = 0.94
+# unit roundoff of single and double precision
+cdef double FLOAT_EPSILON = 2.0 ** -24
+cdef double DOUBLE_EPSILON = 2.0 ** -53
+
+
+cdef struct RunningSums:
+    # sums of the offsets of each point from the first point of the subset
+    int64_t num_values
+    double x
+    double y
+    double xx
+    double xy
+    double yy
+    # magnitudes of the original values, which bound the rounding error of the single precision calculation
+    double max_abs_x
+    double max_abs_y
+
 
 cpdef float rsquared(int64_t[:] x_values, int64_t[:] y_values):
     """Return R^2 where x and y are array-like.
@@ -23,29 +43,41 @@ cpdef float rsquared(int64_t[:] x_values, int64_t[:] y_values):
     Returns:
         the R^2 value of the given dataset
     """
+    if x_values[-1] == x_values[0]:
+        raise ZeroDivisionError("float division")
+    return _rsquared_of_range(x_values, y_values, 0, y_values.shape[0])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef float _rsquared_of_range(
+    const int64_t[:] x_values, const int64_t[:] y_values, Py_ssize_t start_idx, Py_ssize_t stop_idx
+) noexcept nogil:
     cdef int64_t x_0, x_1, y_0, y_1
     cdef float slope, intercept, ss_res, ss_tot, y_bar
 
 
-    x_0 = x_values[0]
-    x_1 = x_values[-1]
-    y_0 = y_values[0]
-    y_1 = y_values[-1]
-    slope = (y_1 - y_0) / (x_1 - x_0)
+    x_0 = x_values[start_idx]
+    x_1 = x_values[stop_idx - 1]
+    y_0 = y_values[start_idx]
+    y_1 = y_values[stop_idx - 1]
+    # cast before dividing so this is the same true division rsquared has always used, even with cdivision
+    slope = <double>(y_1 - y_0) / <double>(x_1 - x_0)
     intercept = -slope * x_1 + y_1
 
     # based on https://stackoverflow.com/questions/893657/how-do-i-calculate-r-squared-using-python-and-numpy
     cdef int64_t y_sum, num_values, i
     y_sum=0
-    num_values=y_values.shape[0]
+    num_values=stop_idx - start_idx
     ss_res=0
-    for i in range(num_values):
+    for i in range(start_idx, stop_idx):
         y_sum += y_values[i]
         ss_res += (x_values[i] * slope + intercept - y_values[i]) ** 2
-    y_bar = y_sum / num_values
+    y_bar = <double>y_sum / <double>num_values
 
     ss_tot = 0
-    for i in range(num_values):
+    for i in range(start_idx, stop_idx):
         ss_tot += (y_values[i] - y_bar) ** 2
 
     if ss_tot == 0:  # Tanner (8/31/20): If a flat, horizontal line is passed to this function, ss_tot will equal 0, so we must handle this edge case to avoid Div By Zero Errors
@@ -53,9 +85,126 @@ cpdef float rsquared(int64_t[:] x_values, int64_t[:] y_values):
     return 1 - ss_res / ss_tot
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline void _add_to_running_sums(
+    RunningSums* sums,
+    const int64_t[:] x_values,
+    const int64_t[:] y_values,
+    Py_ssize_t start_idx,
+    Py_ssize_t idx,
+) noexcept nogil:
+    cdef double dx = x_values[idx] - x_values[start_idx]
+    cdef double dy = y_values[idx] - y_values[start_idx]
+    sums.num_values += 1
+    sums.x += dx
+    sums.y += dy
+    sums.xx += dx * dx
+    sums.xy += dx * dy
+    sums.yy += dy * dy
+    sums.max_abs_x = max(sums.max_abs_x, fabs(<double>x_values[idx]))
+    sums.max_abs_y = max(sums.max_abs_y, fabs(<double>y_values[idx]))
+
+
+cdef inline double _sum_of_squares_error_bound(
+    double sum_of_squares, double term_error, int64_t num_values
+) noexcept nogil:
+    """Bound how far a single precision sum of squared terms can be from the exact sum.
+
+    Each term may be off by up to `term_error` before it is squared, and every squaring and addition rounds.
+    """
+    cdef double accumulation_factor = (num_values + 1) * FLOAT_EPSILON
+    cdef double squared_term_error = 2 * term_error * sqrt(num_values * sum_of_squares) + (
+        num_values * term_error * term_error
+    )
+    return (1 + accumulation_factor) * squared_term_error + accumulation_factor * sum_of_squares
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef bint _is_above_cutoff(
+    RunningSums* sums,
+    const int64_t[:] x_values,
+    const int64_t[:] y_values,
+    Py_ssize_t start_idx,
+    Py_ssize_t stop_idx,
+) noexcept nogil:
+    """Check if the R^2 of the subset is above the cutoff using its running sums where possible.
+
+    The residuals are taken from the line between the first and last points of the subset, same as rsquared.
+    The R^2 from the running sums is only used if it is far enough from the cutoff that the rounding error of
+    the single precision calculation in rsquared could not put it on the other side. Otherwise the R^2 is
+    recalculated exactly the way rsquared does, so the result always matches rsquared. The first and last
+    points of the subset must not have the same timepoint.
+    """
+    # flat, horizontal line. The squares of integer offsets can only sum to 0 if every offset is 0, and
+    # rsquared always calculates a sum of squares of exactly 0 in this case too
+    if sums.yy == 0:
+        return 1.0 > R_SQUARE_CUTOFF
+
+    cdef int64_t num_values = sums.num_values
+    cdef double x_1 = <double>x_values[stop_idx - 1]
+    cdef double y_1 = <double>y_values[stop_idx - 1]
+    cdef double slope = <double>(y_values[stop_idx - 1] - y_values[start_idx]) / <double>(
+        x_values[stop_idx - 1] - x_values[start_idx]
+    )
+    cdef double abs_slope = fabs(slope)
+
+    # the line passes through the first point, which is the origin of the offsets
+    cdef double ss_res = max(slope * slope * sums.xx - 2 * slope * sums.xy + sums.yy, 0.0)
+    cdef double ss_tot = sums.yy - sums.y * sums.y / <double>num_values
+
+    # error of the running sums. The sums of products of the offsets accumulate a relative error
+    cdef double estimate_factor = (num_values + 4) * DOUBLE_EPSILON
+    cdef double ss_res_error = estimate_factor * (
+        slope * slope * sums.xx + 2 * abs_slope * sqrt(sums.xx * sums.yy) + sums.yy
+    )
+    cdef double ss_tot_error = estimate_factor * (sums.yy + sums.y * sums.y / <double>num_values)
+
+    # error of rsquared, which converts the values to single precision and rounds each operation. Each
+    # residual and each deviation from the mean is off by at most a few roundings of the largest value in it
+    cdef double residual_error = 10 * FLOAT_EPSILON * (
+        sums.max_abs_x * abs_slope + fabs(y_1 - slope * x_1) + sums.max_abs_y
+    )
+    cdef double deviation_error = 4 * FLOAT_EPSILON * sums.max_abs_y
+    ss_res_error += _sum_of_squares_error_bound(ss_res, residual_error, num_values)
+    ss_tot_error += _sum_of_squares_error_bound(max(ss_tot, 0.0), deviation_error, num_values)
+
+    cdef double ss_ratio, r_squared_error
+    if ss_tot - ss_tot_error > 0:
+        ss_ratio = ss_res / ss_tot
+        r_squared_error = (ss_res_error + ss_ratio * ss_tot_error) / (ss_tot - ss_tot_error) + (
+            4 * FLOAT_EPSILON * (ss_ratio + 1)
+        )
+        # the bound is doubled to leave room for the error of the bound itself
+        if fabs(1 - ss_ratio - R_SQUARE_CUTOFF) > 2 * r_squared_error:
+            return 1 - ss_ratio > R_SQUARE_CUTOFF
+
+    return _rsquared_of_range(x_values, y_values, start_idx, stop_idx) > R_SQUARE_CUTOFF
+
+
+cdef bint _is_above_cutoff_with_duplicate_timepoints(
+    int64_t[:, :] data_view, Py_ssize_t start_idx, Py_ssize_t stop_idx
+):
+    """Check a subset whose first and last points have the same timepoint with rsquared, as it always was.
+
+    The slope of the subset cannot be calculated, so the ZeroDivisionError is left to rsquared. When compiled
+    with Cython 0.29, rsquared reports it as an unraisable exception and returns 0, so the subset is never
+    above the cutoff. Otherwise, the error propagates.
+    """
+    return rsquared(data_view[0, start_idx:stop_idx], data_view[1, start_idx:stop_idx]) > R_SQUARE_CUTOFF
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
 def compress_filtered_magnetic_data(data: NDArray[(2, Any), int]) -> NDArray[(2, Any), int]:
     """Compress the data to allow for better plotting in the desktop app.
 
+    Each subset of points is grown one point at a time. The R^2 of the subset is updated from running sums
+    in constant time per point, so this runs in linear time. The GIL is released while compressing so that
+    multiple wells can be compressed in parallel threads.
+
     Args:
         data: a 2D array of magnetic data after noise filtering
 
@@ -64,41 +213,68 @@ def compress_filtered_magnetic_data(data: NDArray[(2, Any), int]) -> NDArray[(2,
     """
     # split time and magnetic readings into individual arrays
     cdef int64_t[:, :] data_view = data.astype(np.int64)
-    cdef int time_len = len(data_view[0])
+    cdef const int64_t[:] time_view = data_view[0]
+    cdef const int64_t[:] magnetic_view = data_view[1]
+    cdef Py_ssize_t time_len = len(data_view[0])
 
     # create a boolean array of indicies that will be kept
     what_to_keep = np.array([True] * time_len, dtype=bool)
     cdef np.uint8_t[:] what_to_keep_view = np.frombuffer(what_to_keep, dtype=np.uint8)
 
     # loop through values in time and filtered_magnetic to determine what to compress
-    cdef int left_idx, right_idx
-    cdef int64_t[:, :] subset
+    cdef Py_ssize_t left_idx, right_idx, idx
+    cdef RunningSums sums
+    cdef bint is_above_cutoff
 
-    left_idx = 0
-    while left_idx < time_len - 2:
-        right_idx = left_idx + 3  # create an initial subset of length 3
+    with nogil:
+        left_idx = 0
+        while left_idx < time_len - 2:
+            right_idx = left_idx + 3  # create an initial subset of length 3
 
-        subset = data_view[:, left_idx:right_idx]
+            sums.num_values = 0
+            sums.x = 0
+            sums.y = 0
+            sums.xx = 0
+            sums.xy = 0
+            sums.yy = 0
+            sums.max_abs_x = 0
+            sums.max_abs_y = 0
+            for idx in range(left_idx, right_idx):
+                _add_to_running_sums(&sums, time_view, magnetic_view, left_idx, idx)
 
-        # calculate r_squared value of the initial length 3 subset
-        r_squared = rsquared(subset[0], subset[1])
+            # check the r_squared value of the initial length 3 subset
+            if time_view[right_idx - 1] == time_view[left_idx]:
+                with gil:
+                    is_above_cutoff = _is_above_cutoff_with_duplicate_timepoints(
+                        data_view, left_idx, right_idx
+                    )
+            else:
+                is_above_cutoff = _is_above_cutoff(&sums, time_view, magnetic_view, left_idx, right_idx)
 
-        if r_squared > R_SQUARE_CUTOFF:
-            while r_squared > R_SQUARE_CUTOFF and right_idx < time_len:
-                what_to_keep_view[right_idx - 2] = False
-                # add another point into the subset
-                right_idx += 1
-                subset = data_view[:, left_idx:right_idx]
+            if is_above_cutoff:
+                while is_above_cutoff and right_idx < time_len:
+                    what_to_keep_view[right_idx - 2] = False
+                    # add another point into the subset
+                    _add_to_running_sums(&sums, time_view, magnetic_view, left_idx, right_idx)
+                    right_idx += 1
 
-                # re-calculate the new r_squared
-                r_squared = rsquared(subset[0], subset[1])
-            if r_squared > R_SQUARE_CUTOFF and right_idx == time_len:
-                what_to_keep_view[right_idx - 2] = False
+                    # re-check the new r_squared
+                    if time_view[right_idx - 1] == time_view[left_idx]:
+                        with gil:
+                            is_above_cutoff = _is_above_cutoff_with_duplicate_timepoints(
+                                data_view, left_idx, right_idx
+                            )
+                    else:
+                        is_above_cutoff = _is_above_cutoff(
+                            &sums, time_view, magnetic_view, left_idx, right_idx
+                        )
+                if is_above_cutoff and right_idx == time_len:
+                    what_to_keep_view[right_idx - 2] = False
 
-            left_idx = right_idx - 1
+                left_idx = right_idx - 1
 
-        else:
-            left_idx += 1
+            else:
+                left_idx += 1
 
     return np.array([np.compress(what_to_keep, data_view[0]), np.compress(what_to_keep, data_view[1])], np.int64)
 
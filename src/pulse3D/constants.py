@@ -155,6 +155,12 @@ MILLI_TO_BASE_CONVERSION = int(1e3)
 CENTIMILLISECONDS_PER_SECOND = int(1e5)
 MICRO_TO_BASE_CONVERSION = int(1e6)
 MICROSECONDS_PER_CENTIMILLISECOND = 10
+# number of samples in each bucket of the most detailed level of a min/max waveform pyramid
+MIN_PYRAMID_BUCKET_NUM_SAMPLES = 16
+# levels are added to a min/max waveform pyramid until one has at most this many buckets
+MAX_PYRAMID_TOP_LEVEL_NUM_BUCKETS = 2048
+# number of microseconds in each unit a TimeAxis can be in
+TIME_UNIT_TO_MICROSECONDS = immutabledict({"us": 1, "s": MICRO_TO_BASE_CONVERSION})
 
 
 TISSUE_SENSOR_READINGS = "tissue_sensor_readings"
@@ -312,6 +318,12 @@ INTERPOLATED_DATA_PERIOD_US = int(INTERPOLATED_DATA_PERIOD_SECONDS * MICRO_TO_BA
 # Tissue Sampling Period (µs) to default Pipeline Filter UUID
 TSP_TO_DEFAULT_FILTER_UUID = {9600: BESSEL_LOWPASS_10_UUID, 1600: BUTTERWORTH_LOWPASS_30_UUID}
 
+# number of samples kept from each block when noise filtering a long recording one block at a time
+DEFAULT_NOISE_FILTER_BLOCK_NUM_SAMPLES = 100000
+# each block is filtered with this many samples of the surrounding data on each side, which is long enough for
+# the impulse response of every noise filter to have decayed
+NOISE_FILTER_BLOCK_OVERLAP_NUM_SAMPLES = 1000
+
 DEFAULT_CELL_WIDTH = 64
 DEFAULT_CELL_HEIGHT = 20
 
@@ -417,5 +429,63 @@ EXCEL_OPTICAL_METADATA_CELLS = immutabledict(
 BASELINE_MEAN_NUM_DATA_POINTS = 10 * 100
 
 
+# worker pool types that can be used to load files / process wells in parallel
+EXECUTOR_TYPES = ("thread", "process")
+
+# how much of the Beta 1 transform chain a WellFile keeps in memory. "lean" only keeps the displacement and
+# force data and computes the other arrays when they are accessed. "full" keeps every array of the chain
+BETA_1_RETENTION_POLICIES = ("lean", "full")
+# arrays of the Beta 1 transform chain, other than the displacement and force, in the order they are computed
+BETA_1_DATA_NAMES = (
+    "raw_tissue_magnetic_data",
+    "raw_reference_magnetic_data",
+    "sensitivity_calibrated_tissue_gmr",
+    "sensitivity_calibrated_reference_gmr",
+    "noise_cancelled_magnetic_data",
+    "fully_calibrated_magnetic_data",
+    "noise_filtered_magnetic_data",
+    "compressed_magnetic_data",
+    "compressed_voltage",
+    "compressed_displacement",
+    "compressed_force",
+    "voltage",
+)
+
+# H5 files in zipped recordings larger than this (in bytes) will be extracted to disk instead of loaded into memory
+DEFAULT_MAX_IN_MEMORY_ZIP_MEMBER_SIZE = 256 * 1024**2
+
+# max number of arrays an ArrayCache will keep in memory
+DEFAULT_ARRAY_CACHE_MAX_ENTRIES = 32
+
+# max total size in bytes of all entries in a WaveformCache
+DEFAULT_WAVEFORM_CACHE_MAX_SIZE = 5 * 1024**3
+
+# when solving magnet positions in chunks, each chunk starts this many samples early so the solver can settle
+# onto the trajectory of the magnets before the samples that are kept
+MAGNET_FINDING_CHUNK_WARMUP_NUM_SAMPLES = 2 * 100
+# the end of each chunk is blended into the start of the next chunk over this many samples
+MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES = 1 * 100
+# chunks will not be made smaller than this many samples
+MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES = 60 * 100
+# rough upper bound of the memory in bytes used by the solver per sample of a chunk
+MAGNET_FINDING_MEMORY_PER_SAMPLE = 16 * 1024
+
+# the anti-aliasing filter applied before decimating plate data is a Butterworth low-pass filter of this
+# order, with its cutoff at this fraction of the Nyquist frequency after decimation. A Butterworth filter is
+# used since it has no passband ripple, which zero-phase filtering would double
+DECIMATION_FILTER_ORDER = 8
+DECIMATION_FILTER_CUTOFF_FRACTION = 0.8
+
+# max number of values filtered at once when filtering the inputs or outputs of magnet finding. The channels
+# (or wells) are filtered in blocks of this size so that the temporary arrays used by the filter stay small
+MAGNET_FINDING_FILTER_BLOCK_NUM_VALUES = 2**20
+
+# number of samples of the plate data processed at once when streaming the ingest of V1 recordings
+DEFAULT_INGEST_CHUNK_NUM_SAMPLES = 10 * 60 * 100
+# when streaming the ingest, each chunk is filtered with this many samples of the surrounding data on each side
+# so that the result matches filtering the whole recording at once
+INGEST_CHUNK_OVERLAP_NUM_SAMPLES = 5 * 100
+
+
 MIN_FILE_VERSION_FOR_STIM_INTERPOLATION = "1.3.0"
 STIM_COMPLETE_SUBPROTOCOL_IDX = 255
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import datetime
+from itertools import repeat
 import json
 import math
 import os
@@ -13,9 +14,9 @@ from typing import Tuple
 from typing import Union
 
 from labware_domain_models import get_row_and_column_from_well_name
+from nptyping import NDArray
 import numpy as np
 import pandas as pd
-from scipy import interpolate
 import structlog
 
 from .constants import *
@@ -31,9 +32,11 @@ from .plotting import plotting_parameters
 from .stimulation import aggregate_timepoints
 from .stimulation import realign_interpolated_stim_data
 from .transforms import get_time_window_indices
+from .transforms import resample_plate_data
 from .utils import get_experiment_id
 from .utils import get_stiffness_label
-from .utils import truncate
+from .utils import map_with_workers
+from .utils import TimeAxis
 from .utils import truncate_float
 from .utils import xl_col_to_name
 
@@ -226,6 +229,7 @@ def write_xlsx(
     include_stim_protocols: bool = False,
     stim_waveform_format: Optional[Union[Literal["stacked"], Literal["overlayed"]]] = None,
     data_type: Optional[str] = None,
+    analysis_workers: Optional[int] = None,
 ):
     """Write plate recording waveform and computed metrics to Excel spredsheet.
 
@@ -242,6 +246,8 @@ def write_xlsx(
         peaks_valleys: User-defined peaks and valleys to use instead of peak detection results
         include_stim_protocols: Toggles the addition of stimulation-protocols sheet in the output excel
         stim_waveform_format: Toggles the output format of the stim waveforms if provided, o/w no waveforms are displayed
+        analysis_workers: number of processes to find peaks and compute metrics of the wells with.
+            If None or 1, wells are analyzed one at a time
     Raises:
         NotImplementedError: if peak finding algorithm fails for unexpected reason
         ValueError: if start and end times are outside of expected bounds, or do not ?
@@ -276,7 +282,7 @@ def write_xlsx(
     # get max and min of final timepoints across each well
     raw_timepoints = [w.force[0, -1] for w in plate_recording if w]
     max_final_time_us = max(raw_timepoints)
-    interpolated_timepoints_us = np.arange(0, max_final_time_us, interpolated_data_period_us)
+    interpolated_time_axis = TimeAxis.from_range(0, max_final_time_us, interpolated_data_period_us)
 
     max_final_time_secs = max_final_time_us / MICRO_TO_BASE_CONVERSION
     # produce min final time truncated to 1 decimal place
@@ -392,47 +398,35 @@ def write_xlsx(
     log.info("Computing data metrics for each well.")
 
     recording_plotting_info = []
-    max_force_of_recording = 0
-    for well_index, well_file in enumerate(plate_recording):
-        # initialize some data structures
-        error_msg = None
+    # find bounding indices of specified start/end windows
+    window_start_idx, window_end_idx = interpolated_time_axis.get_window_bounds(
+        start_time, end_time, unit="s"
+    )
 
-        # necessary for concatenating DFs together, in event that peak-finding fails and produces empty DF
-        dfs = init_dfs(twitch_widths_range=twitch_widths)
-        metrics = tuple(
-            concat([dfs[k][j] for j in dfs[k].keys()], axis=1) for k in ("per_twitch", "aggregate")
-        )
-        peaks_and_valleys = (np.array([]), np.array([]))
+    # interpolate all wells at once, only within the analysis window
+    interpolated_plate_force, well_bounds = resample_plate_data(
+        [well_file.force for well_file in plate_recording],
+        interpolated_time_axis,
+        window=(window_start_idx, window_end_idx),
+    )
 
+    # window, normalize, and scale the data of each well so that only the analysis is left for the workers
+    well_indices = []
+    well_files = []
+    interpolated_well_data_list = []
+    max_force_of_recording = 0
+    for well_index, well_file in enumerate(plate_recording):
         if well_file is None:
             continue
 
-        well_name = well_file[WELL_NAME_UUID]
-
-        # find bounding indices with respect to well recording
-        well_start_idx, well_end_idx = truncate(
-            source_series=interpolated_timepoints_us,
-            lower_bound=well_file.force[0][0],
-            upper_bound=well_file.force[0][-1],
-        )
-
-        # find bounding indices of specified start/end windows
-        window_start_idx, window_end_idx = truncate(
-            source_series=interpolated_timepoints_us / MICRO_TO_BASE_CONVERSION,
-            lower_bound=start_time,
-            upper_bound=end_time,
-        )
-
-        start_idx = max(window_start_idx, well_start_idx)
-        end_idx = min(window_end_idx, well_end_idx)
+        # find bounding indices with respect to well recording, these are already limited to the window
+        start_idx, end_idx = well_bounds[well_index]
 
-        # TODO make this a function?
-        # fit interpolation function on recorded data
-        interp_data_fn = interpolate.interp1d(*well_file.force)
-        # window, interpolate, normalize, and scale data
-        windowed_timepoints_us = interpolated_timepoints_us[start_idx:end_idx]
-        interpolated_force = interp_data_fn(windowed_timepoints_us)
-        interpolated_force = interpolated_force - min(interpolated_force)
+        # window, normalize, and scale data. The interpolated data only covers the window
+        num_samples = max(end_idx - start_idx, 0)
+        windowed_timepoints_us = interpolated_time_axis[start_idx : start_idx + num_samples]
+        interpolated_force = interpolated_plate_force[well_index, start_idx - window_start_idx :][:num_samples]
+        interpolated_force = interpolated_force - interpolated_force.min()
         if not plate_recording.is_optical_recording:
             interpolated_force *= MICRO_TO_BASE_CONVERSION
         interpolated_well_data = np.row_stack([windowed_timepoints_us, interpolated_force])
@@ -441,52 +435,39 @@ def write_xlsx(
         max_force_of_well = max(interpolated_well_data[1])
         max_force_of_recording = max(max_force_of_recording, max_force_of_well)
 
-        try:
-            # compute peaks / valleys on interpolated well data
-            log.info(f"Finding peaks and valleys for well {well_name}")
-
-            if peaks_valleys is None:
-                log.info("No user defined peaks and valleys were found, so finding peaks now")
-
-                # noise based peak finding requires the time values to be in seconds
-                well_data_for_peak_finding = np.array(
-                    [interpolated_well_data[0] / MICRO_TO_BASE_CONVERSION, interpolated_well_data[1]]
-                )
-
-                peaks_and_valleys = noise_based_peak_finding(
-                    well_data_for_peak_finding,
-                    noise_prominence_factor=noise_prominence_factor,
-                    relative_prominence_factor=relative_prominence_factor,
-                    width_factors=width_factors,
-                    height_factor=height_factor,
-                    max_frequency=max_frequency,
-                    valley_search_duration=valley_search_duration,
-                    upslope_duration=upslope_duration,
-                    upslope_noise_allowance_duration=upslope_noise_allowance_duration,
-                )
-            else:
-                # convert peak and valley lists into a format compatible with find_twitch_indices
-                peaks, valleys = [np.array(peaks_or_valleys) for peaks_or_valleys in peaks_valleys[well_name]]
-                # get correct indices specific to windowed start and end
-                peaks_and_valleys = get_windowed_peaks_valleys(
-                    window_start_idx, window_end_idx, peaks, valleys
-                )
-
-            # compute metrics on interpolated well data
-            log.info(f"Calculating metrics for well {well_name}")
-            metrics = data_metrics(
-                peaks_and_valleys,
-                interpolated_well_data,
-                twitch_width_percents=twitch_widths,
-                baseline_widths_to_use=baseline_widths_to_use,
-            )
+        well_indices.append(well_index)
+        well_files.append(well_file)
+        interpolated_well_data_list.append(interpolated_well_data)
+
+    well_names = [well_file[WELL_NAME_UUID] for well_file in well_files]
+    peak_finding_kwargs = {
+        "noise_prominence_factor": noise_prominence_factor,
+        "relative_prominence_factor": relative_prominence_factor,
+        "width_factors": width_factors,
+        "height_factor": height_factor,
+        "max_frequency": max_frequency,
+        "valley_search_duration": valley_search_duration,
+        "upslope_duration": upslope_duration,
+        "upslope_noise_allowance_duration": upslope_noise_allowance_duration,
+    }
+    well_analysis_results = map_with_workers(
+        _analyze_well,
+        well_names,
+        interpolated_well_data_list,
+        [None if peaks_valleys is None else peaks_valleys[well_name] for well_name in well_names],
+        repeat((window_start_idx, window_end_idx)),
+        repeat(peak_finding_kwargs),
+        repeat(twitch_widths),
+        repeat(baseline_widths_to_use),
+        num_workers=analysis_workers,
+        executor_type="process",
+    )
 
-        except TwoPeaksInARowError:
-            error_msg = "Error: Two Contractions in a Row Detected"
-        except TwoValleysInARowError:
-            error_msg = "Error: Two Relaxations in a Row Detected"
-        except TooFewPeaksDetectedError:
-            error_msg = "Not Enough Twitches Detected"
+    # results are returned in the same order as the wells were given, so they are merged in well order
+    for well_index, well_file, well_name, interpolated_well_data, analysis_result in zip(
+        well_indices, well_files, well_names, interpolated_well_data_list, well_analysis_results
+    ):
+        peaks_and_valleys, metrics, error_msg = analysis_result
 
         # the rest of the code will expect time to be in seconds, so convert here
         interpolated_well_data[0] /= MICRO_TO_BASE_CONVERSION
@@ -550,6 +531,78 @@ def write_xlsx(
     return output_file_path
 
 
+def _analyze_well(
+    well_name: str,
+    interpolated_well_data: NDArray[(2, Any), float],
+    well_peaks_valleys: Optional[List[List[int]]],
+    window_bounds: Tuple[int, int],
+    peak_finding_kwargs: Dict[str, Any],
+    twitch_widths: Tuple[int, ...],
+    baseline_widths_to_use: Tuple[int, ...],
+) -> Tuple[Tuple[NDArray[int], NDArray[int]], Tuple[pd.DataFrame, pd.DataFrame], Optional[str]]:
+    """Find the peaks and valleys of a single well and compute its metrics.
+
+    This is the CPU bound part of the analysis of each well, so it only takes the data of the one well and
+    returns plain results that can be sent back from a worker process.
+
+    Args:
+        well_name: the name of the well, only used for logging
+        interpolated_well_data: the windowed, interpolated time (µs) and force data of the well
+        well_peaks_valleys: user-defined peaks and valleys of the well to use instead of peak detection
+        window_bounds: the start and end indices of the analysis window in the interpolated data of the plate
+        peak_finding_kwargs: the params to pass to noise_based_peak_finding
+        twitch_widths: the twitch widths to compute metrics for
+        baseline_widths_to_use: twitch widths to use as baseline metrics
+
+    Returns:
+        The peaks and valleys, the per twitch and aggregate metrics, and the message to display in place of
+        the metrics if peak finding failed
+    """
+    error_msg = None
+
+    # necessary for concatenating DFs together, in event that peak-finding fails and produces empty DF
+    dfs = init_dfs(twitch_widths_range=twitch_widths)
+    metrics = tuple(concat([dfs[k][j] for j in dfs[k].keys()], axis=1) for k in ("per_twitch", "aggregate"))
+    peaks_and_valleys = (np.array([]), np.array([]))
+
+    try:
+        # compute peaks / valleys on interpolated well data
+        log.info(f"Finding peaks and valleys for well {well_name}")
+
+        if well_peaks_valleys is None:
+            log.info("No user defined peaks and valleys were found, so finding peaks now")
+
+            # noise based peak finding requires the time values to be in seconds
+            well_data_for_peak_finding = np.array(
+                [interpolated_well_data[0] / MICRO_TO_BASE_CONVERSION, interpolated_well_data[1]]
+            )
+
+            peaks_and_valleys = noise_based_peak_finding(well_data_for_peak_finding, **peak_finding_kwargs)
+        else:
+            # convert peak and valley lists into a format compatible with find_twitch_indices
+            peaks, valleys = [np.array(peaks_or_valleys) for peaks_or_valleys in well_peaks_valleys]
+            # get correct indices specific to windowed start and end
+            peaks_and_valleys = get_windowed_peaks_valleys(*window_bounds, peaks, valleys)
+
+        # compute metrics on interpolated well data
+        log.info(f"Calculating metrics for well {well_name}")
+        metrics = data_metrics(
+            peaks_and_valleys,
+            interpolated_well_data,
+            twitch_width_percents=twitch_widths,
+            baseline_widths_to_use=baseline_widths_to_use,
+        )
+
+    except TwoPeaksInARowError:
+        error_msg = "Error: Two Contractions in a Row Detected"
+    except TwoValleysInARowError:
+        error_msg = "Error: Two Relaxations in a Row Detected"
+    except TooFewPeaksDetectedError:
+        error_msg = "Not Enough Twitches Detected"
+
+    return peaks_and_valleys, metrics, error_msg
+
+
 def _create_stim_protocols_df(plate_recording):
     unassigned_wells = []
     stim_protocols_dict = {
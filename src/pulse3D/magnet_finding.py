@@ -1,95 +1,518 @@
 # -*- coding: utf-8 -*-
 """More accurate estimation of magnet positions."""
+from contextlib import contextmanager
+from itertools import repeat
+import math
+import os
+import sys
+import time
+import tracemalloc
 from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import TYPE_CHECKING
 from typing import Union
 
 from mantarray_magnet_finding.magnet_finding import get_positions
+from mantarray_magnet_finding.utils import calculate_magnetic_flux_density_from_memsic
 from nptyping import NDArray
 import numpy as np
 import scipy.signal as signal
+import structlog
 
+from .constants import DEFAULT_INGEST_CHUNK_NUM_SAMPLES
+from .constants import INGEST_CHUNK_OVERLAP_NUM_SAMPLES
+from .constants import MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES
+from .constants import MAGNET_FINDING_CHUNK_WARMUP_NUM_SAMPLES
+from .constants import MAGNET_FINDING_FILTER_BLOCK_NUM_VALUES
+from .constants import MAGNET_FINDING_MEMORY_PER_SAMPLE
+from .constants import MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES
 from .constants import NUM_CHANNELS_24_WELL_PLATE
 from .constants import NUM_CHANNELS_PER_WELL
 from .constants import TISSUE_SENSOR_READINGS
+from .transforms import decimate_plate_data
+from .utils import map_with_workers
 
 
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # the resource module is only available on Unix
+    resource = None  # type: ignore
+
 if TYPE_CHECKING:
     from .plate_recording import WellFile
 
+log = structlog.getLogger()
 
 FILTER_PARAMS = signal.butter(4, 30, "low", fs=100)
+FILTER_SOS = signal.butter(4, 30, "low", fs=100, output="sos")
+
+
+class MagnetFindingReport:
+    """Wall time and memory usage of each phase of estimating the magnet positions of a recording.
+
+    Each phase and each chunk of samples given to the solver is also logged as it completes.
+
+    The memory usage of each phase is recorded as the peak resident set size (RSS) of the process, which
+    includes memory allocated by native code such as the solver, and the peak RSS of the worker processes
+    that have finished so far. The peak RSS can only grow, so each phase also records how much it raised it.
+    The peak RSS is not available on platforms without the resource module (Windows).
+
+    The solver only returns the estimated params, not how many iterations it took or the residuals of its
+    fits, so neither can be included in the report.
+
+    Args:
+        track_memory: if True, the peak memory allocated during each phase will also be measured with
+            tracemalloc. This includes NumPy arrays, but not memory allocated by other native code or in
+            worker processes. It slows the solver down, so it is disabled by default
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.chunks: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def measure_phase(self, phase: str) -> Iterator[None]:
+        """Measure the wall time and peak memory usage of the code run inside this context.
+
+        Args:
+            phase: the name of the phase. The measurements are stored in `phases` under this name
+        """
+        started_tracing = False
+        if self.track_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_max_rss = _get_max_rss_bytes()
+
+        start = time.perf_counter()
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            phase_info = {"wall_time_secs": time.perf_counter() - start, "completed": completed}
+            if start_max_rss is not None and (max_rss := _get_max_rss_bytes()) is not None:
+                phase_info["max_rss_bytes"] = max_rss
+                phase_info["max_rss_increase_bytes"] = max_rss - start_max_rss
+                phase_info["max_worker_rss_bytes"] = _get_max_rss_bytes(workers=True)
+            if self.track_memory:
+                # only the memory allocated after the phase started is included
+                phase_info["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1] - start_memory
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self.phases[phase] = phase_info
+            log.info("Magnet finding phase finished", phase=phase, **phase_info)
+
+    def add_chunk(self, start_idx: int, num_samples: int, wall_time_secs: float) -> None:
+        """Record a chunk of samples that was given to the solver.
+
+        Args:
+            start_idx: index of the first sample of the chunk in the recording
+            num_samples: the number of samples in the chunk
+            wall_time_secs: how long the solver took to solve the chunk
+        """
+        chunk_info = {"start_idx": start_idx, "num_samples": num_samples, "wall_time_secs": wall_time_secs}
+        self.chunks.append(chunk_info)
+        log.info("Magnet finding chunk solved", **chunk_info)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_wall_time_secs": sum(phase_info["wall_time_secs"] for phase_info in self.phases.values()),
+            "phases": {phase: dict(phase_info) for phase, phase_info in self.phases.items()},
+            "chunks": [dict(chunk_info) for chunk_info in self.chunks],
+        }
 
 
 def find_magnet_positions(
     fields: NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float],
-    baseline: NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float],
+    baseline: Optional[NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float]],
     initial_magnet_finding_params: Dict[str, Union[int, float]],
     filter_inputs: bool = True,
     filter_outputs: bool = False,
+    chunked: bool = False,
+    num_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    report: Optional[MagnetFindingReport] = None,
 ) -> Dict[str, NDArray[(1, Any), float]]:
+    """Estimate the position of the magnet in each well.
+
+    Args:
+        fields: the magnetic flux density data of each channel, one row per channel
+        baseline: the baseline value of each channel. None if it has already been subtracted from the fields
+        initial_magnet_finding_params: the initial guesses of the magnet params passed to the solver
+        filter_inputs: whether to filter the fields before solving
+        filter_outputs: whether to filter the estimated positions
+        chunked: if True, the recording will be split into overlapping chunks of time which are solved in a
+            pool of processes and then stitched back together. The result matches the unchunked solve as long
+            as the solver settles onto the trajectory of the magnets within the warmup samples of each chunk
+        num_workers: the number of processes to solve chunks with. Defaults to the number of cores
+        chunk_size: the number of samples in each chunk. Defaults to splitting the recording evenly between
+            the workers, limited by the amount of free memory
+        report: if given, the wall time and memory usage of each phase will be recorded in it
+
+    Returns:
+        The estimated value of each param, one column per well
+    """
+    if report is None:
+        report = MagnetFindingReport()
+
     if filter_inputs:
-        fields = filter_raw_signal(fields)
+        with report.measure_phase("input_filtering"):
+            fields = filter_raw_signal(fields)
 
-    output_dict = get_positions((fields.T - baseline).T, **initial_magnet_finding_params)  # type: ignore # mypy complaining about **
+    with report.measure_phase("solve"):
+        solver_input = fields if baseline is None else (fields.T - baseline).T
+
+        if chunked:
+            output_dict = _find_magnet_positions_in_chunks(
+                solver_input, initial_magnet_finding_params, num_workers, chunk_size, report
+            )
+        else:
+            output_dict, solve_dur = _solve_chunk(solver_input, initial_magnet_finding_params)
+            report.add_chunk(0, solver_input.shape[-1], solve_dur)
 
     if filter_outputs:
-        for param, output_arr in output_dict.items():
-            output_dict[param] = filter_magnet_positions(output_arr)
+        with report.measure_phase("output_filtering"):
+            for param, output_arr in output_dict.items():
+                output_dict[param] = filter_magnet_positions(output_arr)
 
     return output_dict
 
 
+def _find_magnet_positions_in_chunks(
+    solver_input: NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float],
+    initial_magnet_finding_params: Dict[str, Union[int, float]],
+    num_workers: Optional[int],
+    chunk_size: Optional[int],
+    report: MagnetFindingReport,
+) -> Dict[str, NDArray[(Any, 24), float]]:
+    num_samples = solver_input.shape[-1]
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = get_magnet_finding_chunk_size(num_samples, num_workers)
+
+    lead_num_samples = MAGNET_FINDING_CHUNK_WARMUP_NUM_SAMPLES + MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES
+    if chunk_size < lead_num_samples:
+        raise ValueError(f"chunk_size must be >= {lead_num_samples}, not {chunk_size}")
+
+    chunk_starts = range(0, num_samples, chunk_size)
+    if len(chunk_starts) == 1:
+        output_dict, solve_dur = _solve_chunk(solver_input, initial_magnet_finding_params)
+        report.add_chunk(0, num_samples, solve_dur)
+        return output_dict
+
+    # every chunk after the first starts early. The solver begins each chunk from the initial params rather
+    # than the end of the previous chunk so that all chunks can be solved at the same time, and uses the
+    # warmup samples to settle onto the trajectory of the magnets before reaching the samples that are kept
+    window_starts = [max(start - lead_num_samples, 0) for start in chunk_starts]
+    chunks = [
+        solver_input[:, window_start : start + chunk_size]
+        for window_start, start in zip(window_starts, chunk_starts)
+    ]
+    chunk_results = map_with_workers(
+        _solve_chunk,
+        chunks,
+        repeat(initial_magnet_finding_params),
+        num_workers=min(num_workers, len(chunks)),
+        executor_type="process",
+    )
+    chunk_outputs = []
+    for window_start, chunk, (chunk_output, solve_dur) in zip(window_starts, chunks, chunk_results):
+        chunk_outputs.append(chunk_output)
+        report.add_chunk(window_start, chunk.shape[-1], solve_dur)
+
+    blend_weights = (np.arange(MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES) + 1) / (
+        MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES + 1
+    )
+    blend_weights = blend_weights[:, np.newaxis]
+
+    output_dict = {}
+    for param, first_chunk_output in chunk_outputs[0].items():
+        stitched_output = np.empty((num_samples, *first_chunk_output.shape[1:]))
+        for start, window_start, chunk_output_dict in zip(chunk_starts, window_starts, chunk_outputs):
+            chunk_output = chunk_output_dict[param]
+            lead = start - window_start
+            if lead:
+                # crossfade from the end of the previous chunk into this chunk so there is no discontinuity
+                prev_chunk_tail = stitched_output[start - MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES : start]
+                chunk_head = chunk_output[lead - MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES : lead]
+                prev_chunk_tail[:] = (1 - blend_weights) * prev_chunk_tail + blend_weights * chunk_head
+            stitched_output[start : start + chunk_size] = chunk_output[lead:]
+        output_dict[param] = stitched_output
+
+    return output_dict
+
+
+def _solve_chunk(
+    chunk: NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float],
+    initial_magnet_finding_params: Dict[str, Union[int, float]],
+) -> Tuple[Dict[str, NDArray[(Any, 24), float]], float]:
+    start = time.perf_counter()
+    output_dict = get_positions(chunk, **initial_magnet_finding_params)  # type: ignore # mypy complaining about **
+    return output_dict, time.perf_counter() - start
+
+
+def get_magnet_finding_chunk_size(num_samples: int, num_workers: int) -> int:
+    """Choose the number of samples in each chunk when solving magnet positions in chunks.
+
+    The recording is split evenly between the workers unless that would use more memory than is currently
+    free, in which case smaller chunks are used.
+
+    Args:
+        num_samples: the number of samples in the recording
+        num_workers: the number of workers solving chunks at the same time
+
+    Returns:
+        The number of samples in each chunk
+    """
+    chunk_size = math.ceil(num_samples / num_workers)
+
+    if (available_memory := _get_available_memory()) is not None:
+        max_chunk_size = available_memory // (num_workers * MAGNET_FINDING_MEMORY_PER_SAMPLE)
+        chunk_size = min(chunk_size, max_chunk_size)
+
+    return max(chunk_size, MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES)
+
+
+def _get_max_rss_bytes(workers: bool = False) -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN if workers else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, but in kilobytes everywhere else
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _get_available_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        # sysconf is not available on all platforms
+        return None
+
+
 def filter_raw_signal(
-    fields: NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float]
+    fields: NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float],
+    dtype: Any = np.float64,
+    out: Optional[NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float]] = None,
 ) -> NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float]:
-    filtered_fields = np.empty(fields.shape)
+    """Apply a zero-phase low-pass filter to every channel of the plate at once.
 
-    for channel_idx in range(fields.shape[0]):
-        filtered_fields[channel_idx] = signal.filtfilt(*FILTER_PARAMS, fields[channel_idx])
-    return filtered_fields
+    Args:
+        fields: the magnetic flux density data of each channel, one row per channel
+        dtype: the dtype to filter the data in. np.float32 uses half the memory, but is less precise
+        out: if given, the filtered data will be written into this array. May be `fields` itself
 
+    Returns:
+        The filtered data. If `out` is given, it will be returned
+    """
+    return _filter_along_axis(fields, axis=-1, dtype=dtype, out=out)
 
-def filter_magnet_positions(magnet_positions: NDArray[(Any, 24), float]) -> NDArray[(Any, 24), float]:
-    filtered_magnet_positions = np.empty(magnet_positions.shape)
-    # Tanner (1/7/22): need to filter each well individually, can't filter over the entire axis of the array at once
-    for well_arr_idx in range(magnet_positions.shape[1]):
-        filtered_magnet_positions[:, well_arr_idx] = signal.filtfilt(
-            *FILTER_PARAMS, magnet_positions[:, well_arr_idx]
-        )
-    return filtered_magnet_positions
 
+def filter_magnet_positions(
+    magnet_positions: NDArray[(Any, 24), float],
+    dtype: Any = np.float64,
+    out: Optional[NDArray[(Any, 24), float]] = None,
+) -> NDArray[(Any, 24), float]:
+    """Apply a zero-phase low-pass filter to the positions of every well at once.
+
+    Args:
+        magnet_positions: the estimated positions of a single param, one column per well
+        dtype: the dtype to filter the data in. np.float32 uses half the memory, but is less precise
+        out: if given, the filtered data will be written into this array. May be `magnet_positions` itself
+
+    Returns:
+        The filtered data. If `out` is given, it will be returned
+    """
+    # Tanner (1/7/22): need to filter each well individually, so filter each column along the time axis
+    return _filter_along_axis(magnet_positions, axis=0, dtype=dtype, out=out)
 
-def format_well_file_data(well_files: List["WellFile"]) -> NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float]:
-    """Convert well data to input array format of magnet finding alg."""
-    plate_data_array = None
+
+def _filter_along_axis(data: NDArray, axis: int, dtype: Any, out: Optional[NDArray]) -> NDArray:
+    if out is None:
+        out = np.empty(data.shape, dtype=dtype)
+    sos = FILTER_SOS.astype(dtype, copy=False)
+
+    # each row of the other axis is filtered independently, so filter a block of rows at a time and write each
+    # block straight into the output. Only the temporary arrays of one block are ever allocated, and the
+    # output can be the data itself
+    data_rows = np.moveaxis(data, axis, -1)
+    out_rows = np.moveaxis(out, axis, -1)
+    num_rows_per_block = max(MAGNET_FINDING_FILTER_BLOCK_NUM_VALUES // max(data_rows.shape[-1], 1), 1)
+    for block_start in range(0, data_rows.shape[0], num_rows_per_block):
+        block = slice(block_start, block_start + num_rows_per_block)
+        out_rows[block] = signal.sosfiltfilt(sos, data_rows[block].astype(dtype, copy=False), axis=-1)
+    return out
+
+
+def format_well_file_data(
+    well_files: List["WellFile"], window: slice = slice(None)
+) -> NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float]:
+    """Convert well data to input array format of magnet finding alg.
+
+    The data of each well is read directly into the plate array, so lazily loaded WellFiles
+    never need to hold a copy of their tissue data in memory.
+
+    Args:
+        well_files: the WellFiles of each well in the plate, in order of well index
+        window: the range of samples to load. For lazily loaded WellFiles, only this range will be read from disk
+
+    Returns:
+        An array of the tissue sensor data in the given window of every channel in the plate
+    """
+    num_samples = len(range(well_files[0].get_dataset_shape(TISSUE_SENSOR_READINGS)[-1])[window])
+    plate_data_array = np.empty((NUM_CHANNELS_24_WELL_PLATE, num_samples))
     for well_idx, well_file in enumerate(well_files):
-        tissue_data = well_file[TISSUE_SENSOR_READINGS][:]
-        if plate_data_array is None:
-            num_samples = tissue_data.shape[-1]
-            plate_data_array = np.empty((NUM_CHANNELS_24_WELL_PLATE, num_samples))
-        reshaped_data = tissue_data.reshape((NUM_CHANNELS_PER_WELL, num_samples))
-        plate_data_array[
-            well_idx * NUM_CHANNELS_PER_WELL : (well_idx + 1) * NUM_CHANNELS_PER_WELL, :
-        ] = reshaped_data
+        well_file.read_dataset(
+            TISSUE_SENSOR_READINGS,
+            (Ellipsis, window),
+            out=plate_data_array[
+                well_idx * NUM_CHANNELS_PER_WELL : (well_idx + 1) * NUM_CHANNELS_PER_WELL, :
+            ],
+        )
     return plate_data_array
 
 
-def fix_dropped_samples(raw_signal: NDArray[Any, np.uint16]) -> NDArray[Any, np.uint16]:
-    # Tanner (2/7/22): may want to add additional conditions if this has issues
-    fixed_signal = raw_signal.copy()
-    dropped_sample_indices = [tuple(indices) for indices in np.argwhere(raw_signal == 0)]
-    for index_tuple in dropped_sample_indices:
-        innermost_arr = fixed_signal[index_tuple[:-1]]
-        sample_idx = index_tuple[-1]
-        if sample_idx == 0:
-            innermost_arr[sample_idx] = innermost_arr[sample_idx + 1]
-        elif sample_idx == len(innermost_arr) - 1:
-            innermost_arr[sample_idx] = innermost_arr[sample_idx - 1]
+def stream_plate_data(
+    well_files: List["WellFile"],
+    baseline: NDArray[(NUM_CHANNELS_24_WELL_PLATE,), float],
+    window: slice = slice(None),
+    chunk_size: int = DEFAULT_INGEST_CHUNK_NUM_SAMPLES,
+    decimation_factor: int = 1,
+) -> Tuple[NDArray[(NUM_CHANNELS_24_WELL_PLATE, Any), float], NDArray[(NUM_CHANNELS_24_WELL_PLATE,), int]]:
+    """Create the input of the magnet finding solver from the tissue data of a plate one chunk at a time.
+
+    Each chunk is read, has its dropped samples fixed, is converted to magnetic flux density, and is then
+    filtered (or decimated) before the next chunk is read. Only the output array is the size of the whole
+    recording, so the peak memory used by the intermediate steps is set by the chunk size.
+
+    To match the results of processing the whole recording at once, each chunk is processed along with
+    INGEST_CHUNK_OVERLAP_NUM_SAMPLES samples of the surrounding data on each side, which are then discarded.
+    The results match to within floating point error unless a run of dropped samples crosses the edge of an
+    overlap.
+
+    Args:
+        well_files: the WellFiles of each well in the plate, in order of well index
+        baseline: the baseline value of each channel
+        window: the range of samples to process
+        chunk_size: the number of samples to process at once
+        decimation_factor: if greater than 1, the data is decimated by this factor instead of being filtered
+
+    Returns:
+        The baseline-subtracted input for the solver, and the number of dropped samples in each channel
+    """
+    sample_range = range(well_files[0].get_dataset_shape(TISSUE_SENSOR_READINGS)[-1])[window]
+    if sample_range.step != 1:
+        raise ValueError("window must not have a step")
+    num_samples = len(sample_range)
+
+    # chunks and their overlap must be aligned to the decimation factor so that the samples kept from each
+    # chunk line up with those kept when decimating the whole recording at once
+    chunk_size = math.ceil(chunk_size / decimation_factor) * decimation_factor
+    overlap = math.ceil(INGEST_CHUNK_OVERLAP_NUM_SAMPLES / decimation_factor) * decimation_factor
+
+    solver_input = np.empty((NUM_CHANNELS_24_WELL_PLATE, math.ceil(num_samples / decimation_factor)))
+    dropped_sample_counts = np.zeros(NUM_CHANNELS_24_WELL_PLATE, dtype=int)
+
+    for chunk_start in range(0, num_samples, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, num_samples)
+        padded_start = max(chunk_start - overlap, 0)
+        padded_end = min(chunk_end + overlap, num_samples)
+        lead = chunk_start - padded_start
+
+        chunk = format_well_file_data(
+            well_files, slice(sample_range.start + padded_start, sample_range.start + padded_end)
+        )
+        # only count the dropped samples of this chunk, not those of the overlap with the surrounding chunks
+        chunk_without_overlap = chunk[:, lead : lead + chunk_end - chunk_start]
+        dropped_sample_counts += np.count_nonzero(chunk_without_overlap == 0, axis=-1)
+        fix_dropped_samples(chunk, in_place=True)
+        chunk_mt = calculate_magnetic_flux_density_from_memsic(chunk)
+
+        if decimation_factor > 1:
+            processed_chunk = decimate_plate_data(chunk_mt, decimation_factor)
         else:
-            innermost_arr[sample_idx] = np.mean(
-                [innermost_arr[sample_idx - 1], innermost_arr[sample_idx + 1]]
-            )
+            processed_chunk = filter_raw_signal(chunk_mt, out=chunk_mt)
+
+        output_start = chunk_start // decimation_factor
+        output_end = math.ceil(chunk_end / decimation_factor)
+        processed_lead = lead // decimation_factor
+        solver_input[:, output_start:output_end] = processed_chunk[
+            :, processed_lead : processed_lead + output_end - output_start
+        ]
+
+    solver_input -= baseline[:, np.newaxis]
+    return solver_input, dropped_sample_counts
+
+
+def fix_dropped_samples(
+    raw_signal: NDArray[Any, np.uint16], in_place: bool = False, return_counts: bool = False
+) -> Union[NDArray[Any, np.uint16], Tuple[NDArray[Any, np.uint16], NDArray[Any, int]]]:
+    """Replace dropped samples (zeros) in each channel with values interpolated from the surrounding samples.
+
+    Each dropped sample is linearly interpolated between the nearest samples before and after it that were
+    not dropped, so runs of consecutive dropped samples are handled as well. Dropped samples at the beginning
+    or end of a channel take the value of the nearest sample that was not dropped.
+
+    Args:
+        raw_signal: the raw data of each channel. The last axis is time
+        in_place: if True, the dropped samples will be replaced in `raw_signal` instead of in a copy of it
+        return_counts: if True, the number of dropped samples in each channel will also be returned
+
+    Returns:
+        The fixed signal. If `return_counts` is True, also an array of the number of dropped samples in each
+        channel with the same shape as `raw_signal` minus the time axis
+    """
+    # Tanner (2/7/22): may want to add additional conditions if this has issues
+    fixed_signal = raw_signal if in_place else raw_signal.copy()
+
+    num_samples = fixed_signal.shape[-1]
+    # this is a view into fixed_signal as long as it is contiguous
+    channels = fixed_signal.reshape(-1, num_samples)
+    dropped_sample_mask = channels == 0
+    dropped_sample_counts = np.count_nonzero(dropped_sample_mask, axis=-1)
+
+    # only channels with dropped samples need to be processed. Channels with no valid samples can't be fixed
+    channels_to_fix = np.flatnonzero((dropped_sample_counts > 0) & (dropped_sample_counts < num_samples))
+    if channels_to_fix.size:
+        mask = dropped_sample_mask[channels_to_fix]
+        sample_indices = np.arange(num_samples)
+
+        # index of the nearest valid sample at or before / at or after each sample
+        prev_valid_indices = np.maximum.accumulate(np.where(mask, -1, sample_indices), axis=-1)
+        reversed_indices = np.where(mask, num_samples, sample_indices)[:, ::-1]
+        next_valid_indices = np.minimum.accumulate(reversed_indices, axis=-1)[:, ::-1]
+
+        mask_rows, dropped_indices = np.nonzero(mask)
+        prev_indices = prev_valid_indices[mask_rows, dropped_indices]
+        next_indices = next_valid_indices[mask_rows, dropped_indices]
+        # at the edges of the channel, there is only a valid sample on one side so use it for both sides
+        prev_indices = np.where(prev_indices < 0, next_indices, prev_indices)
+        next_indices = np.where(next_indices == num_samples, prev_indices, next_indices)
+
+        channel_indices = channels_to_fix[mask_rows]
+        prev_values = channels[channel_indices, prev_indices].astype(np.float64)
+        next_values = channels[channel_indices, next_indices].astype(np.float64)
+        gap_sizes = next_indices - prev_indices
+        # multiply before dividing so that values which should be whole numbers are exact
+        steps = (next_values - prev_values) * (dropped_indices - prev_indices)
+        steps = np.divide(steps, gap_sizes, out=np.zeros(len(steps)), where=gap_sizes > 0)
+        channels[channel_indices, dropped_indices] = prev_values + steps
+
+    if not np.shares_memory(channels, fixed_signal):
+        # the array was not contiguous so reshaping it made a copy, which needs to be written back
+        fixed_signal[...] = channels.reshape(fixed_signal.shape)
+
+    if return_counts:
+        return fixed_signal, dropped_sample_counts.reshape(fixed_signal.shape[:-1])
     return fixed_signal
@@ -7,11 +7,11 @@ from typing import Tuple
 
 from nptyping import NDArray
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from pulse3D.exceptions import InvalidValleySearchDurationError
 from pulse3D.exceptions import TooFewPeaksDetectedError
 from pulse3D.transforms import get_time_window_indices
 from scipy import signal
-from scipy.optimize import curve_fit
 
 from .constants import DEFAULT_NB_HEIGHT_FACTOR
 from .constants import DEFAULT_NB_NOISE_PROMINENCE_FACTOR
@@ -78,50 +78,20 @@ def noise_based_peak_finding(
         # if no max freq given, use sampling freq
         max_frequency = sample_freq
 
-    # set estimate of peak to peak noise amplitude is 10uN for average recording
-    default_noise = 10
-    default_prom = 5
-
-    # find peaks with this estimated amplitude
-    peaks, _ = signal.find_peaks(waveform, prominence=default_prom * default_noise)
-
-    # if first attempt finds no peaks as they are too small, retry with smaller prominence
-    # this approach should return a list of peak indices even if no true peaks exist as it will terminate at a prominence of 1.
-    correction_factor = 1
-    while len(peaks) == 0 and correction_factor <= default_prom:
-        peaks, _ = signal.find_peaks(waveform, prominence=(default_prom - correction_factor) * default_noise)
-
-        correction_factor += 1
+    peaks = _find_noise_estimation_peaks(waveform)
 
     # use peaks to extract waveform segments from which noise data can be extracted - control over this could be given to the user if required
     segment_size = 10
 
-    while (len(peaks) > 0) and (peaks[-1] + segment_size > len(waveform)):
-        peaks = np.delete(peaks, -1)
+    # peaks are sorted, so this only removes the peaks too close to the end to have a full segment
+    peaks = peaks[peaks + segment_size <= len(waveform)]
 
     if (num_peaks := len(peaks)) < MIN_NUMBER_PEAKS:
         raise TooFewPeaksDetectedError(
             f"A minimum of {MIN_NUMBER_PEAKS} peaks is required to extract twitch metrics, however only {num_peaks} peak(s) were detected."
         )
 
-    noise_segements = np.array([[waveform[i] for i in range(peak, peak + segment_size)] for peak in peaks])
-    time_segments = np.array([[time_axis[i] for i in range(peak, peak + segment_size)] for peak in peaks])
-
-    # fit quadratic to bring noise to baseline and remove peak information
-    # fit_models = [curve_fit(quadratic, time, signal) for time, signal in zip(time_segments,noise_segements)]
-    # quad_fit = [quadratic(i,*popt[0]) for i,popt in zip(time_segments, fit_models)]
-    quad_fit = [
-        quadratic(time, *curve_fit(quadratic, time, signal)[0])
-        for time, signal in zip(time_segments, noise_segements)
-    ]
-
-    # baseline correct with quadratic fits
-    noise_segements_corrected = np.array([noise - fit for noise, fit in zip(noise_segements, quad_fit)])
-
-    # extract peak to peak noise for each segment and average
-    noise_amplitude_from_data = np.average(
-        np.max(noise_segements_corrected, axis=1) - np.min(noise_segements_corrected, axis=1)
-    )
+    noise_amplitude_from_data = _estimate_noise_amplitude(time_axis, waveform, peaks, segment_size)
 
     # use either set prominence or calculate the relative prominence factor
     if relative_prominence_factor:
@@ -146,69 +116,16 @@ def noise_based_peak_finding(
 
     # the valley search size of the initial peak must not extend back beyond the initial timepoint, so remove any peaks that are too close to the start
     segment_size = int(valley_search_duration * sample_freq)
-    while len(peaks) != 0 and peaks[0] - segment_size < 0:
-        peaks = np.delete(peaks, 0)
+    peaks = peaks[peaks >= segment_size]
 
     if len(peaks) == 0:
         raise InvalidValleySearchDurationError()
 
-    # generate localised search windows based on peak positions
-    padded_peaks = np.pad(peaks, (1, 0), constant_values=0)
-    search_windows = np.array(
-        [
-            peak - padded_peak
-            for peak, padded_peak in zip(np.pad(peaks, (0, 1), constant_values=len(waveform)), padded_peaks)
-        ]
-    )
-
-    # if a window is smaller than the segment size then use this else use the defined segment size
-    search_windows[search_windows > segment_size] = segment_size
-
-    # generate waveform segments
-    valley_segments = [
-        np.array([waveform[i] for i in range(peak - segment, peak)])
-        for peak, segment in zip(peaks, search_windows)
-    ]
-
     upslope_num_samples = upslope_duration * sample_freq
     upslope_noise_allowance_num_samples = upslope_noise_allowance_duration * sample_freq
 
-    # identify areas where waveform increases sample after sample for a minimum stretch, default to min in search area if no areas found
-    upslope_indices = [np.where(np.diff(segment) > 0)[0] for segment in valley_segments]
-    upslope_indices = [
-        [
-            i
-            for i in np.split(
-                upslope, np.where(np.diff(upslope) > (1 + upslope_noise_allowance_num_samples))[0] + 1
-            )
-            if len(i) >= upslope_num_samples
-        ]
-        for upslope in upslope_indices
-    ]
-
-    valley_indices = []
-    for upslope, valley in zip(upslope_indices, valley_segments):
-        # if no qualifying upslope is identified then use the min value in the segment
-        if len(upslope) == 0:
-            valley_index = np.argmin(valley)
-            # print("min")
-
-        # if only one upslope is identified the use the first value in the upslope
-        elif len(upslope) == 1:
-            valley_index = upslope[0][0]
-            # print('upslope-single')
-
-        # if multiple qualifying upslopes are found use the longest identified upslope.
-        # if multiple equal length slopes are identified the latest upslope is used
-        else:
-            longest_upslope = max([len(length) for length in upslope])
-            valley_index = [slope[0] for slope in upslope if len(slope) == longest_upslope][0]
-            # print('upslope')
-
-        valley_indices.append(valley_index)
-
-    valleys = np.array(
-        [peak - (window - index) for peak, index, window in zip(peaks, valley_indices, search_windows)]
+    valleys = _find_valleys(
+        waveform, peaks, segment_size, upslope_num_samples, upslope_noise_allowance_num_samples
     )
 
     # indices are only valid with the given window, so adjust to match original signal
@@ -216,3 +133,126 @@ def noise_based_peak_finding(
     valleys += window_indices[0]
 
     return peaks, valleys
+
+
+def _find_noise_estimation_peaks(waveform: NDArray[(Any,), float]) -> NDArray[(Any,), int]:
+    """Find the peaks to estimate the noise of the waveform from.
+
+    Peaks are first found with a prominence based on the noise of an average recording, and the prominence is
+    lowered until at least one peak is found. The prominence of every local max is only computed once.
+    """
+    # set estimate of peak to peak noise amplitude is 10uN for average recording
+    default_noise = 10
+    default_prom = 5
+
+    candidate_peaks, _ = signal.find_peaks(waveform)
+    candidate_prominences = signal.peak_prominences(waveform, candidate_peaks)[0]
+
+    # find peaks with this estimated amplitude
+    peaks = candidate_peaks[candidate_prominences >= default_prom * default_noise]
+
+    # if first attempt finds no peaks as they are too small, retry with smaller prominence
+    # this approach should return a list of peak indices even if no true peaks exist as it will terminate at a prominence of 0.
+    correction_factor = 1
+    while len(peaks) == 0 and correction_factor <= default_prom:
+        peaks = candidate_peaks[candidate_prominences >= (default_prom - correction_factor) * default_noise]
+
+        correction_factor += 1
+
+    return peaks
+
+
+def _estimate_noise_amplitude(
+    time_axis: NDArray[(Any,), float],
+    waveform: NDArray[(Any,), float],
+    peaks: NDArray[(Any,), int],
+    segment_size: int,
+) -> float:
+    """Estimate the peak to peak noise amplitude of the waveform from the segments starting at each peak.
+
+    A quadratic is fit to each segment to bring the noise to baseline and remove the peak information. The
+    fits are linear least squares problems, so every segment is solved at once with a QR decomposition of
+    its design matrix instead of iteratively.
+    """
+    # stack the segment starting at each peak. Only the segments of the peaks are copied out of the views
+    noise_segments = sliding_window_view(waveform, segment_size)[peaks]
+    time_segments = sliding_window_view(time_axis, segment_size)[peaks]
+
+    # centring and scaling the time of each segment does not change the fit, but keeps it well-conditioned
+    time_segments = time_segments - time_segments.mean(axis=1, keepdims=True)
+    time_segments = time_segments / np.abs(time_segments).max(axis=1, keepdims=True)
+    design_matrices = np.stack([time_segments**2, time_segments, np.ones_like(time_segments)], axis=-1)
+    # the least squares fit is the projection of the segment onto the column space of its design matrix
+    q, _ = np.linalg.qr(design_matrices)
+    quad_fit = (q @ (q.transpose(0, 2, 1) @ noise_segments[..., np.newaxis]))[..., 0]
+
+    # baseline correct with quadratic fits
+    noise_segments_corrected = noise_segments - quad_fit
+
+    # extract peak to peak noise for each segment and average
+    return np.average(np.max(noise_segments_corrected, axis=1) - np.min(noise_segments_corrected, axis=1))
+
+
+def _find_valleys(
+    waveform: NDArray[(Any,), float],
+    peaks: NDArray[(Any,), int],
+    search_num_samples: int,
+    upslope_num_samples: float,
+    upslope_noise_allowance_num_samples: float,
+) -> NDArray[(Any,), int]:
+    """Find the valley before each peak.
+
+    The valley of each peak is the start of the longest upslope in the search window before it, or the min
+    value in the search window if it has no upslope. All search windows are processed at once.
+
+    Args:
+        waveform: the waveform values
+        peaks: the indices of the peaks. The first peak must be at least `search_num_samples` from the start
+        search_num_samples: the number of samples before each peak to search for a valley in. If this window
+            includes the previous peak then it is shortened to end at the previous peak
+        upslope_num_samples: the min number of rising samples an upslope must contain
+        upslope_noise_allowance_num_samples: the max number of samples in an upslope which are not rising
+
+    Returns:
+        The index of the valley of each peak
+    """
+    # if a window is smaller than the segment size then use this else use the defined segment size
+    search_windows = np.minimum(np.diff(peaks, prepend=0), search_num_samples)
+
+    # stack the search_num_samples samples before each peak, masking out the samples before the start of
+    # shortened windows
+    segments = sliding_window_view(waveform, search_num_samples)[peaks - search_num_samples]
+    in_window = np.arange(search_num_samples) >= (search_num_samples - search_windows)[:, np.newaxis]
+
+    # if no qualifying upslope is identified then use the min value in the segment
+    valley_cols = np.argmin(np.where(in_window, segments, np.inf), axis=1)
+
+    # identify areas where waveform increases sample after sample for a minimum stretch
+    is_rising = (np.diff(segments, axis=1) > 0) & in_window[:, :-1]
+    rising_rows, rising_cols = np.nonzero(is_rising)
+    if len(rising_rows) > 0:
+        # an upslope starts at the first rising sample of each segment and after each gap in the rise larger
+        # than the noise allowance
+        is_upslope_start = np.ones(len(rising_rows), dtype=bool)
+        is_upslope_start[1:] = (np.diff(rising_rows) != 0) | (
+            np.diff(rising_cols) > (1 + upslope_noise_allowance_num_samples)
+        )
+        upslope_start_idxs = np.flatnonzero(is_upslope_start)
+        upslope_lengths = np.diff(upslope_start_idxs, append=len(rising_rows))
+        upslope_rows = rising_rows[upslope_start_idxs]
+        upslope_start_cols = rising_cols[upslope_start_idxs]
+
+        is_qualifying = upslope_lengths >= upslope_num_samples
+        upslope_lengths = upslope_lengths[is_qualifying]
+        upslope_rows = upslope_rows[is_qualifying]
+        upslope_start_cols = upslope_start_cols[is_qualifying]
+
+        # use the longest upslope of each segment. If multiple equal length upslopes are identified the first
+        # one is used
+        longest_upslope_lengths = np.zeros(len(peaks), dtype=upslope_lengths.dtype)
+        np.maximum.at(longest_upslope_lengths, upslope_rows, upslope_lengths)
+        is_longest = upslope_lengths == longest_upslope_lengths[upslope_rows]
+        rows_with_upslope, first_longest_idxs = np.unique(upslope_rows[is_longest], return_index=True)
+        valley_cols[rows_with_upslope] = upslope_start_cols[is_longest][first_longest_idxs]
+
+    return peaks - search_num_samples + valley_cols
@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
 from collections import defaultdict
+from collections import deque
+from concurrent.futures import Future
+from contextlib import ExitStack
 import datetime
 import glob
+import io
+from itertools import islice
+from itertools import repeat
 import json
 import os
 import tempfile
 from typing import Any
+from typing import Callable
+from typing import Deque
 from typing import Dict
+from typing import IO
 from typing import List
+from typing import Literal
 from typing import Optional
+from typing import Tuple
 from typing import Union
 import uuid
 import zipfile
@@ -19,13 +30,16 @@ from mantarray_magnet_finding.utils import calculate_magnetic_flux_density_from_
 from nptyping import NDArray
 import numpy as np
 from openpyxl import load_workbook
-from openpyxl.worksheet.worksheet import Worksheet
 import pandas as pd
-from scipy import interpolate
 from semver import VersionInfo
 import structlog
 from xlsxwriter.utility import xl_cell_to_rowcol
 
+from .cache import ArrayCache
+from .cache import create_cache_key
+from .cache import get_file_stats
+from .cache import hash_file_contents
+from .cache import WaveformCache
 from .compression_cy import compress_filtered_magnetic_data
 from .constants import *
 from .exceptions import DuplicateWellsFoundError
@@ -35,21 +49,30 @@ from .exceptions import SubprotocolFormatIncompatibleWithInterpolationError
 from .magnet_finding import find_magnet_positions
 from .magnet_finding import fix_dropped_samples
 from .magnet_finding import format_well_file_data
+from .magnet_finding import MagnetFindingReport
+from .magnet_finding import stream_plate_data
 from .stimulation import aggregate_timepoints
 from .stimulation import create_stim_session_waveforms
 from .stimulation import realign_interpolated_stim_data
 from .transforms import apply_empty_plate_calibration
 from .transforms import apply_noise_filtering
 from .transforms import apply_sensitivity_calibration
+from .transforms import calculate_displacement_and_force_from_gmr
 from .transforms import calculate_displacement_from_voltage
 from .transforms import calculate_force_from_displacement
 from .transforms import calculate_voltage_from_gmr
-from .transforms import create_filter
+from .transforms import convert_displacement_to_force
+from .transforms import create_min_max_pyramid
+from .transforms import decimate_plate_data
 from .transforms import noise_cancellation
+from .transforms import NOISE_FILTER_BANK
+from .transforms import resample_plate_data
+from .utils import create_executor
 from .utils import get_experiment_id
 from .utils import get_stiffness_factor
 from .utils import get_well_name_from_h5
-from .utils import truncate
+from .utils import map_with_workers
+from .utils import TimeAxis
 
 log = structlog.getLogger()
 
@@ -80,7 +103,28 @@ class WellFile:
         # TODO unit test the stiffness factor (auto and override)
         stiffness_factor: Optional[int] = None,
         has_inverted_post_magnet: bool = False,
+        lazy: bool = False,
+        file_obj: Optional[IO[bytes]] = None,
+        retention: Literal["lean", "full"] = "lean",
+        noise_filter_block_size: Optional[int] = None,
+        hash_contents: bool = False,
     ):
+        """Load the data and metadata of a single well.
+
+        Args:
+            file_path: path to an H5 or xlsx file. If `file_obj` is given, this is only used as the name of the file
+            sampling_period: override for the tissue sampling period stored in the file
+            stiffness_factor: post stiffness factor override
+            has_inverted_post_magnet: whether or not the magnet in the post of this well is inverted
+            lazy: if True, the datasets of V1 H5 files will only be read when they are first accessed
+            file_obj: an already opened H5 file to read from instead of `file_path`, such as a zip member
+            retention: "lean" only keeps the displacement and force data of Beta 1 files in memory and
+                computes the other arrays of the transform chain when they are accessed. "full" keeps them all
+            noise_filter_block_size: if given, the GMR data of Beta 1 files will be noise filtered this many
+                samples at a time with NoiseFilterBank.filter_in_blocks to bound the memory used by the filter
+            hash_contents: if True, the content hash returned by get_content_hash is created while the file is
+                loaded, so that `file_obj` does not have to be kept around for it
+        """
         self.displacement: NDArray[(2, Any), np.float64]
         self.force: NDArray[(2, Any), np.float64]
         self.stim_sessions: List[NDArray[(2, Any), int]] = []
@@ -90,9 +134,24 @@ class WellFile:
                 f"Invalid Post Stiffness {stiffness_factor}, must be in {POST_STIFFNESS_OVERRIDE_OPTIONS}"
             )
 
+        if retention not in BETA_1_RETENTION_POLICIES:
+            raise ValueError(f"Invalid retention: {retention}, must be one of {BETA_1_RETENTION_POLICIES}")
+
         self.has_inverted_post_magnet = has_inverted_post_magnet
         self.stiffness_override = stiffness_factor is not None
 
+        # only V1 files support lazy loading since the Beta 1 transforms are all run when the file is loaded
+        self.lazy = lazy
+        self._file_path = file_path
+        self._file_obj = file_obj
+        self._content_hash: Optional[str] = None
+        self._hash_contents = hash_contents
+        self._lazy_datasets: List[str] = []
+
+        self.retention = retention
+        self._noise_filter_block_size = noise_filter_block_size
+        self._beta_1_data: Dict[str, NDArray[(2, Any), Any]] = {}
+
         if file_path.endswith(".h5"):
             self.is_magnetic_data = True
 
@@ -121,7 +180,9 @@ class WellFile:
                     TSP_TO_DEFAULT_FILTER_UUID[self.tissue_sampling_period] if self.is_magnetic_data else None
                 )
                 self.filter_coefficients = (
-                    create_filter(self.noise_filter_uuid, self.tissue_sampling_period)
+                    NOISE_FILTER_BANK.get_sos_coefficients(
+                        self.noise_filter_uuid, self.tissue_sampling_period
+                    )
                     if self.noise_filter_uuid
                     else None
                 )
@@ -151,9 +212,8 @@ class WellFile:
                 self[uuid_] = val
 
         elif file_path.endswith(".xlsx"):
-            self._excel_sheet = _get_single_sheet(file_path)
             self.file_name = os.path.basename(file_path)
-            self.attrs = {k: v for k, v in _load_optical_file_attrs(self._excel_sheet).items()}
+            self.attrs = _load_optical_file_attrs(file_path)
             self.version = self[FILE_FORMAT_VERSION_METADATA_KEY]
             self.is_magnetic_data = False
             self.stiffness_factor = None
@@ -165,9 +225,12 @@ class WellFile:
             # timepoints still need to be in µs
             self.force[0] *= MICRO_TO_BASE_CONVERSION
 
+    def _open_h5_file(self) -> h5py.File:
+        return h5py.File(self._file_path if self._file_obj is None else self._file_obj, "r")
+
     def _load_data_from_h5_file(self, file_path: str) -> None:
-        with h5py.File(file_path, "r") as h5_file:
-            self.file_name = os.path.basename(h5_file.filename)
+        with self._open_h5_file() as h5_file:
+            self.file_name = os.path.basename(file_path)
             self.attrs = {attr: h5_file.attrs[attr] for attr in list(h5_file.attrs)}
             self.version = self[FILE_FORMAT_VERSION_METADATA_KEY]
 
@@ -183,7 +246,66 @@ class WellFile:
                     REFERENCE_SENSOR_READINGS,
                     STIMULATION_READINGS,
                 ):
-                    self[dataset] = h5_file[dataset][:]
+                    if self.lazy:
+                        # the data of this dataset will be read from the file the first time it is accessed
+                        if dataset in h5_file:
+                            self._lazy_datasets.append(dataset)
+                    else:
+                        self[dataset] = h5_file[dataset][:]
+
+        if self._hash_contents:
+            self.get_content_hash()
+        if not self._lazy_datasets:
+            # everything has been read, so no need to keep the in-memory file around
+            self._file_obj = None
+
+    def get_content_hash(self) -> str:
+        """Get a hash of the contents of the H5 file this WellFile was loaded from."""
+        if self._content_hash is None:
+            self._content_hash = hash_file_contents(
+                [self._file_path if self._file_obj is None else self._file_obj]
+            )
+        return self._content_hash
+
+    def read_dataset(
+        self,
+        dataset: str,
+        selection: Any = slice(None),
+        out: Optional[NDArray] = None,
+    ) -> NDArray:
+        """Read some or all of the given dataset without caching it.
+
+        Lazily loaded datasets that have not been accessed yet are read directly from the H5 file,
+        so only the selected data is ever loaded into memory.
+
+        Args:
+            dataset: the name of the dataset
+            selection: the hyperslab of the dataset to read. Reads the entire dataset by default
+            out: if given, the data will be read directly into this array
+
+        Returns:
+            The selected data. If `out` is given, it will be returned
+        """
+        if dataset not in self._lazy_datasets:
+            data = self[dataset][selection]
+            if out is None:
+                return data
+            out[...] = data.reshape(out.shape)
+            return out
+
+        with self._open_h5_file() as h5_file:
+            h5_dataset = h5_file[dataset]
+            if out is None:
+                return h5_dataset[selection]
+            h5_dataset.read_direct(out, source_sel=selection)
+            return out
+
+    def get_dataset_shape(self, dataset: str) -> Tuple[int, ...]:
+        """Get the shape of the given dataset without loading it into memory if it is lazily loaded."""
+        if dataset not in self._lazy_datasets:
+            return self[dataset].shape
+        with self._open_h5_file() as h5_file:
+            return h5_file[dataset].shape
 
     def _load_reading(self, h5_file, reading_type: str) -> NDArray[(Any, Any), int]:
         sampling_period = self[
@@ -201,6 +323,37 @@ class WellFile:
         return np.array([timepoints, tissue_contraction_amplitudes], dtype=np.int32)
 
     def _load_magnetic_data(self):
+        if self.retention == "full":
+            for name in BETA_1_DATA_NAMES:
+                getattr(self, name)
+
+        # displacement and force share a single time row. With the lean retention policy, the intermediate
+        # arrays of the chain are released as soon as this returns
+        waveforms = PlateWaveforms.from_array(
+            calculate_displacement_and_force_from_gmr(
+                self.noise_filtered_magnetic_data, stiffness_factor=self.stiffness_factor
+            )
+        )
+        self.displacement = waveforms.get_well_displacement(0)
+        self.force = waveforms.get_well_force(0)
+
+    def _get_beta_1_data(
+        self, name: str, compute_fn: Callable[[], NDArray[(2, Any), Any]]
+    ) -> NDArray[(2, Any), Any]:
+        if name in self._beta_1_data:
+            return self._beta_1_data[name]
+
+        data = compute_fn()
+        # the compressed arrays are small, so they are always kept once computed
+        if self.retention == "full" or name.startswith("compressed_"):
+            self._beta_1_data[name] = data
+        return data
+
+    @property
+    def raw_tissue_magnetic_data(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data("raw_tissue_magnetic_data", self._load_raw_tissue_magnetic_data)
+
+    def _load_raw_tissue_magnetic_data(self) -> NDArray[(2, Any), int]:
         adj_raw_tissue_reading = self[TISSUE_SENSOR_READINGS].copy()
 
         time_conversion = (
@@ -216,52 +369,92 @@ class WellFile:
         if self.has_inverted_post_magnet:
             adj_raw_tissue_reading[1] *= -1
 
-        self.raw_tissue_magnetic_data: NDArray[(2, Any), int] = adj_raw_tissue_reading
-        self.raw_reference_magnetic_data: NDArray[(2, Any), int] = self[REFERENCE_SENSOR_READINGS].copy()
+        return adj_raw_tissue_reading
 
-        self.sensitivity_calibrated_tissue_gmr: NDArray[(2, Any), int] = apply_sensitivity_calibration(
-            self.raw_tissue_magnetic_data
+    @property
+    def raw_reference_magnetic_data(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data(
+            "raw_reference_magnetic_data", lambda: self[REFERENCE_SENSOR_READINGS].copy()
         )
 
-        self.sensitivity_calibrated_reference_gmr: NDArray[(2, Any), int] = apply_sensitivity_calibration(
-            self.raw_reference_magnetic_data
+    @property
+    def sensitivity_calibrated_tissue_gmr(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data(
+            "sensitivity_calibrated_tissue_gmr",
+            lambda: apply_sensitivity_calibration(self.raw_tissue_magnetic_data),
         )
 
-        self.noise_cancelled_magnetic_data: NDArray[(2, Any), int] = noise_cancellation(
-            self.sensitivity_calibrated_tissue_gmr, self.sensitivity_calibrated_reference_gmr
+    @property
+    def sensitivity_calibrated_reference_gmr(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data(
+            "sensitivity_calibrated_reference_gmr",
+            lambda: apply_sensitivity_calibration(self.raw_reference_magnetic_data),
         )
 
-        self.fully_calibrated_magnetic_data: NDArray[(2, Any), int] = apply_empty_plate_calibration(
-            self.noise_cancelled_magnetic_data
+    @property
+    def noise_cancelled_magnetic_data(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data(
+            "noise_cancelled_magnetic_data",
+            lambda: noise_cancellation(
+                self.sensitivity_calibrated_tissue_gmr, self.sensitivity_calibrated_reference_gmr
+            ),
         )
 
-        self.noise_filtered_magnetic_data: NDArray[(2, Any), int]
+    @property
+    def fully_calibrated_magnetic_data(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data(
+            "fully_calibrated_magnetic_data",
+            lambda: apply_empty_plate_calibration(self.noise_cancelled_magnetic_data),
+        )
+
+    @property
+    def noise_filtered_magnetic_data(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data("noise_filtered_magnetic_data", self._load_noise_filtered_magnetic_data)
+
+    def _load_noise_filtered_magnetic_data(self) -> NDArray[(2, Any), int]:
         if self.noise_filter_uuid is None:
-            self.noise_filtered_magnetic_data = self.fully_calibrated_magnetic_data
-        else:
-            self.noise_filtered_magnetic_data = apply_noise_filtering(
-                self.fully_calibrated_magnetic_data, self.filter_coefficients
+            return self.fully_calibrated_magnetic_data
+        if self._noise_filter_block_size is not None:
+            return NOISE_FILTER_BANK.filter_in_blocks(
+                self.fully_calibrated_magnetic_data,
+                self.noise_filter_uuid,
+                self.tissue_sampling_period,
+                block_num_samples=self._noise_filter_block_size,
             )
+        return apply_noise_filtering(self.fully_calibrated_magnetic_data, self.filter_coefficients)
 
-        self.compressed_magnetic_data: NDArray[(2, Any), int] = compress_filtered_magnetic_data(
-            self.noise_filtered_magnetic_data
+    @property
+    def compressed_magnetic_data(self) -> NDArray[(2, Any), int]:
+        return self._get_beta_1_data(
+            "compressed_magnetic_data",
+            lambda: compress_filtered_magnetic_data(self.noise_filtered_magnetic_data),
         )
-        self.compressed_voltage: NDArray[(2, Any), np.float32] = calculate_voltage_from_gmr(
-            self.compressed_magnetic_data
-        )
-        self.compressed_displacement: NDArray[(2, Any), np.float32] = calculate_displacement_from_voltage(
-            self.compressed_voltage
+
+    @property
+    def compressed_voltage(self) -> NDArray[(2, Any), np.float32]:
+        return self._get_beta_1_data(
+            "compressed_voltage", lambda: calculate_voltage_from_gmr(self.compressed_magnetic_data)
         )
-        self.compressed_force: NDArray[(2, Any), np.float32] = calculate_force_from_displacement(
-            self.compressed_displacement, stiffness_factor=self.stiffness_factor, in_mm=False
+
+    @property
+    def compressed_displacement(self) -> NDArray[(2, Any), np.float32]:
+        return self._get_beta_1_data(
+            "compressed_displacement", lambda: calculate_displacement_from_voltage(self.compressed_voltage)
         )
 
-        self.voltage: NDArray[(2, Any), np.float32] = calculate_voltage_from_gmr(
-            self.noise_filtered_magnetic_data
+    @property
+    def compressed_force(self) -> NDArray[(2, Any), np.float32]:
+        return self._get_beta_1_data(
+            "compressed_force",
+            lambda: calculate_force_from_displacement(
+                self.compressed_displacement, stiffness_factor=self.stiffness_factor, in_mm=False
+            ),
         )
-        self.displacement: NDArray[(2, Any), np.float64] = calculate_displacement_from_voltage(self.voltage)
-        self.force: NDArray[(2, Any), np.float64] = calculate_force_from_displacement(
-            self.displacement, stiffness_factor=self.stiffness_factor, in_mm=False
+
+    @property
+    def voltage(self) -> NDArray[(2, Any), np.float32]:
+        return self._get_beta_1_data(
+            "voltage", lambda: calculate_voltage_from_gmr(self.noise_filtered_magnetic_data)
         )
 
     def get(self, key, default=None) -> Any:
@@ -272,7 +465,7 @@ class WellFile:
 
     def __contains__(self, key):
         key = str(key) if isinstance(key, uuid.UUID) else key
-        return key in self.attrs
+        return key in self.attrs or key in self._lazy_datasets
 
     def __setitem__(self, key, newvalue):
         key = str(key) if isinstance(key, uuid.UUID) else key
@@ -280,6 +473,10 @@ class WellFile:
 
     def __getitem__(self, i):
         i = str(i) if isinstance(i, uuid.UUID) else i
+        if i in self._lazy_datasets:
+            # lazily loaded datasets are cached after the first access
+            self.attrs[i] = self.read_dataset(i)
+            self._lazy_datasets.remove(i)
         return self.attrs[i]
 
     def _extract_datetime(self, metadata_uuid: uuid.UUID) -> datetime.datetime:
@@ -320,6 +517,192 @@ class WellFile:
         )
 
 
+class PlateWaveforms:
+    """The displacement and force data of every well in a plate, stored in a single contiguous array.
+
+    All wells share a single time vector. The first row of the array contains the time indices, followed by
+    one row of displacement data per well and then one row of force data per well.
+
+    Args:
+        time_indices: time indices shared by every well
+        displacement: displacement data with one row per well
+        force: force data with one row per well
+    """
+
+    def __init__(
+        self,
+        time_indices: NDArray[(Any,), float],
+        displacement: NDArray[(Any, Any), float],
+        force: NDArray[(Any, Any), float],
+    ):
+        if displacement.shape != force.shape:
+            raise ValueError("'displacement' and 'force' must have the same shape")
+        if displacement.shape[-1] != len(time_indices):
+            raise ValueError("'time_indices' must have the same number of samples as each well")
+
+        num_wells, num_samples = displacement.shape
+        data = np.empty((1 + 2 * num_wells, num_samples), dtype=np.float64)
+        data[0] = time_indices
+        data[1 : num_wells + 1] = displacement
+        data[num_wells + 1 :] = force
+
+        self.data = data
+
+    @classmethod
+    def from_array(cls, data: NDArray[(Any, Any), float]) -> "PlateWaveforms":
+        """Create a PlateWaveforms from an array previously created by another PlateWaveforms without copying it.
+
+        Args:
+            data: the `data` attribute of a PlateWaveforms
+
+        Returns:
+            A PlateWaveforms which uses the given array as its data
+        """
+        if data.ndim != 2 or data.shape[0] % 2 != 1:
+            raise ValueError("'data' must have one time row followed by two rows per well")
+
+        plate_waveforms = cls.__new__(cls)
+        plate_waveforms.data = data
+        return plate_waveforms
+
+    @property
+    def num_wells(self) -> int:
+        return (self.data.shape[0] - 1) // 2
+
+    @property
+    def time_indices(self) -> NDArray[(Any,), float]:
+        return self.data[0]
+
+    @property
+    def displacement(self) -> NDArray[(Any, Any), float]:
+        return self.data[1 : self.num_wells + 1]
+
+    @property
+    def force(self) -> NDArray[(Any, Any), float]:
+        return self.data[self.num_wells + 1 :]
+
+    def get_well_displacement(self, well_idx: int) -> NDArray[(2, Any), float]:
+        """Get a read-only view of the time indices and displacement data of a single well."""
+        return self._get_well_view(1 + well_idx)
+
+    def get_well_force(self, well_idx: int) -> NDArray[(2, Any), float]:
+        """Get a read-only view of the time indices and force data of a single well."""
+        return self._get_well_view(1 + self.num_wells + well_idx)
+
+    def _get_well_view(self, row_idx: int) -> NDArray[(2, Any), float]:
+        # the time row is shared by every well, so the views are read-only to prevent modifying one well's
+        # time indices from also modifying those of every other well
+        return np.lib.stride_tricks.as_strided(
+            self.data,
+            shape=(2, self.data.shape[1]),
+            strides=(row_idx * self.data.strides[0], self.data.strides[1]),
+            writeable=False,
+        )
+
+
+class WaveformPyramid:
+    """Min/max envelopes of waveforms which share time indices, at power-of-two decimations.
+
+    Zoomed-out views of the waveforms can be drawn from the envelope of a level with a few thousand buckets
+    instead of from every sample. Bucket i of a level with a bucket size of n contains the min and max of
+    samples i*n to (i+1)*n - 1 of each waveform. The bucket size of level 0 is `min_bucket_size`, and it
+    doubles at each level after.
+
+    Args:
+        time_indices: time indices shared by every waveform
+        levels: the min/max array of each level created by transforms.create_min_max_pyramid
+        min_bucket_size: number of samples in each bucket of level 0
+    """
+
+    def __init__(
+        self,
+        time_indices: NDArray[(Any,), float],
+        levels: List[NDArray[(2, Any, Any), float]],
+        min_bucket_size: int,
+    ):
+        self.time_indices = time_indices
+        self.levels = levels
+        self.min_bucket_size = min_bucket_size
+
+    @classmethod
+    def from_waveforms(
+        cls,
+        time_indices: NDArray[(Any,), float],
+        waveforms: NDArray[(Any, Any), float],
+        min_bucket_size: int = MIN_PYRAMID_BUCKET_NUM_SAMPLES,
+        max_top_level_num_buckets: int = MAX_PYRAMID_TOP_LEVEL_NUM_BUCKETS,
+    ) -> "WaveformPyramid":
+        """Create the pyramid of the given waveforms.
+
+        Args:
+            time_indices: time indices shared by every waveform
+            waveforms: the values of each waveform, one row per waveform
+            min_bucket_size: number of samples in each bucket of level 0. Must be a power of two
+            max_top_level_num_buckets: levels are added until one has at most this many buckets
+
+        Returns:
+            The pyramid of the waveforms
+        """
+        levels = create_min_max_pyramid(waveforms, min_bucket_size, max_top_level_num_buckets)
+        return cls(time_indices, levels, min_bucket_size)
+
+    @classmethod
+    def from_dict(cls, time_indices: NDArray[(Any,), float], arrays: Dict[str, NDArray]) -> "WaveformPyramid":
+        """Create a pyramid from the arrays returned by `to_dict`, such as after loading them from disk.
+
+        Args:
+            time_indices: time indices shared by every waveform, which are not included in `to_dict`
+            arrays: the arrays returned by `to_dict`
+
+        Returns:
+            A pyramid which uses the given arrays as its levels without copying them
+        """
+        num_levels = sum(name.startswith("level_") for name in arrays)
+        levels = [arrays[f"level_{level}"] for level in range(num_levels)]
+        return cls(time_indices, levels, int(arrays["min_bucket_size"]))
+
+    def to_dict(self) -> Dict[str, NDArray]:
+        """Get the arrays of this pyramid by name so they can be stored alongside the waveform data."""
+        arrays = {"min_bucket_size": np.array(self.min_bucket_size)}
+        for level, level_arr in enumerate(self.levels):
+            arrays[f"level_{level}"] = level_arr
+        return arrays
+
+    @property
+    def num_levels(self) -> int:
+        return len(self.levels)
+
+    def get_bucket_size(self, level: int) -> int:
+        return self.min_bucket_size * 2**level
+
+    def select_level(self, max_num_buckets: int) -> int:
+        """Get the most detailed level with at most the given number of buckets, or else the last level."""
+        for level, level_arr in enumerate(self.levels):
+            if level_arr.shape[-1] <= max_num_buckets:
+                return level
+        return self.num_levels - 1
+
+    def get_level(
+        self, level: int
+    ) -> Tuple[NDArray[(Any,), float], NDArray[(Any, Any), float], NDArray[(Any, Any), float]]:
+        """Get the envelope of every waveform at the given level.
+
+        Returns:
+            The time index of the first sample in each bucket, the min of each bucket, and the max of each
+            bucket. The mins and maxes have one row per waveform
+        """
+        mins, maxs = self.levels[level]
+        return self.time_indices[:: self.get_bucket_size(level)], mins, maxs
+
+    def get_row(self, row_idx: int) -> "WaveformPyramid":
+        """Get the pyramid of a single waveform without copying any data."""
+        return WaveformPyramid(
+            self.time_indices,
+            [level_arr[:, row_idx : row_idx + 1] for level_arr in self.levels],
+            self.min_bucket_size,
+        )
+
+
 class PlateRecording:
     def __init__(
         self,
@@ -331,9 +714,71 @@ class PlateRecording:
         stiffness_factor: Optional[int] = None,
         inverted_post_magnet_wells: Optional[List[str]] = None,
         well_groups: Optional[Dict[str, List[str]]] = None,
+        load_workers: Optional[int] = None,
+        load_executor_type: Literal["thread", "process"] = "thread",
+        lazy_load: Optional[bool] = None,
+        max_in_memory_zip_member_size: int = DEFAULT_MAX_IN_MEMORY_ZIP_MEMBER_SIZE,
+        baseline_cache: Optional[ArrayCache] = None,
+        waveform_cache: Optional[WaveformCache] = None,
+        chunked_magnet_finding: bool = False,
+        magnet_finding_report: Optional[MagnetFindingReport] = None,
+        preview_decimation_factor: int = 1,
+        ingest_chunk_size: Optional[int] = None,
     ):
+        """Load and process the data of a single recording.
+
+        Args:
+            path: path to a zip file, an xlsx file, or a dir of H5 files
+            recording_df: previously processed data of this recording created by to_dataframe
+            start_time: the time in seconds of the beginning of the recording snapshot
+            end_time: the time in seconds of the end of the recording snapshot
+            stiffness_factor: post stiffness factor override
+            inverted_post_magnet_wells: names of wells which have an inverted magnet in their post
+            well_groups: override for the platemap groups stored in the H5 files
+            load_workers: number of workers to load the H5 files with
+            load_executor_type: whether to load the H5 files with a pool of threads or processes
+            lazy_load: if True, the datasets of V1 H5 files will only be read from disk when first accessed.
+                If loading from a zip file, the H5 files are extracted to a temporary dir, so any datasets that
+                are not accessed while processing the data will not be accessible after __init__ completes since
+                the extracted files are deleted at that point. If not specified, files will only be loaded lazily
+                when a start or end time or a waveform cache is given so that only the data needed is read
+            max_in_memory_zip_member_size: H5 files in a zip file larger than this many bytes will be extracted
+                to disk instead of being loaded into memory. Ignored when lazy loading
+            baseline_cache: cache for the baseline data created from the calibration recordings of V1 files.
+                Passing the same cache to multiple PlateRecordings which share a calibration set allows the
+                calibration data to only be read once
+            waveform_cache: cache for the displacement, force, and stim session arrays of V1 recordings. Entries
+                are keyed by the contents of the input files, the args which affect those arrays, and the
+                version of this package, so repeat analyses of the same recording can skip magnet finding.
+                The contents of the input files are only hashed if their paths, sizes, or modification times
+                have changed since they were last cached
+            chunked_magnet_finding: if True, the magnet positions of V1 recordings will be solved in overlapping
+                chunks of time in a pool of processes. The number of workers and the chunk size are chosen
+                automatically from the number of cores and the amount of free memory
+            magnet_finding_report: report to record the wall time and memory usage of each phase of magnet
+                finding in. If not given, a report which only records wall time is created. Either way, it is
+                accessible as the magnet_finding_report attribute. If the waveforms are loaded from the
+                waveform_cache, the phases and chunks of the run which created the entry are added to it
+            preview_decimation_factor: if greater than 1, the magnetometer data of V1 recordings will be low-pass
+                filtered and decimated by this factor before magnet finding, and the resulting displacement and
+                force will be upsampled back onto the interpolated data period. This gives an approximate result
+                in a fraction of the time, so it is intended for quick previews such as recording snapshots
+            ingest_chunk_size: if given, the magnetometer data of V1 recordings will be read, fixed, converted, and
+                filtered this many samples at a time so that the memory used while preparing the data for magnet
+                finding does not grow with the length of the recording. Works best with lazy_load=True. The GMR
+                data of Beta 1 recordings will instead be noise filtered this many samples at a time
+        """
         self.path = path
         self.wells: List[WellFile] = []
+        # only set for V1 recordings whose data was processed together
+        self.plate_waveforms: Optional[PlateWaveforms] = None
+        self._force_pyramid: Optional[WaveformPyramid] = None
+        self._well_force_pyramids: Dict[int, WaveformPyramid] = {}
+        self.magnet_finding_report = (
+            magnet_finding_report if magnet_finding_report is not None else MagnetFindingReport()
+        )
+        # number of dropped samples in each channel. Only set for V1 recordings whose data was processed
+        self.dropped_sample_counts: Optional[NDArray[(NUM_CHANNELS_24_WELL_PLATE,), int]] = None
         self._iter = 0
         # these may get overwritten later
         self.is_optical_recording = False
@@ -349,72 +794,236 @@ class PlateRecording:
         self.start_time_secs = start_time
         self.end_time_secs = end_time
 
-        self._created_from_dataframe = recording_df is not None
+        if not isinstance(preview_decimation_factor, int) or preview_decimation_factor < 1:
+            raise ValueError("'preview_decimation_factor' must be an int >= 1")
+        # reported alongside the data so that consumers know whether it is approximate
+        self.decimation_factor = preview_decimation_factor
 
-        if self.path.endswith(".zip"):
-            with tempfile.TemporaryDirectory() as tmpdir:
-                zf = zipfile.ZipFile(path)
-                zf.extractall(path=tmpdir)
+        if ingest_chunk_size is not None and ingest_chunk_size < 1:
+            raise ValueError("'ingest_chunk_size' must be >= 1")
 
-                if glob.glob(os.path.join(tmpdir, "**", "*.h5"), recursive=True):
-                    self.wells, calibration_recordings = load_files(
-                        tmpdir, stiffness_factor, inverted_post_magnet_wells
+        if lazy_load is None:
+            # if the waveforms are already cached, no data needs to be read from the recording files at all
+            lazy_load = start_time > 0 or end_time is not None or waveform_cache is not None
+
+        self._created_from_dataframe = recording_df is not None
+        self._baseline_cache = baseline_cache
+        self._chunked_magnet_finding = chunked_magnet_finding
+        self._ingest_chunk_size = ingest_chunk_size
+
+        with ExitStack() as exit_stack:
+            if self.path.endswith(".zip"):
+                # lazily loaded WellFiles may read from files extracted from the zip while the plate data is
+                # being processed, so the extracted files must not be removed until the end of __init__
+                tmpdir = exit_stack.enter_context(tempfile.TemporaryDirectory())
+
+                with zipfile.ZipFile(path) as zf:
+                    contains_h5_files = bool(_get_h5_zip_members(zf))
+                    if not contains_h5_files:
+                        zf.extractall(path=tmpdir)
+
+                if contains_h5_files:
+                    self.wells, calibration_recordings = load_files_from_zip(
+                        self.path,
+                        stiffness_factor,
+                        inverted_post_magnet_wells,
+                        num_workers=load_workers,
+                        executor_type=load_executor_type,
+                        lazy=lazy_load,
+                        max_in_memory_member_size=max_in_memory_zip_member_size,
+                        scratch_dir=tmpdir,
+                        noise_filter_block_size=ingest_chunk_size,
+                        # the baseline cache is keyed by the contents of the calibration files
+                        hash_calibration_files=baseline_cache is not None,
                     )
                 elif xlsx_files := glob.glob(os.path.join(tmpdir, "**", "*.xlsx"), recursive=True):
-                    self._load_optical_well_files(xlsx_files, stiffness_factor)
-        elif self.path.endswith(".xlsx"):  # optical file
-            self._load_optical_well_files([self.path], stiffness_factor)
-        else:  # .h5 files
-            self.wells, calibration_recordings = load_files(
-                self.path, stiffness_factor, inverted_post_magnet_wells
-            )
+                    self._load_optical_well_files(
+                        xlsx_files,
+                        stiffness_factor,
+                        num_workers=load_workers,
+                        executor_type=load_executor_type,
+                    )
+            elif self.path.endswith(".xlsx"):  # optical file
+                self._load_optical_well_files([self.path], stiffness_factor)
+            else:  # .h5 files
+                self.wells, calibration_recordings = load_files(
+                    self.path,
+                    stiffness_factor,
+                    inverted_post_magnet_wells,
+                    num_workers=load_workers,
+                    executor_type=load_executor_type,
+                    lazy=lazy_load,
+                    noise_filter_block_size=ingest_chunk_size,
+                    hash_calibration_files=baseline_cache is not None,
+                )
 
-        # make sure at least one WellFile was loaded
-        if not any(self.wells):
-            raise NoRecordingFilesLoadedError()
+            # make sure at least one WellFile was loaded
+            if not any(self.wells):
+                raise NoRecordingFilesLoadedError()
 
-        if len(self.wells) > len(set(w[WELL_NAME_UUID] for w in self.wells)):
-            raise DuplicateWellsFoundError()
+            if len(self.wells) > len(set(w[WELL_NAME_UUID] for w in self.wells)):
+                raise DuplicateWellsFoundError()
 
-        # ensure wells are in correct order A1, B1,.., A2, B2,...
-        self.wells.sort(key=lambda w: (int(w[WELL_NAME_UUID][1:]), w[WELL_NAME_UUID][0]))
+            # ensure wells are in correct order A1, B1,.., A2, B2,...
+            self.wells.sort(key=lambda w: (int(w[WELL_NAME_UUID][1:]), w[WELL_NAME_UUID][0]))
 
-        # set up platemap info
-        first_avaliable_well = next(iter(self))
-        self.platemap_name = first_avaliable_well[PLATEMAP_NAME_UUID]
-        platemap_labels = defaultdict(list)
+            # set up platemap info
+            first_avaliable_well = next(iter(self))
+            self.platemap_name = first_avaliable_well[PLATEMAP_NAME_UUID]
+            platemap_labels = defaultdict(list)
 
-        for well_file in self:
-            if well_groups is None:
-                label = well_file[PLATEMAP_LABEL_UUID]
-                # only add to platemap_labels if label has been assigned
-                if label != NOT_APPLICABLE_LABEL:
-                    platemap_labels[label].append(well_file[WELL_NAME_UUID])
-            else:
-                # default all labels to NA first
-                well_file[PLATEMAP_LABEL_UUID] = NOT_APPLICABLE_LABEL
-                for label, well_names in well_groups.items():
-                    if well_file[WELL_NAME_UUID] in well_names:
-                        well_file[PLATEMAP_LABEL_UUID] = label
+            for well_file in self:
+                if well_groups is None:
+                    label = well_file[PLATEMAP_LABEL_UUID]
+                    # only add to platemap_labels if label has been assigned
+                    if label != NOT_APPLICABLE_LABEL:
                         platemap_labels[label].append(well_file[WELL_NAME_UUID])
+                else:
+                    # default all labels to NA first
+                    well_file[PLATEMAP_LABEL_UUID] = NOT_APPLICABLE_LABEL
+                    for label, well_names in well_groups.items():
+                        if well_file[WELL_NAME_UUID] in well_names:
+                            well_file[PLATEMAP_LABEL_UUID] = label
+                            platemap_labels[label].append(well_file[WELL_NAME_UUID])
+
+            self.platemap_labels = dict(platemap_labels)
+
+            # currently file versions 1.0.0 and above must have all their data processed together
+            if not self.is_optical_recording and self.wells[0].version >= VersionInfo.parse("1.0.0"):
+                if self._created_from_dataframe:
+                    self._load_dataframe(recording_df)
+                else:
+                    waveform_cache_key = waveform_cache_alias = None
+                    if waveform_cache is not None:
+                        waveform_cache_args = (
+                            PACKAGE_VERSION,
+                            start_time,
+                            end_time,
+                            stiffness_factor,
+                            sorted(inverted_post_magnet_wells or []),
+                            chunked_magnet_finding,
+                            preview_decimation_factor,
+                            ingest_chunk_size,
+                        )
+                        input_files = _get_recording_input_files(self.path)
+                        # the stats of the input files are much cheaper to get than a hash of their contents,
+                        # so first look for an entry created from the same files without any modifications since
+                        waveform_cache_alias = create_cache_key(
+                            *waveform_cache_args, get_file_stats(input_files)
+                        )
+                        waveform_cache_key = waveform_cache.get_alias(waveform_cache_alias)
+                        if waveform_cache_key is None or waveform_cache_key not in waveform_cache:
+                            waveform_cache_key = create_cache_key(
+                                *waveform_cache_args, hash_file_contents(input_files)
+                            )
+
+                    if waveform_cache_key is None or not self._load_cached_waveforms(
+                        waveform_cache, waveform_cache_key  # type: ignore
+                    ):
+                        self._process_plate_data(calibration_recordings)
+
+                        if self.wells[0][FILE_FORMAT_VERSION_METADATA_KEY] >= VersionInfo.parse(
+                            MIN_FILE_VERSION_FOR_STIM_INTERPOLATION
+                        ):
+                            self._process_stim_data()
+
+                        self._handle_removal_of_initial_padding()
+
+                        if waveform_cache_key is not None:
+                            self._cache_waveforms(waveform_cache, waveform_cache_key)  # type: ignore
+
+                    if waveform_cache_alias is not None:
+                        waveform_cache.set_alias(waveform_cache_alias, waveform_cache_key)  # type: ignore
+
+                self.contains_stim_data = any(wf.stim_sessions for wf in self)
+
+    def _load_cached_waveforms(self, waveform_cache: WaveformCache, cache_key: str) -> bool:
+        if (cached_waveforms := waveform_cache.get(cache_key)) is None:
+            return False
+        if "plate_waveforms" not in cached_waveforms:
+            return False
+
+        log.info("Using cached waveforms")
+        self._set_plate_waveforms(PlateWaveforms.from_array(cached_waveforms["plate_waveforms"]))
+        # restore the results of the run which created the entry
+        if "dropped_sample_counts" in cached_waveforms:
+            self.dropped_sample_counts = np.array(cached_waveforms["dropped_sample_counts"])
+        if "magnet_finding_report" in cached_waveforms:
+            cached_report = json.loads(cached_waveforms["magnet_finding_report"].tobytes())
+            self.magnet_finding_report.phases.update(cached_report["phases"])
+            self.magnet_finding_report.chunks.extend(cached_report["chunks"])
+        cached_pyramid = {
+            name.split("__", 1)[1]: arr
+            for name, arr in cached_waveforms.items()
+            if name.startswith("force_pyramid__")
+        }
+        if cached_pyramid:
+            self._force_pyramid = WaveformPyramid.from_dict(
+                self.plate_waveforms.time_indices, cached_pyramid  # type: ignore
+            )
+        for well_idx, well_file in enumerate(self.wells):
+            num_stim_sessions = sum(name.startswith(f"{well_idx}__stim_") for name in cached_waveforms)
+            well_file.stim_sessions = [
+                cached_waveforms[f"{well_idx}__stim_{session_idx}"]
+                for session_idx in range(num_stim_sessions)
+            ]
+        return True
+
+    def _cache_waveforms(self, waveform_cache: WaveformCache, cache_key: str) -> None:
+        waveforms = {
+            "plate_waveforms": self.plate_waveforms.data,  # type: ignore
+            "dropped_sample_counts": self.dropped_sample_counts,
+            # only arrays can be stored, so store the report as JSON encoded bytes
+            "magnet_finding_report": np.frombuffer(
+                json.dumps(self.magnet_finding_report.to_dict()).encode(), dtype=np.uint8
+            ),
+        }
+        # store the pyramid too so that zoomed-out views of cached recordings can be drawn right away
+        for name, arr in self.get_force_pyramid().to_dict().items():
+            waveforms[f"force_pyramid__{name}"] = arr
+        for well_idx, well_file in enumerate(self.wells):
+            for session_idx, stim_session in enumerate(well_file.stim_sessions):
+                waveforms[f"{well_idx}__stim_{session_idx}"] = stim_session
+        waveform_cache.set(cache_key, waveforms)
+
+    def _set_plate_waveforms(self, plate_waveforms: PlateWaveforms) -> None:
+        self.plate_waveforms = plate_waveforms
+        self._force_pyramid = None
+        for well_idx, well_file in enumerate(self.wells):
+            well_file.displacement = plate_waveforms.get_well_displacement(well_idx)
+            well_file.force = plate_waveforms.get_well_force(well_idx)
+
+    def get_force_pyramid(self, well_idx: Optional[int] = None) -> WaveformPyramid:
+        """Get the min/max envelopes of the force data at power-of-two decimations for zoomed-out views.
+
+        The pyramid is created the first time it is requested. For V1 recordings, the pyramid of every well is
+        created at once since all wells share the same time indices.
 
-        self.platemap_labels = dict(platemap_labels)
-
-        # currently file versions 1.0.0 and above must have all their data processed together
-        if not self.is_optical_recording and self.wells[0].version >= VersionInfo.parse("1.0.0"):
-            if self._created_from_dataframe:
-                self._load_dataframe(recording_df)
-            else:
-                self._process_plate_data(calibration_recordings)
+        Args:
+            well_idx: the index of the well to get the pyramid of. Can only be None for V1 recordings, in
+                which case the pyramid will contain one row per well
 
-                if self.wells[0][FILE_FORMAT_VERSION_METADATA_KEY] >= VersionInfo.parse(
-                    MIN_FILE_VERSION_FOR_STIM_INTERPOLATION
-                ):
-                    self._process_stim_data()
+        Returns:
+            The pyramid of the force data
+        """
+        if self.plate_waveforms is not None:
+            if self._force_pyramid is None:
+                self._force_pyramid = WaveformPyramid.from_waveforms(
+                    self.plate_waveforms.time_indices, self.plate_waveforms.force
+                )
+            return self._force_pyramid if well_idx is None else self._force_pyramid.get_row(well_idx)
 
-                self._handle_removal_of_initial_padding()
+        if well_idx is None:
+            raise ValueError(
+                "The wells of this recording do not share time indices, so a well index must be given"
+            )
 
-            self.contains_stim_data = any(wf.stim_sessions for wf in self)
+        if well_idx not in self._well_force_pyramids:
+            well_force = self.wells[well_idx].force
+            self._well_force_pyramids[well_idx] = WaveformPyramid.from_waveforms(
+                well_force[0], well_force[1:]
+            )
+        return self._well_force_pyramids[well_idx]
 
     def _process_plate_data(self, calibration_recordings):
         if not all(isinstance(well_file, WellFile) for well_file in self.wells) or len(self.wells) != 24:
@@ -436,45 +1045,111 @@ class PlateRecording:
         end_idx = int(self.end_time_secs * sampling_freq) if self.end_time_secs else None
         analysis_window = slice(start_idx, end_idx)
 
-        # load tissue data
-        plate_data_array = format_well_file_data(self.wells)[:, analysis_window]
-        fixed_plate_data_array = fix_dropped_samples(plate_data_array)
-        plate_data_array_mt = calculate_magnetic_flux_density_from_memsic(fixed_plate_data_array)
-        # load 'calibration' data
-        baseline_data = format_well_file_data(calibration_recordings)
-        baseline_data_mt = calculate_magnetic_flux_density_from_memsic(baseline_data)
+        if self._ingest_chunk_size is None:
+            # load tissue data. Only the samples in the analysis window are read from lazily loaded files
+            plate_data_array = format_well_file_data(self.wells, analysis_window)
+            with self.magnet_finding_report.measure_phase("fix_dropped_samples"):
+                # the plate data array is not used anywhere else, so it is safe to fix it in place
+                fixed_plate_data_array, self.dropped_sample_counts = fix_dropped_samples(
+                    plate_data_array, in_place=True, return_counts=True
+                )
+            with self.magnet_finding_report.measure_phase("memsic_conversion"):
+                plate_data_array_mt = calculate_magnetic_flux_density_from_memsic(fixed_plate_data_array)
+            if self.decimation_factor > 1:
+                with self.magnet_finding_report.measure_phase("decimation"):
+                    plate_data_array_mt = decimate_plate_data(plate_data_array_mt, self.decimation_factor)
+            # load 'calibration' data
+            baseline_data_mt = self._get_baseline_data(calibration_recordings)
+            # the input filter is designed for the original sampling rate, and decimation already low-pass
+            # filters the data, so only filter the inputs if the data was not decimated
+            filter_inputs = self.decimation_factor == 1
+        else:
+            baseline_data_mt = self._get_baseline_data(calibration_recordings)
+            with self.magnet_finding_report.measure_phase("streaming_ingest"):
+                # the data is filtered (or decimated) and has the baseline subtracted while being streamed
+                plate_data_array_mt, self.dropped_sample_counts = stream_plate_data(
+                    self.wells,
+                    baseline_data_mt,
+                    analysis_window,
+                    chunk_size=self._ingest_chunk_size,
+                    decimation_factor=self.decimation_factor,
+                )
+            baseline_data_mt = None
+            filter_inputs = False
 
-        # create baseline data array
-        baseline_data_mt = np.mean(baseline_data_mt[:, -BASELINE_MEAN_NUM_DATA_POINTS:], axis=1)
+        if num_dropped_samples := int(self.dropped_sample_counts.sum()):
+            num_channels = np.count_nonzero(self.dropped_sample_counts)
+            log.info(f"Fixed {num_dropped_samples} dropped samples in {num_channels} channels")
 
         try:
             # pass data into magnet finding alg
             log.info("Estimating magnet positions")
             estimated_magnet_positions = find_magnet_positions(
-                plate_data_array_mt, baseline_data_mt, initial_magnet_finding_params
+                plate_data_array_mt,
+                baseline_data_mt,
+                initial_magnet_finding_params,
+                filter_inputs=filter_inputs,
+                chunked=self._chunked_magnet_finding,
+                report=self.magnet_finding_report,
             )
         except UnableToConvergeError:
-            log.exception("Unable to converge due to bad quality of data")
+            log.exception(
+                "Unable to converge due to bad quality of data",
+                magnet_finding_report=self.magnet_finding_report.to_dict(),
+            )
             raise
 
         flip_data = self.wells[0].version >= VersionInfo.parse("1.1.0")
 
-        # create displacement and force arrays for each WellFile
+        # create displacement and force arrays for the whole plate
         log.info("Create diplacement and force data for each well")
-        for well_idx, well_file in enumerate(self):
-            x = estimated_magnet_positions["X"][:, well_idx]
-            if flip_data:
-                x *= -1
+        displacement = estimated_magnet_positions["X"].T
+        if flip_data:
+            displacement = displacement * -1
+
+        # all wells share the same time indices. Have them start at 0
+        time_indices = self.wells[0].read_dataset(TIME_INDICES, analysis_window)
+        adjusted_time_indices = time_indices - time_indices[0]
+
+        if self.decimation_factor > 1:
+            # upsample the decimated displacement back onto the same period as the rest of the analysis uses
+            decimated_time_indices = adjusted_time_indices[:: self.decimation_factor]
+            adjusted_time_indices = np.arange(0, decimated_time_indices[-1] + 1, INTERPOLATED_DATA_PERIOD_US)
+            displacement = np.array(
+                [
+                    np.interp(adjusted_time_indices, decimated_time_indices, well_displacement)
+                    for well_displacement in displacement
+                ]
+            )
 
-            # have time indices start at 0
-            time_indices = well_file[TIME_INDICES]
-            adjusted_time_indices = time_indices[analysis_window] - time_indices[start_idx]
+        stiffness_factors = np.array([well_file.stiffness_factor for well_file in self])
+        force = convert_displacement_to_force(displacement, stiffness_factor=stiffness_factors[:, np.newaxis])
 
-            well_file.displacement = np.array([adjusted_time_indices, x])
+        self._set_plate_waveforms(PlateWaveforms(adjusted_time_indices, displacement, force))
 
-            well_file.force = calculate_force_from_displacement(
-                well_file.displacement, stiffness_factor=well_file.stiffness_factor
+    def _get_baseline_data(self, calibration_recordings: List[WellFile]) -> NDArray[(Any,), float]:
+        cache_key = None
+        if self._baseline_cache is not None:
+            cache_key = create_cache_key(
+                BASELINE_MEAN_NUM_DATA_POINTS, *(wf.get_content_hash() for wf in calibration_recordings)
             )
+            if (baseline_data_mt := self._baseline_cache.get(cache_key)) is not None:
+                log.info("Using cached baseline data")
+                return baseline_data_mt
+
+        # only the end of each calibration recording is used, so no need to load anything else
+        baseline_data = format_well_file_data(
+            calibration_recordings, slice(-BASELINE_MEAN_NUM_DATA_POINTS, None)
+        )
+        baseline_data_mt = calculate_magnetic_flux_density_from_memsic(baseline_data)
+
+        # create baseline data array
+        baseline_data_mt = np.mean(baseline_data_mt, axis=1)
+
+        if cache_key is not None:
+            self._baseline_cache.set(cache_key, baseline_data_mt)  # type: ignore
+
+        return baseline_data_mt
 
     def _process_stim_data(self) -> None:
         log.info("Interpolating stim sessions")
@@ -483,11 +1158,11 @@ class PlateRecording:
         end_time_us = (
             int(self.end_time_secs * MICRO_TO_BASE_CONVERSION)
             if self.end_time_secs
-            else self.wells[0][TIME_INDICES][-1]
+            else self.wells[0].read_dataset(TIME_INDICES, -1)
         )
 
         for wf in self:
-            if not wf[STIMULATION_READINGS].shape[-1]:
+            if not wf.get_dataset_shape(STIMULATION_READINGS)[-1]:
                 continue
 
             stim_protocol = json.loads(wf[STIMULATION_PROTOCOL_UUID])
@@ -506,7 +1181,7 @@ class PlateRecording:
             for waveform in stim_sessions_waveforms:
                 if not waveform.shape[-1]:
                     continue
-                waveform[0] -= wf[TIME_INDICES][0]
+                waveform[0] -= wf.read_dataset(TIME_INDICES, 0)
                 waveform[1] /= charge_conversion_factor
                 wf.stim_sessions.append(waveform)
 
@@ -515,16 +1190,15 @@ class PlateRecording:
         if not num_us_to_trim_from_start:
             return
 
-        for well_file in self:
-            well_file.displacement = well_file.displacement[
-                :, well_file.displacement[0] >= num_us_to_trim_from_start
-            ]
-            well_file.force = well_file.force[:, well_file.force[0] >= num_us_to_trim_from_start]
+        plate_data = self.plate_waveforms.data  # type: ignore
+        plate_data = plate_data[:, plate_data[0] >= num_us_to_trim_from_start]
 
-            shift_amount = well_file.force[0, 0]
+        shift_amount = plate_data[0, 0]
 
-            well_file.force -= shift_amount
-            well_file.displacement -= shift_amount
+        plate_data -= shift_amount
+        self._set_plate_waveforms(PlateWaveforms.from_array(plate_data))
+
+        for well_file in self:
             for stim_session_arr in well_file.stim_sessions:
                 stim_session_arr[0] -= shift_amount
 
@@ -557,18 +1231,26 @@ class PlateRecording:
                 stim_session = stim_session_raw[:, ~np.isnan(stim_session_raw[1])].astype(int)
                 wf.stim_sessions.append(stim_session)
 
-    def _load_optical_well_files(self, file_paths: List[str], stiffness_factor: Union[int, None]):
+    def _load_optical_well_files(
+        self,
+        file_paths: List[str],
+        stiffness_factor: Union[int, None],
+        num_workers: Optional[int] = None,
+        executor_type: Literal["thread", "process"] = "thread",
+    ):
         self.is_optical_recording = True
 
-        for xlsx_path in file_paths:
-            # check if xlsx is correct format and not pulse3d output file
-            if _get_num_of_sheets(xlsx_path) > 1:
-                raise IncorrectOpticalFileFormatError(
-                    f"Incorrect number of sheets found for file {os.path.basename(xlsx_path)}"
-                )
-
-            well_file = WellFile(xlsx_path, stiffness_factor=stiffness_factor)
-            self.wells.append(well_file)
+        # the format of each file is checked while it is loaded
+        self.wells.extend(
+            map_with_workers(
+                WellFile,
+                file_paths,
+                repeat(None),
+                repeat(stiffness_factor),
+                num_workers=num_workers,
+                executor_type=executor_type,
+            )
+        )
 
     def to_dataframe(self, include_stim_data=True) -> pd.DataFrame:
         """Creates DataFrame from PlateRecording with all the data
@@ -590,9 +1272,9 @@ class PlateRecording:
         interp_period = (
             first_well[INTERPOLATION_VALUE_UUID] if self.is_optical_recording else INTERPOLATED_DATA_PERIOD_US
         )
-        interp_timepoints = np.arange(min_time, max_time + interp_period, interp_period)
+        interp_time_axis = TimeAxis.from_range(min_time, max_time + interp_period, interp_period)
 
-        data = {"Time (s)": pd.Series(interp_timepoints)}
+        data = {"Time (s)": pd.Series(interp_time_axis.values)}
 
         # only attempt to output stim data if the file supports it and the caller requests it
         attempt_to_output_stim_data = (
@@ -616,8 +1298,13 @@ class PlateRecording:
         if is_outputting_stim_data:
             data["Stim Time (µs)"] = pd.Series(aggregate_stim_timepoints_us_for_plotting)
 
+        # interpolate all wells at once
+        interp_force, interp_bounds = resample_plate_data(
+            [wf.force if wf else None for wf in self.wells], interp_time_axis
+        )
+
         # iterating over self.wells instead of using __iter__ so well_idx is preserved
-        for wf in self.wells:
+        for well_idx, wf in enumerate(self.wells):
             if not wf:
                 continue
 
@@ -627,14 +1314,10 @@ class PlateRecording:
             data[f"{well_name}__raw"] = pd.Series(wf.force[1, :])
 
             # add unit adjusted + normalized force data
-            start_idx, end_idx = truncate(
-                source_series=interp_timepoints, lower_bound=wf.force[0, 0], upper_bound=wf.force[0, -1]
-            )
+            start_idx, end_idx = interp_bounds[well_idx]
+            interp_force_unewtons = interp_force[well_idx, start_idx : end_idx + 1]
 
-            interp_fn = interpolate.interp1d(wf.force[0, :], wf.force[1, :])
-            interp_force_unewtons = interp_fn(interp_timepoints[start_idx : end_idx + 1])
-
-            min_value = min(interp_force_unewtons)
+            min_value = interp_force_unewtons.min()
 
             interp_force_newtons_normalized = (interp_force_unewtons - min_value) * MICRO_TO_BASE_CONVERSION
             data[well_name] = pd.Series(interp_force_newtons_normalized)
@@ -661,21 +1344,49 @@ class PlateRecording:
         yield PlateRecording(path, **kwargs)
 
     @staticmethod
-    def from_directory(path, **kwargs):
-        # multi zip files
-        for zf in glob.glob(os.path.join(path, "*.zip"), recursive=True):
-            log.info(f"Loading recording from file {zf}")
-            yield PlateRecording(zf, **kwargs)
-
-        # multi optical files
-        for of in glob.glob(os.path.join(path, "*.xlsx"), recursive=True):
-            log.info(f"Loading optical data from file {of}")
-            yield PlateRecording(of, **kwargs)
-
-        # directory of .h5 files
-        for dir in glob.glob(os.path.join(path, "*"), recursive=True):
-            if glob.glob(os.path.join(dir, "*.h5"), recursive=True):
-                yield PlateRecording(dir, **kwargs)
+    def from_directory(
+        path, prefetch: int = 0, prefetch_executor_type: Literal["thread", "process"] = "thread", **kwargs
+    ):
+        """Load every recording in the given dir.
+
+        Args:
+            path: the dir containing zip files, xlsx files, and/or dirs of H5 files
+            prefetch: the number of recordings to load in the background while the caller is processing
+                the current one. At most this many recordings will be held in memory in addition to the
+                current one. If 0, each recording is only loaded once the caller requests it
+            prefetch_executor_type: whether to load recordings in a pool of threads or processes
+            kwargs: passed to every PlateRecording
+
+        Returns:
+            A generator yielding each PlateRecording in order. If a recording fails to load, its error
+            is raised when that recording is requested and no further recordings are yielded
+        """
+        recording_paths = _get_recording_paths_in_dir(path)
+
+        if not prefetch:
+            for recording_path in recording_paths:
+                yield _load_plate_recording(recording_path, kwargs)
+            return
+
+        executor = create_executor(prefetch, prefetch_executor_type)
+        remaining_paths = iter(recording_paths)
+        pending_loads: Deque[Future] = deque(
+            executor.submit(_load_plate_recording, recording_path, kwargs)
+            for recording_path in islice(remaining_paths, prefetch)
+        )
+        try:
+            while pending_loads:
+                next_load = pending_loads.popleft()
+                # start loading another recording in place of the one about to be handed to the caller
+                if (recording_path := next(remaining_paths, None)) is not None:
+                    pending_loads.append(executor.submit(_load_plate_recording, recording_path, kwargs))
+                # any error raised while loading will be raised here
+                yield next_load.result()
+        finally:
+            # the caller may stop early, so don't load any recordings that won't be used
+            for pending_load in pending_loads:
+                pending_load.cancel()
+            executor.shutdown(wait=False)
 
     def __iter__(self):
         self._iter = 0
@@ -693,9 +1404,60 @@ class PlateRecording:
 
 
 # helpers
+def _get_recording_input_files(path: str) -> List[str]:
+    if path.endswith(".zip"):
+        return [path]
+    return sorted(glob.glob(os.path.join(path, "**", "*.h5"), recursive=True))
+
+
+def _get_recording_paths_in_dir(path: str) -> List[str]:
+    # multi zip files
+    recording_paths = glob.glob(os.path.join(path, "*.zip"), recursive=True)
+    # multi optical files
+    recording_paths.extend(glob.glob(os.path.join(path, "*.xlsx"), recursive=True))
+    # directory of .h5 files
+    recording_paths.extend(
+        dir_
+        for dir_ in glob.glob(os.path.join(path, "*"), recursive=True)
+        if glob.glob(os.path.join(dir_, "*.h5"), recursive=True)
+    )
+    return recording_paths
+
+
+def _load_plate_recording(path: str, kwargs: Dict[str, Any]) -> PlateRecording:
+    if path.endswith(".zip"):
+        log.info(f"Loading recording from file {path}")
+    elif path.endswith(".xlsx"):
+        log.info(f"Loading optical data from file {path}")
+    return PlateRecording(path, **kwargs)
+
+
 def load_files(
-    path: str, stiffness_factor: Optional[int], inverted_post_magnet_wells: Optional[List[str]] = None
+    path: str,
+    stiffness_factor: Optional[int],
+    inverted_post_magnet_wells: Optional[List[str]] = None,
+    num_workers: Optional[int] = None,
+    executor_type: Literal["thread", "process"] = "thread",
+    lazy: bool = False,
+    noise_filter_block_size: Optional[int] = None,
+    hash_calibration_files: bool = False,
 ):
+    """Load all recording and calibration H5 files found in the given dir.
+
+    Args:
+        path: the dir containing the H5 files. Will be searched recursively
+        stiffness_factor: post stiffness factor override to give each WellFile
+        inverted_post_magnet_wells: names of wells which have an inverted magnet in their post
+        num_workers: number of workers to load the files with. If None or 1, files are loaded one at a time
+        executor_type: "thread" is sufficient for Beta 2 files since loading them is mostly waiting on disk I/O.
+            "process" will run the Beta 1 transform chain of each file in a separate process
+        lazy: if True, the datasets of V1 files will only be read from disk when first accessed
+        noise_filter_block_size: if given, Beta 1 files will be noise filtered this many samples at a time
+        hash_calibration_files: if True, the content hash of each calibration file is created while loading it
+
+    Returns:
+        A list of the recording WellFiles and a list of the calibration WellFiles, each ordered by well index
+    """
     if not inverted_post_magnet_wells:
         inverted_post_magnet_wells = []
 
@@ -707,83 +1469,262 @@ def load_files(
     tissue_well_files = [None] * len(recording_files)
     baseline_well_files = [None] * len(calibration_files)
 
-    for f in recording_files:
-        log.info(f"Loading data from {os.path.basename(f)}")
-        well_name = get_well_name_from_h5(f)
-        well_file = WellFile(
-            f,
-            stiffness_factor=stiffness_factor,
-            has_inverted_post_magnet=well_name in inverted_post_magnet_wells,
-        )
+    loaded_well_files = map_with_workers(
+        _load_well_file,
+        recording_files + calibration_files,
+        [False] * len(recording_files) + [True] * len(calibration_files),
+        repeat(stiffness_factor),
+        repeat(inverted_post_magnet_wells),
+        repeat(lazy),
+        repeat(None),
+        repeat(noise_filter_block_size),
+        [False] * len(recording_files) + [hash_calibration_files] * len(calibration_files),
+        num_workers=num_workers,
+        executor_type=executor_type,
+    )
+
+    # files may be loaded in any order, so place each WellFile according to its well index
+    for well_file in loaded_well_files[: len(recording_files)]:
         tissue_well_files[well_file[WELL_INDEX_UUID]] = well_file  # type: ignore
+    for well_file in loaded_well_files[len(recording_files) :]:
+        baseline_well_files[well_file[WELL_INDEX_UUID]] = well_file  # type: ignore
+
+    return tissue_well_files, baseline_well_files
 
-    for f in calibration_files:
-        log.info(f"Loading calibration data from {os.path.basename(f)}")
-        well_file = WellFile(f, stiffness_factor=stiffness_factor)
+
+def load_files_from_zip(
+    zip_path: str,
+    stiffness_factor: Optional[int],
+    inverted_post_magnet_wells: Optional[List[str]] = None,
+    num_workers: Optional[int] = None,
+    executor_type: Literal["thread", "process"] = "thread",
+    lazy: bool = False,
+    max_in_memory_member_size: int = DEFAULT_MAX_IN_MEMORY_ZIP_MEMBER_SIZE,
+    scratch_dir: Optional[str] = None,
+    noise_filter_block_size: Optional[int] = None,
+    hash_calibration_files: bool = False,
+):
+    """Load all recording and calibration H5 files in the given zip file without extracting the whole archive.
+
+    Each H5 file is decompressed into memory and loaded from there, unless it is too large or being lazily
+    loaded. When loading with multiple workers, the decompression of some files will overlap with the loading
+    of others.
+
+    Args:
+        zip_path: path to the zip file
+        stiffness_factor: post stiffness factor override to give each WellFile
+        inverted_post_magnet_wells: names of wells which have an inverted magnet in their post
+        num_workers: number of workers to load the files with. If None or 1, files are loaded one at a time
+        executor_type: whether to load the files with a pool of threads or processes
+        lazy: if True, the datasets of V1 files will only be read when first accessed. Every H5 file is extracted
+            to `scratch_dir` so that the decompressed files are not kept in memory until then
+        max_in_memory_member_size: H5 files larger than this many bytes will be extracted to `scratch_dir`
+        scratch_dir: dir to extract H5 files to. If None, a temporary dir is used which is removed before
+            returning, so lazily loaded WellFiles will not be able to read their datasets
+        noise_filter_block_size: if given, Beta 1 files will be noise filtered this many samples at a time
+        hash_calibration_files: if True, the content hash of each calibration file is created while loading
+            it, so that the in-memory files do not have to be kept around for it
+
+    Returns:
+        A list of the recording WellFiles and a list of the calibration WellFiles, each ordered by well index
+    """
+    if not inverted_post_magnet_wells:
+        inverted_post_magnet_wells = []
+
+    with zipfile.ZipFile(zip_path) as zf:
+        h5_members = _get_h5_zip_members(zf)
+
+    recording_members = [m for m in h5_members if "Calibration" not in m]
+    calibration_members = [m for m in h5_members if "Calibration" in m]
+
+    tissue_well_files = [None] * len(recording_members)
+    baseline_well_files = [None] * len(calibration_members)
+
+    with ExitStack() as exit_stack:
+        if scratch_dir is None:
+            scratch_dir = exit_stack.enter_context(tempfile.TemporaryDirectory())
+
+        loaded_well_files = map_with_workers(
+            _load_well_file_from_zip,
+            repeat(zip_path),
+            recording_members + calibration_members,
+            [False] * len(recording_members) + [True] * len(calibration_members),
+            repeat(stiffness_factor),
+            repeat(inverted_post_magnet_wells),
+            repeat(lazy),
+            repeat(max_in_memory_member_size),
+            repeat(scratch_dir),
+            repeat(noise_filter_block_size),
+            [False] * len(recording_members) + [hash_calibration_files] * len(calibration_members),
+            num_workers=num_workers,
+            executor_type=executor_type,
+        )
+
+    # files may be loaded in any order, so place each WellFile according to its well index
+    for well_file in loaded_well_files[: len(recording_members)]:
+        tissue_well_files[well_file[WELL_INDEX_UUID]] = well_file  # type: ignore
+    for well_file in loaded_well_files[len(recording_members) :]:
         baseline_well_files[well_file[WELL_INDEX_UUID]] = well_file  # type: ignore
 
     return tissue_well_files, baseline_well_files
 
 
-def _get_col_as_array(sheet: Worksheet, zero_based_row: int, zero_based_col: int) -> NDArray[(2, Any), float]:
-    col_array = []
-    result = _get_cell_value(sheet, zero_based_row, zero_based_col)
-    zero_based_row += 1
-    while result:
-        col_array.append(float(result))
-        result = _get_cell_value(sheet, zero_based_row, zero_based_col)
-        zero_based_row += 1
-    return np.array(col_array)
+def _get_h5_zip_members(zf: zipfile.ZipFile) -> List[str]:
+    # ignore any metadata files that macOS adds to archives (__MACOSX/._*)
+    return [
+        name
+        for name in zf.namelist()
+        if name.endswith(".h5") and not os.path.basename(name).startswith(".") and "__MACOSX" not in name
+    ]
+
+
+def _load_well_file_from_zip(
+    zip_path: str,
+    member_name: str,
+    is_calibration_file: bool,
+    stiffness_factor: Optional[int],
+    inverted_post_magnet_wells: List[str],
+    lazy: bool,
+    max_in_memory_member_size: int,
+    scratch_dir: str,
+    noise_filter_block_size: Optional[int],
+    hash_contents: bool,
+) -> WellFile:
+    # each call opens its own handle to the zip file so that members can be decompressed concurrently
+    with zipfile.ZipFile(zip_path) as zf:
+        member_info = zf.getinfo(member_name)
+        # lazily loaded files are read from until the plate data is processed, so extract them to disk rather
+        # than keeping the whole decompressed member in memory for that long
+        if lazy or member_info.file_size > max_in_memory_member_size:
+            file_path = zf.extract(member_info, path=scratch_dir)
+            file_obj = None
+        else:
+            file_path = member_name
+            file_obj = io.BytesIO(zf.read(member_info))
+
+    return _load_well_file(
+        file_path,
+        is_calibration_file,
+        stiffness_factor,
+        inverted_post_magnet_wells,
+        lazy,
+        file_obj,
+        noise_filter_block_size,
+        hash_contents,
+    )
 
 
-def _get_single_sheet(file_name: str) -> Any:
-    work_book = load_workbook(file_name)
-    return work_book[work_book.sheetnames[0]]
+def _load_well_file(
+    file_path: str,
+    is_calibration_file: bool,
+    stiffness_factor: Optional[int],
+    inverted_post_magnet_wells: List[str],
+    lazy: bool = False,
+    file_obj: Optional[IO[bytes]] = None,
+    noise_filter_block_size: Optional[int] = None,
+    hash_contents: bool = False,
+) -> WellFile:
+    if is_calibration_file:
+        log.info(f"Loading calibration data from {os.path.basename(file_path)}")
+        return WellFile(
+            file_path,
+            stiffness_factor=stiffness_factor,
+            lazy=lazy,
+            file_obj=file_obj,
+            noise_filter_block_size=noise_filter_block_size,
+            hash_contents=hash_contents,
+        )
 
+    log.info(f"Loading data from {os.path.basename(file_path)}")
+    well_name = get_well_name_from_h5(file_path if file_obj is None else file_obj)
+    return WellFile(
+        file_path,
+        stiffness_factor=stiffness_factor,
+        has_inverted_post_magnet=well_name in inverted_post_magnet_wells,
+        lazy=lazy,
+        file_obj=file_obj,
+        noise_filter_block_size=noise_filter_block_size,
+        hash_contents=hash_contents,
+    )
 
-def _get_num_of_sheets(file_path: str) -> Any:
-    work_book = load_workbook(file_path)
-    return len(work_book.sheetnames)
 
+def _read_optical_file(file_path: str) -> Tuple[NDArray[(2, Any), float], Dict[uuid.UUID, Optional[str]]]:
+    """Read the tissue data and metadata of an optical file in a single pass through its sheet.
 
-def _get_cell_value(sheet: Worksheet, zero_based_row: int, zero_based_col: int) -> Optional[str]:
-    result = sheet.cell(row=zero_based_row + 1, column=zero_based_col + 1).value
-    if result is None:
-        return result
-    return str(result)
+    Args:
+        file_path: path to the xlsx file
 
+    Returns:
+        The time and value columns of the tissue data, and the value of each metadata cell
+    """
+    metadata_cells = {
+        xl_cell_to_rowcol(cell_name): metadata_uuid
+        for metadata_uuid, cell_name in EXCEL_OPTICAL_METADATA_CELLS.items()
+    }
+    last_metadata_row = max(row for row, _ in metadata_cells)
+    metadata: Dict[uuid.UUID, Optional[str]] = {
+        metadata_uuid: None for metadata_uuid in metadata_cells.values()
+    }
 
-def _get_excel_metadata_value(sheet: Worksheet, metadata_uuid: uuid.UUID) -> Optional[str]:
-    """Return a user-entered metadata value."""
-    metadata_description = METADATA_UUID_DESCRIPTIONS[metadata_uuid]
-    cell_name = EXCEL_OPTICAL_METADATA_CELLS.get(metadata_uuid, None)
-    if cell_name is None:
-        raise NotImplementedError(
-            f"Metadata value for {metadata_description} is not contained in excel files of well data"
-        )
-    row, col = xl_cell_to_rowcol(cell_name)
-    result = _get_cell_value(sheet, row, col)
-    return result
+    # each column of tissue data ends at its first empty cell
+    cols: Tuple[List[Any], List[Any]] = ([], [])
+    is_col_complete = [False, False]
 
+    work_book = load_workbook(file_path, read_only=True)
+    try:
+        # check if xlsx is correct format and not pulse3d output file
+        if len(work_book.sheetnames) > 1:
+            raise IncorrectOpticalFileFormatError(
+                f"Incorrect number of sheets found for file {os.path.basename(file_path)}"
+            )
 
-def _load_optical_file_attrs(sheet: Worksheet):
-    raw_tissue_reading = np.array((_get_col_as_array(sheet, 1, 0), _get_col_as_array(sheet, 1, 1)))
+        sheet = work_book[work_book.sheetnames[0]]
+        for row_idx, row in enumerate(sheet.iter_rows(values_only=True)):
+            if row_idx == 0:
+                # skip header row
+                continue
 
-    value = _get_excel_metadata_value(sheet, TISSUE_SAMPLING_PERIOD_UUID)
+            for col_idx, col in enumerate(cols):
+                if is_col_complete[col_idx]:
+                    continue
+                value = row[col_idx] if col_idx < len(row) else None
+                if value is None or value == "":
+                    is_col_complete[col_idx] = True
+                else:
+                    col.append(value)
+
+            if row_idx <= last_metadata_row:
+                for col_idx, value in enumerate(row):
+                    if value is not None and (metadata_uuid := metadata_cells.get((row_idx, col_idx))):
+                        metadata[metadata_uuid] = str(value)
+            elif all(is_col_complete):
+                break
+    finally:
+        # read-only workbooks keep the file open until closed
+        work_book.close()
+
+    tissue_data = np.array([np.array(col, dtype=float) for col in cols])
+    return tissue_data, metadata
+
+
+def _load_optical_file_attrs(file_path: str) -> Dict[str, Any]:
+    raw_tissue_reading, metadata = _read_optical_file(file_path)
+
+    value = metadata[TISSUE_SAMPLING_PERIOD_UUID]
     if value is None:
         raise NotImplementedError("Tissue Sampling Period should not be None here")
     sampling_period = int(round(1 / float(value), 6) * MICRO_TO_BASE_CONVERSION)
 
-    interpolation_value_str = _get_excel_metadata_value(sheet, INTERPOLATION_VALUE_UUID)
+    interpolation_value_str = metadata[INTERPOLATION_VALUE_UUID]
     interpolation_value = (
         float(sampling_period)
         if interpolation_value_str is None
         else float(interpolation_value_str) * MICRO_TO_BASE_CONVERSION
     )
 
-    begin_recording = _get_excel_metadata_value(sheet, UTC_BEGINNING_RECORDING_UUID)
+    begin_recording = metadata[UTC_BEGINNING_RECORDING_UUID]
     begin_recording = datetime.datetime.strptime(begin_recording, "%Y-%m-%d %H:%M:%S")  # type: ignore
-    well_name = _get_excel_metadata_value(sheet, WELL_NAME_UUID)
+    well_name = metadata[WELL_NAME_UUID]
 
     attrs = {
         FILE_FORMAT_VERSION_METADATA_KEY: NOT_APPLICABLE_LABEL,
@@ -792,10 +1733,10 @@ def _load_optical_file_attrs(sheet: Worksheet):
         str(INTERPOLATION_VALUE_UUID): interpolation_value,
         str(TISSUE_SAMPLING_PERIOD_UUID): sampling_period,
         str(UTC_BEGINNING_RECORDING_UUID): begin_recording,
-        str(MANTARRAY_SERIAL_NUMBER_UUID): _get_excel_metadata_value(sheet, MANTARRAY_SERIAL_NUMBER_UUID),
-        str(PLATE_BARCODE_UUID): _get_excel_metadata_value(sheet, PLATE_BARCODE_UUID),
+        str(MANTARRAY_SERIAL_NUMBER_UUID): metadata[MANTARRAY_SERIAL_NUMBER_UUID],
+        str(PLATE_BARCODE_UUID): metadata[PLATE_BARCODE_UUID],
         str(WELL_NAME_UUID): well_name,
-        str(DATA_TYPE_UUID): _get_data_type(_get_excel_metadata_value(sheet, DATA_TYPE_UUID)),
+        str(DATA_TYPE_UUID): _get_data_type(metadata[DATA_TYPE_UUID]),
     }
 
     return attrs
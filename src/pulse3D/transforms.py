@@ -3,6 +3,9 @@
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 from typing import Union
 import uuid
 
@@ -16,15 +19,22 @@ from .constants import BESSEL_LOWPASS_10_UUID
 from .constants import BESSEL_LOWPASS_30_UUID
 from .constants import BUTTERWORTH_LOWPASS_30_UUID
 from .constants import CARDIAC_STIFFNESS_FACTOR
+from .constants import DECIMATION_FILTER_CUTOFF_FRACTION
+from .constants import DECIMATION_FILTER_ORDER
+from .constants import DEFAULT_NOISE_FILTER_BLOCK_NUM_SAMPLES
+from .constants import MAX_PYRAMID_TOP_LEVEL_NUM_BUCKETS
 from .constants import MICRO_TO_BASE_CONVERSION
 from .constants import MILLI_TO_BASE_CONVERSION
 from .constants import MILLIMETERS_PER_MILLITESLA
 from .constants import MILLIVOLTS_PER_MILLITESLA
+from .constants import MIN_PYRAMID_BUCKET_NUM_SAMPLES
 from .constants import NEWTONS_PER_MILLIMETER
+from .constants import NOISE_FILTER_BLOCK_OVERLAP_NUM_SAMPLES
 from .constants import RAW_TO_SIGNED_CONVERSION_VALUE
 from .constants import REFERENCE_VOLTAGE
 from .exceptions import FilterCreationNotImplementedError
 from .exceptions import UnrecognizedFilterUuidError
+from .utils import TimeAxis
 
 
 FILTER_CHARACTERISTICS: Dict[uuid.UUID, Dict[str, Union[str, float, int]]] = {
@@ -88,6 +98,113 @@ def create_filter(filter_uuid: uuid.UUID, sample_period_microseconds: int) -> ND
     return sos_polys
 
 
+class NoiseFilterBank:
+    """Creates noise filters and caches their coefficients for each filter and sampling period.
+
+    The cached coefficient arrays are shared by everything using the bank, so they should not be modified.
+    They are left writeable since scipy's sosfilt and sosfiltfilt do not accept read-only coefficients.
+    """
+
+    def __init__(self):
+        self._sos_coefficients: Dict[Tuple[uuid.UUID, Union[int, float]], NDArray[(Any, 6), float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sos_coefficients)
+
+    def get_sos_coefficients(
+        self, filter_uuid: uuid.UUID, sample_period_microseconds: Union[int, float]
+    ) -> NDArray[(Any, 6), float]:
+        """Get the coefficients of a filter, only creating them the first time they are requested.
+
+        Args:
+            filter_uuid: a UUID of an already accepted and approved filter
+            sample_period_microseconds: the sampling period of the data the filter will be applied to
+
+        Returns:
+            The 'second order system' coefficient array of the filter
+        """
+        key = (filter_uuid, sample_period_microseconds)
+        if key not in self._sos_coefficients:
+            self._sos_coefficients[key] = create_filter(filter_uuid, sample_period_microseconds)
+        return self._sos_coefficients[key]
+
+    def filter_in_blocks(
+        self,
+        fully_calibrated_gmr: NDArray[(2, Any), int],
+        filter_uuid: uuid.UUID,
+        sample_period_microseconds: Union[int, float],
+        block_num_samples: int = DEFAULT_NOISE_FILTER_BLOCK_NUM_SAMPLES,
+        overlap_num_samples: int = NOISE_FILTER_BLOCK_OVERLAP_NUM_SAMPLES,
+    ) -> NDArray[(2, Any), int]:
+        """Apply zero-phase noise filtering to a long recording one block at a time.
+
+        Each block is run forward and backward through the filter along with `overlap_num_samples` of the
+        surrounding data on each side, and only the samples of the block itself are kept. This bounds the size
+        of the temporary arrays created by the filter to the size of a block. If the last block would be too
+        short for the filter, it is merged into the block before it.
+
+        The output matches apply_noise_filtering except near the seams between blocks, where the filtered
+        values may differ by at most 1 after rounding (for the default overlap and the filters in
+        FILTER_CHARACTERISTICS). The start and end of the recording are filtered exactly the same way.
+
+        Args:
+            fully_calibrated_gmr: a 2D array of Time and GMR readings after the Empty Plate calibration
+            filter_uuid: a UUID of an already accepted and approved filter
+            sample_period_microseconds: the sampling period of the GMR readings
+            block_num_samples: number of samples kept from each block
+            overlap_num_samples: number of samples of the surrounding data filtered with each block
+
+        Returns:
+            A 2D array of the Time and filtered GMR readings rounded to integers
+        """
+        if block_num_samples < 1:
+            raise ValueError("'block_num_samples' must be >= 1")
+        if overlap_num_samples < 0:
+            raise ValueError("'overlap_num_samples' must be >= 0")
+
+        sos_coefficients = self.get_sos_coefficients(filter_uuid, sample_period_microseconds)
+        padlen = _get_sosfiltfilt_padlen(sos_coefficients)
+        if block_num_samples + overlap_num_samples <= padlen:
+            raise ValueError(
+                f"'block_num_samples' + 'overlap_num_samples' must be > {padlen}, the padding used by the filter"
+            )
+
+        gmr_readings = fully_calibrated_gmr[1]
+        num_samples = len(gmr_readings)
+
+        filtered_data = np.empty((2, num_samples), dtype=np.int32)
+        filtered_data[0] = fully_calibrated_gmr[0]
+
+        block_start = 0
+        while block_start < num_samples:
+            block_stop = min(block_start + block_num_samples, num_samples)
+            # sosfiltfilt cannot filter a last block which is not longer than its padding once the overlap is
+            # added, so merge it into this block instead
+            if num_samples - max(block_stop - overlap_num_samples, 0) <= padlen:
+                block_stop = num_samples
+            padded_start = max(block_start - overlap_num_samples, 0)
+            padded_stop = min(block_stop + overlap_num_samples, num_samples)
+
+            filtered_block = signal.sosfiltfilt(sos_coefficients, gmr_readings[padded_start:padded_stop])
+            filtered_data[1, block_start:block_stop] = np.rint(
+                filtered_block[block_start - padded_start : block_stop - padded_start]
+            )
+            block_start = block_stop
+
+        return filtered_data
+
+
+def _get_sosfiltfilt_padlen(sos_coefficients: NDArray[(Any, 6), float]) -> int:
+    # the default amount of padding scipy.signal.sosfiltfilt adds to each end of the signal
+    num_taps = 2 * len(sos_coefficients) + 1
+    num_taps -= min((sos_coefficients[:, 2] == 0).sum(), (sos_coefficients[:, 5] == 0).sum())
+    return int(3 * num_taps)
+
+
+# shared by every WellFile so that the coefficients of each filter are only created once
+NOISE_FILTER_BANK = NoiseFilterBank()
+
+
 def apply_sensitivity_calibration(raw_gmr_reading: NDArray[(2, Any), int]) -> NDArray[(2, Any), int]:
     """Apply the result of a sensor sensitivity calibration.
 
@@ -228,15 +345,207 @@ def calculate_force_from_displacement(
     time = displacement_data[0, :]
     displacement = displacement_data[1, :]
 
+    sample_in_newtons = convert_displacement_to_force(displacement, stiffness_factor, in_mm)
+
+    return np.vstack((time, sample_in_newtons)).astype(np.float64)
+
+
+def calculate_displacement_and_force_from_gmr(
+    gmr_data: NDArray[(2, Any), int],
+    stiffness_factor: int = CARDIAC_STIFFNESS_FACTOR,
+    reference_voltage: Union[float, int] = REFERENCE_VOLTAGE,
+    adc_gain: int = ADC_GAIN,
+) -> NDArray[(3, Any), np.float64]:
+    """Convert GMR readings to displacement and force in a single array which shares one time row.
+
+    Produces the same values as running calculate_voltage_from_gmr, calculate_displacement_from_voltage and
+    calculate_force_from_displacement (with in_mm=False) one after another, but only allocates the output
+    array instead of a new time and value array for each step.
+
+    Args:
+        gmr_data: time and GMR numpy array. Typically coming from filtered_gmr_data
+        stiffness_factor: post stiffness factor
+        reference_voltage: Almost always leave as default of 2.5V
+        adc_gain: Current implementation of Mantarray is constant value of 2, but may change in the future
+
+    Returns:
+        A 2D array with rows of time, Displacement (meters), and Force (Newtons)
+    """
+    millivolts_per_lsb = 1000 * reference_voltage / RAW_TO_SIGNED_CONVERSION_VALUE
+
+    waveforms = np.empty((3, gmr_data.shape[1]), dtype=np.float64)
+    waveforms[0] = gmr_data[0]
+
+    # the operations are applied in the same order as the individual transforms so the results are identical
+    displacement = waveforms[1]
+    displacement[:] = gmr_data[1]
+    displacement *= millivolts_per_lsb
+    displacement *= 1 / adc_gain
+    displacement /= MILLI_TO_BASE_CONVERSION
+    displacement *= MILLI_TO_BASE_CONVERSION
+    displacement /= MILLIVOLTS_PER_MILLITESLA
+    displacement *= MILLIMETERS_PER_MILLITESLA
+    displacement /= MILLI_TO_BASE_CONVERSION
+
+    force = waveforms[2]
+    np.multiply(displacement, MILLI_TO_BASE_CONVERSION, out=force)
+    force *= NEWTONS_PER_MILLIMETER
+    force *= stiffness_factor
+
+    return waveforms
+
+
+def convert_displacement_to_force(
+    displacement: NDArray[(Any, ...), np.float64],
+    stiffness_factor: Union[int, NDArray[(Any, ...), int]] = CARDIAC_STIFFNESS_FACTOR,
+    in_mm: bool = True,
+) -> NDArray[(Any, ...), np.float64]:
+    """Convert displacement values to force without any time indices.
+
+    Args:
+        displacement: displacement values of any shape, such as one row per well of a plate
+        stiffness_factor: post stiffness factor. Can be an array which broadcasts against `displacement`, such as one stiffness factor per row
+        in_mm: whether this data is in units of mm or not
+
+    Returns:
+        An array of force values (Newtons) with the same shape as `displacement`
+    """
     unit_conversion = 1 if in_mm else MILLI_TO_BASE_CONVERSION
+    return displacement * unit_conversion * NEWTONS_PER_MILLIMETER * stiffness_factor
 
-    # calculate force
-    sample_in_newtons = displacement * unit_conversion * NEWTONS_PER_MILLIMETER * stiffness_factor
 
-    return np.vstack((time, sample_in_newtons)).astype(np.float64)
+def decimate_plate_data(
+    plate_data: NDArray[(Any, Any), float], decimation_factor: int
+) -> NDArray[(Any, Any), float]:
+    """Low-pass filter with a zero-phase Butterworth filter and then downsample the data of every channel.
+
+    Args:
+        plate_data: the data of each channel, one row per channel
+        decimation_factor: only every nth sample is kept after filtering out frequencies above the new Nyquist
+            frequency
+
+    Returns:
+        An array with one row per channel and 1/decimation_factor as many samples (rounded up). Sample i of
+        the returned array corresponds to sample i * decimation_factor of the given array
+    """
+    sos = signal.butter(
+        DECIMATION_FILTER_ORDER, DECIMATION_FILTER_CUTOFF_FRACTION / decimation_factor, output="sos"
+    )
+    return signal.sosfiltfilt(sos, plate_data, axis=-1)[..., ::decimation_factor]
+
+
+def create_min_max_pyramid(
+    waveforms: NDArray[(Any, Any), float],
+    min_bucket_size: int = MIN_PYRAMID_BUCKET_NUM_SAMPLES,
+    max_top_level_num_buckets: int = MAX_PYRAMID_TOP_LEVEL_NUM_BUCKETS,
+) -> List[NDArray[(2, Any, Any), float]]:
+    """Create the min/max envelope of each waveform at power-of-two decimations.
+
+    The first level splits each waveform into buckets of `min_bucket_size` samples, and each level after is
+    created from the level before it by combining pairs of buckets. Levels are added until one has at most
+    `max_top_level_num_buckets` buckets.
+
+    Args:
+        waveforms: the values of each waveform, one row per waveform
+        min_bucket_size: number of samples in each bucket of the first level. Must be a power of two
+        max_top_level_num_buckets: max number of buckets in the last level
+
+    Returns:
+        A list with an array of each level, with shape (2, num waveforms, num buckets). The first row of
+        each array contains the min value of each bucket and the second row contains the max value. If the
+        number of samples or buckets does not divide evenly, the last bucket of a level contains fewer samples
+    """
+    if min_bucket_size < 1 or min_bucket_size & (min_bucket_size - 1):
+        raise ValueError("'min_bucket_size' must be a power of two")
+    if max_top_level_num_buckets < 1:
+        raise ValueError("'max_top_level_num_buckets' must be >= 1")
+
+    if waveforms.shape[-1] == 0:
+        raise ValueError("'waveforms' must contain at least one sample")
+
+    levels = [
+        np.stack(
+            [
+                _reduce_buckets(waveforms, min_bucket_size, np.min),
+                _reduce_buckets(waveforms, min_bucket_size, np.max),
+            ]
+        )
+    ]
+    while levels[-1].shape[-1] > max_top_level_num_buckets:
+        prev_mins, prev_maxs = levels[-1]
+        levels.append(
+            np.stack([_reduce_buckets(prev_mins, 2, np.min), _reduce_buckets(prev_maxs, 2, np.max)])
+        )
+
+    return levels
+
+
+def _reduce_buckets(values, bucket_size, reduce_fn):
+    # reshaping the full buckets creates a view, so the only copy made is of the output
+    num_full_buckets, num_remaining_values = divmod(values.shape[-1], bucket_size)
+    full_buckets = values[:, : num_full_buckets * bucket_size].reshape(
+        values.shape[0], num_full_buckets, bucket_size
+    )
+    reduced_values = reduce_fn(full_buckets, axis=-1)
+    if num_remaining_values:
+        last_bucket = reduce_fn(values[:, -num_remaining_values:], axis=-1, keepdims=True)
+        reduced_values = np.concatenate([reduced_values, last_bucket], axis=-1)
+    return reduced_values
 
 
 def get_time_window_indices(
-    time: NDArray[(1, Any), np.float64], start: Union[float, int], stop: Union[float, int]
+    time: Union[NDArray[(1, Any), np.float64], TimeAxis], start: Union[float, int], stop: Union[float, int]
 ) -> NDArray[(1, Any), int]:
+    if isinstance(time, TimeAxis):
+        return time.get_window_indices(start, stop)
     return np.where((time >= start) & (time <= stop))[0]
+
+
+def resample_plate_data(
+    waveforms: Sequence[Optional[NDArray[(2, Any), float]]],
+    timepoints: Union[NDArray[(1, Any), float], TimeAxis],
+    window: Optional[Tuple[int, int]] = None,
+) -> Tuple[NDArray[(Any, Any), float], NDArray[(Any, 2), int]]:
+    """Linearly interpolate the waveform of every well onto the same timepoints.
+
+    The results are identical to using scipy.interpolate.interp1d on each well individually.
+
+    Args:
+        waveforms: time v. amplitude array of each well. None can be given for missing wells
+        timepoints: the sorted timepoints to interpolate onto, in the same units as the waveform times.
+            If a TimeAxis is given, only the timepoints within the time range of each well are created
+        window: the indices of the first and last timepoints to interpolate onto. Defaults to all timepoints
+
+    Returns:
+        A wells x timepoints array of the interpolated data, with one column per timepoint in the window.
+        Values outside of the time range of a well, and all values of missing wells, are NaN.
+        A wells x 2 array of the indices of the first and last timepoints in both the window and the time
+        range of each well. The indices are of `timepoints`, not of the window. Both indices will be -1 for
+        missing wells
+    """
+    first_idx, last_idx = (0, len(timepoints) - 1) if window is None else window
+    resampled_data = np.full((len(waveforms), max(last_idx - first_idx + 1, 0)), np.nan)
+    bounds = np.full((len(waveforms), 2), -1, dtype=int)
+
+    for well_idx, waveform in enumerate(waveforms):
+        if waveform is None:
+            continue
+
+        # same as utils.truncate, the timepoints which lie within the recorded times of this well
+        if isinstance(timepoints, TimeAxis):
+            start_idx, end_idx = timepoints.get_window_bounds(waveform[0, 0], waveform[0, -1])
+        else:
+            start_idx = np.searchsorted(timepoints, waveform[0, 0], side="left")
+            end_idx = np.searchsorted(timepoints, waveform[0, -1], side="right") - 1
+        start_idx = max(start_idx, first_idx)
+        end_idx = min(end_idx, last_idx)
+        bounds[well_idx] = (start_idx, end_idx)
+
+        if start_idx > end_idx:
+            continue
+        # interp1d uses np.interp for linear interpolation of float arrays, so use it directly to avoid overhead
+        resampled_data[well_idx, start_idx - first_idx : end_idx - first_idx + 1] = np.interp(
+            timepoints[start_idx : end_idx + 1], waveform[0], waveform[1]
+        )
+
+    return resampled_data, bounds
@@ -1,15 +1,26 @@
 # -*- coding: utf-8 -*-
 """General utility/helpers."""
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 import math
 from typing import Any
+from typing import Callable
+from typing import IO
+from typing import Iterable
+from typing import List
+from typing import Literal
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
 import h5py
 from nptyping import NDArray
+import numpy as np
 
 from .constants import CARDIAC_STIFFNESS_LABEL
+from .constants import EXECUTOR_TYPES
 from .constants import MAX_CARDIAC_EXPERIMENT_ID
 from .constants import MAX_EXPERIMENT_ID
 from .constants import MAX_MINI_CARDIAC_EXPERIMENT_ID
@@ -19,6 +30,7 @@ from .constants import MAX_VARIABLE_EXPERIMENT_ID
 from .constants import MIN_EXPERIMENT_ID
 from .constants import POST_STIFFNESS_LABEL_TO_FACTOR
 from .constants import SKM_STIFFNESS_LABEL
+from .constants import TIME_UNIT_TO_MICROSECONDS
 from .constants import VARIABLE_STIFFNESS_LABEL
 from .constants import WELL_NAME_UUID
 
@@ -76,18 +88,23 @@ def truncate_float(value: float, digits: int) -> float:
 
 
 def truncate(
-    source_series: NDArray[(1, Any), float], lower_bound: Union[int, float], upper_bound: Union[int, float]
+    source_series: Union[NDArray[(1, Any), float], "TimeAxis"],
+    lower_bound: Union[int, float],
+    upper_bound: Union[int, float],
 ) -> Tuple[int, int]:
     """Match bounding indices of source time-series with reference time-series.
 
     Args:
-        source_series (NDArray): time-series to truncate
+        source_series (NDArray or TimeAxis): time-series to truncate
         lower_bound/upper_bound (float): bounding times of a reference time-series
 
     Returns:
         first_idx (int): index corresponding to lower bound of source time-series
         last_idx (int): index corresponding to upper bound of source time-series
     """
+    if isinstance(source_series, TimeAxis):
+        return source_series.get_window_bounds(lower_bound, upper_bound)
+
     first_idx, last_idx = 0, len(source_series) - 1
 
     # right-truncation
@@ -101,6 +118,194 @@ def truncate(
     return first_idx, last_idx
 
 
+def convert_time_unit(
+    value: Union[int, float], from_unit: Literal["us", "s"], to_unit: Literal["us", "s"]
+) -> Union[int, float]:
+    for unit in (from_unit, to_unit):
+        if unit not in TIME_UNIT_TO_MICROSECONDS:
+            raise ValueError(f"Invalid unit: {unit}, must be one of {tuple(TIME_UNIT_TO_MICROSECONDS)}")
+    if from_unit == to_unit:
+        return value
+    return value * TIME_UNIT_TO_MICROSECONDS[from_unit] / TIME_UNIT_TO_MICROSECONDS[to_unit]
+
+
+class TimeAxis:
+    """A uniformly sampled time axis which is only materialized into an array of values when asked.
+
+    Can be given anywhere an array of time values is accepted. Lookups of the samples in a time window and
+    conversions to other units do not need to create or search an array of all the time values.
+
+    Args:
+        start: time of the first sample
+        period: time between each sample
+        length: number of samples
+        unit: unit of `start` and `period`, one of TIME_UNIT_TO_MICROSECONDS
+    """
+
+    def __init__(
+        self,
+        start: Union[int, float],
+        period: Union[int, float],
+        length: int,
+        unit: Literal["us", "s"] = "us",
+    ):
+        if period <= 0:
+            raise ValueError("'period' must be > 0")
+        if length < 0:
+            raise ValueError("'length' must be >= 0")
+        if unit not in TIME_UNIT_TO_MICROSECONDS:
+            raise ValueError(f"Invalid unit: {unit}, must be one of {tuple(TIME_UNIT_TO_MICROSECONDS)}")
+
+        self.start = start
+        self.period = period
+        self.length = int(length)
+        self.unit = unit
+
+        # np.arange computes each value from the difference between the first two values instead of the step
+        self._delta = float((start + period) - start)
+
+    @classmethod
+    def from_range(
+        cls,
+        start: Union[int, float],
+        stop: Union[int, float],
+        period: Union[int, float],
+        unit: Literal["us", "s"] = "us",
+    ) -> "TimeAxis":
+        """Create a TimeAxis with the same values as np.arange(start, stop, period)."""
+        length = max(math.ceil((stop - start) / period), 0)
+        return cls(start, period, length, unit)
+
+    @classmethod
+    def from_array(
+        cls, time_values: Sequence[Union[int, float]], unit: Literal["us", "s"] = "us"
+    ) -> Optional["TimeAxis"]:
+        """Create a TimeAxis from an array of time values if they are exactly uniformly sampled.
+
+        Args:
+            time_values: sorted time values
+            unit: unit of `time_values`
+
+        Returns:
+            A TimeAxis with the same values as `time_values`, or None if they are not uniformly sampled
+        """
+        time_values = np.asarray(time_values)
+        if len(time_values) < 2 or time_values[1] <= time_values[0]:
+            return None
+
+        start, period = time_values[0].item(), (time_values[1] - time_values[0]).item()
+        time_axis = cls(start, period, len(time_values), unit)
+        return time_axis if np.array_equal(time_axis.values, time_values) else None
+
+    def __repr__(self) -> str:
+        return f"TimeAxis(start={self.start}, period={self.period}, length={self.length}, unit={self.unit!r})"
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[float, NDArray[(1, Any), float]]:
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self.length)
+            return self._get_values(start, stop, step)
+
+        idx = int(idx)
+        if idx < 0:
+            idx += self.length
+        if not 0 <= idx < self.length:
+            raise IndexError(f"index {idx} is out of bounds for TimeAxis of length {self.length}")
+        return self._get_value(idx)
+
+    def __array__(self, dtype=None, copy=None) -> NDArray[(1, Any), float]:
+        values = self.values
+        return values if dtype is None else values.astype(dtype)
+
+    @property
+    def stop(self) -> float:
+        """The time one period after the last sample."""
+        return self._get_value(self.length)
+
+    @property
+    def values(self) -> NDArray[(1, Any), float]:
+        """A new array of every time value."""
+        return self._get_values(0, self.length)
+
+    def to_unit(self, unit: Literal["us", "s"]) -> "TimeAxis":
+        """Get the same time axis in a different unit without creating an array of the time values."""
+        return TimeAxis(
+            convert_time_unit(self.start, self.unit, unit),
+            convert_time_unit(self.period, self.unit, unit),
+            self.length,
+            unit,
+        )
+
+    def searchsorted(
+        self, value: Union[int, float], side: Literal["left", "right"] = "left", unit: Optional[str] = None
+    ) -> int:
+        """Find the index to insert a value at to keep the time values sorted, same as np.searchsorted.
+
+        Args:
+            value: the time to search for
+            side: if "left", the index of the first time >= `value`. If "right", the first time > `value`
+            unit: the unit of `value`. Defaults to the unit of this TimeAxis. If different, each time value is
+                converted to this unit before it is compared to `value`, the same as searching an array of
+                the time values after converting it. Converting `value` instead would round differently
+
+        Returns:
+            The insertion index, which will be in the range [0, len(self)]
+        """
+        if unit is None:
+            unit = self.unit
+
+        def get_value(idx: int) -> float:
+            return convert_time_unit(self._get_value(idx), self.unit, unit)  # type: ignore
+
+        relative_idx = (convert_time_unit(value, unit, self.unit) - self.start) / self.period
+        if relative_idx <= 0:
+            idx = 0
+        elif relative_idx >= self.length:
+            idx = self.length
+        else:
+            idx = math.ceil(relative_idx)
+
+        # the estimate can be off due to rounding, so correct it against the values np.arange creates
+        if side == "left":
+            while idx > 0 and get_value(idx - 1) >= value:
+                idx -= 1
+            while idx < self.length and get_value(idx) < value:
+                idx += 1
+        else:
+            while idx > 0 and get_value(idx - 1) > value:
+                idx -= 1
+            while idx < self.length and get_value(idx) <= value:
+                idx += 1
+        return idx
+
+    def get_window_bounds(
+        self, lower_bound: Union[int, float], upper_bound: Union[int, float], unit: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Get the indices of the first and last samples within the given times, same as utils.truncate."""
+        return (
+            self.searchsorted(lower_bound, side="left", unit=unit),
+            self.searchsorted(upper_bound, side="right", unit=unit) - 1,
+        )
+
+    def get_window_indices(
+        self, start: Union[int, float], stop: Union[int, float], unit: Optional[str] = None
+    ) -> NDArray[(1, Any), int]:
+        """Get the indices of every sample within the given times, same as get_time_window_indices."""
+        first_idx, last_idx = self.get_window_bounds(start, stop, unit=unit)
+        return np.arange(first_idx, last_idx + 1)
+
+    def _get_value(self, idx: int) -> float:
+        return self.start + idx * self._delta
+
+    def _get_values(self, start_idx: int, stop_idx: int, step: int = 1) -> NDArray[(1, Any), float]:
+        values = np.arange(start_idx, stop_idx, step, dtype=np.float64)
+        values *= self._delta
+        values += self.start
+        return values
+
+
 def xl_col_to_name(col, col_abs=False):
     """Convert a zero indexed column cell reference to a string.
 
@@ -134,6 +339,52 @@ def xl_col_to_name(col, col_abs=False):
     return col_abs + col_str
 
 
-def get_well_name_from_h5(file_path: str) -> str:
+def get_well_name_from_h5(file_path: Union[str, IO[bytes]]) -> str:
     with h5py.File(file_path, "r") as h5_file:
         return h5_file.attrs[str(WELL_NAME_UUID)]
+
+
+def map_with_workers(
+    fn: Callable[..., Any],
+    *iterables: Iterable[Any],
+    num_workers: Optional[int] = None,
+    executor_type: Literal["thread", "process"] = "thread",
+) -> List[Any]:
+    """Apply fn to every set of args from iterables, optionally in a pool of workers.
+
+    Args:
+        fn: the function to call. Must be picklable (defined at module level) if using processes
+        iterables: the positional args to pass to fn, zipped together the same way as the builtin map
+        num_workers: the number of workers to use. If None or 1, everything runs serially in the calling thread
+        executor_type: "thread" for I/O bound work (h5 reads), "process" for CPU bound work that holds the GIL
+
+    Returns:
+        A list of the return values of fn in the same order as the given args
+    """
+    if executor_type not in EXECUTOR_TYPES:
+        raise ValueError(f"Invalid executor_type: {executor_type}, must be one of {EXECUTOR_TYPES}")
+
+    if not num_workers or num_workers == 1:
+        return list(map(fn, *iterables))
+
+    with create_executor(num_workers, executor_type) as executor:
+        return list(executor.map(fn, *iterables))
+
+
+def create_executor(num_workers: int, executor_type: Literal["thread", "process"] = "thread") -> Executor:
+    """Create a pool of workers.
+
+    Args:
+        num_workers: the number of workers in the pool
+        executor_type: "thread" for I/O bound work (h5 reads), "process" for CPU bound work that holds the GIL
+
+    Returns:
+        The executor of the given type
+    """
+    if executor_type not in EXECUTOR_TYPES:
+        raise ValueError(f"Invalid executor_type: {executor_type}, must be one of {EXECUTOR_TYPES}")
+    if num_workers < 1:
+        raise ValueError(f"num_workers must be >= 1, not {num_workers}")
+
+    executor_cls = ThreadPoolExecutor if executor_type == "thread" else ProcessPoolExecutor
+    return executor_cls(max_workers=num_workers)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import os
 from random import randint
+import time
 
 import numpy as np
 from pulse3D import peak_detection
@@ -15,10 +16,16 @@ from pulse3D.constants import SUBSEQUENT_VALLEY_INDEX_UUID
 from pulse3D.exceptions import TooFewPeaksDetectedError
 from pulse3D.exceptions import TwoPeaksInARowError
 from pulse3D.exceptions import TwoValleysInARowError
+from pulse3D.nb_peak_detection import _estimate_noise_amplitude
+from pulse3D.nb_peak_detection import _find_noise_estimation_peaks
+from pulse3D.nb_peak_detection import _find_valleys
 from pulse3D.nb_peak_detection import noise_based_peak_finding
+from pulse3D.nb_peak_detection import quadratic
 from pulse3D.peak_detection import find_twitch_indices
 from pulse3D.peak_detection import peak_detector
 import pytest
+from scipy import signal
+from scipy.optimize import curve_fit
 from stdlib_utils import get_current_file_abs_directory
 
 
@@ -172,6 +179,192 @@ def test_noise_based_peak_detection(test_file):
     )
 
 
+def _load_noise_based_peak_finding_waveform(test_file):
+    peak_finding_folder = os.path.join(
+        get_current_file_abs_directory(), os.pardir, "data_files", "peak_finding"
+    )
+    return np.load(os.path.join(peak_finding_folder, "waveforms", f"waveform_{test_file}.npy"))
+
+
+def _estimate_noise_amplitude_with_curve_fit(time_axis, waveform, peaks, segment_size):
+    # the original algorithm, which fits the quadratic of each segment separately
+    noise_segments = np.array([waveform[peak : peak + segment_size] for peak in peaks])
+    time_segments = np.array([time_axis[peak : peak + segment_size] for peak in peaks])
+    quad_fit = [
+        quadratic(time_segment, *curve_fit(quadratic, time_segment, noise_segment)[0])
+        for time_segment, noise_segment in zip(time_segments, noise_segments)
+    ]
+    noise_segments_corrected = noise_segments - np.array(quad_fit)
+    return np.average(np.max(noise_segments_corrected, axis=1) - np.min(noise_segments_corrected, axis=1))
+
+
+def _estimate_noise_amplitude_with_lstsq(time_axis, waveform, peaks, segment_size):
+    # the exact least squares fit of each segment, solved separately on centred and scaled time
+    noise_segments = np.array([waveform[peak : peak + segment_size] for peak in peaks])
+    quad_fit = []
+    for peak, noise_segment in zip(peaks, noise_segments):
+        time_segment = time_axis[peak : peak + segment_size]
+        time_segment = (time_segment - time_segment.mean()) / np.ptp(time_segment)
+        design_matrix = np.stack([time_segment**2, time_segment, np.ones_like(time_segment)], axis=-1)
+        quad_fit.append(design_matrix @ np.linalg.lstsq(design_matrix, noise_segment, rcond=None)[0])
+    noise_segments_corrected = noise_segments - np.array(quad_fit)
+    return np.average(np.max(noise_segments_corrected, axis=1) - np.min(noise_segments_corrected, axis=1))
+
+
+@pytest.mark.parametrize("test_file", [1, 2])
+def test_find_noise_estimation_peaks__matches_retrying_find_peaks_with_lower_prominence(test_file):
+    test_waveform = _load_noise_based_peak_finding_waveform(test_file)[1]
+
+    for test_min_prominence in (50, 40, 30, 20, 10, 0):
+        expected_peaks, _ = signal.find_peaks(test_waveform, prominence=test_min_prominence)
+        if len(expected_peaks) > 0:
+            break
+
+    np.testing.assert_array_equal(_find_noise_estimation_peaks(test_waveform), expected_peaks)
+
+
+@pytest.mark.parametrize("test_file", [1, 2])
+def test_estimate_noise_amplitude__matches_fitting_each_segment_with_lstsq(test_file):
+    test_time_axis, test_waveform = _load_noise_based_peak_finding_waveform(test_file)
+    test_peaks = _find_noise_estimation_peaks(test_waveform)
+    test_peaks = test_peaks[test_peaks + 10 <= len(test_waveform)]
+
+    noise_amplitude = _estimate_noise_amplitude(test_time_axis, test_waveform, test_peaks, 10)
+
+    expected_noise_amplitude = _estimate_noise_amplitude_with_lstsq(
+        test_time_axis, test_waveform, test_peaks, 10
+    )
+    np.testing.assert_allclose(noise_amplitude, expected_noise_amplitude, rtol=1e-10)
+
+
+@pytest.mark.parametrize("test_file", [1, 2])
+def test_estimate_noise_amplitude__is_within_the_convergence_tolerance_of_curve_fit(test_file):
+    test_time_axis, test_waveform = _load_noise_based_peak_finding_waveform(test_file)
+    test_peaks = _find_noise_estimation_peaks(test_waveform)
+    test_peaks = test_peaks[test_peaks + 10 <= len(test_waveform)]
+
+    # curve_fit iterates on the raw time values until the change in the residual is below its default
+    # tolerance, so it stops slightly short of the least squares minimum. Its residuals are never smaller
+    # than those of the exact fit, which shows the deviation of the noise amplitude comes from curve_fit
+    for peak in test_peaks:
+        time_segment = test_time_axis[peak : peak + 10]
+        noise_segment = test_waveform[peak : peak + 10]
+        curve_fit_residual = noise_segment - quadratic(
+            time_segment, *curve_fit(quadratic, time_segment, noise_segment)[0]
+        )
+        exact_coefficients = np.polyfit(time_segment - time_segment.mean(), noise_segment, 2)
+        exact_residual = noise_segment - np.polyval(exact_coefficients, time_segment - time_segment.mean())
+        assert np.sum(exact_residual**2) <= np.sum(curve_fit_residual**2) * (1 + 1e-9)
+
+    noise_amplitude = _estimate_noise_amplitude(test_time_axis, test_waveform, test_peaks, 10)
+
+    expected_noise_amplitude = _estimate_noise_amplitude_with_curve_fit(
+        test_time_axis, test_waveform, test_peaks, 10
+    )
+    np.testing.assert_allclose(noise_amplitude, expected_noise_amplitude, rtol=1e-3)
+
+
+@pytest.mark.slow
+def test_estimate_noise_amplitude__benchmark_against_fitting_each_segment_with_curve_fit():
+    test_time_axis, test_waveform = _load_noise_based_peak_finding_waveform(1)
+    # repeat the recording so that there are thousands of peaks to fit
+    num_repeats = 50
+    test_time_axis = np.arange(len(test_time_axis) * num_repeats) * (test_time_axis[1] - test_time_axis[0])
+    test_waveform = np.tile(test_waveform, num_repeats)
+    test_peaks = _find_noise_estimation_peaks(test_waveform)
+    test_peaks = test_peaks[test_peaks + 10 <= len(test_waveform)]
+
+    start = time.perf_counter()
+    _estimate_noise_amplitude_with_curve_fit(test_time_axis, test_waveform, test_peaks, 10)
+    curve_fit_dur = time.perf_counter() - start
+
+    start = time.perf_counter()
+    noise_amplitude = _estimate_noise_amplitude(test_time_axis, test_waveform, test_peaks, 10)
+    batched_dur = time.perf_counter() - start
+
+    # the time values of the repeated recording are too large for curve_fit to converge on, so the result is
+    # checked against the exact fits instead
+    expected_noise_amplitude = _estimate_noise_amplitude_with_lstsq(
+        test_time_axis, test_waveform, test_peaks, 10
+    )
+    np.testing.assert_allclose(
+        noise_amplitude,
+        expected_noise_amplitude,
+        rtol=1e-10,
+        err_msg=f"curve_fit {curve_fit_dur:.3f}s, batched {batched_dur:.3f}s",
+    )
+
+
+def _find_valleys_per_peak(
+    waveform, peaks, search_num_samples, upslope_num_samples, upslope_noise_allowance_num_samples
+):
+    # the original algorithm, which searches the window of each peak separately
+    search_windows = np.minimum(np.diff(peaks, prepend=0), search_num_samples)
+    valleys = []
+    for peak, search_window in zip(peaks, search_windows):
+        valley_segment = waveform[peak - search_window : peak]
+        upslope = np.where(np.diff(valley_segment) > 0)[0]
+        split_idxs = np.where(np.diff(upslope) > (1 + upslope_noise_allowance_num_samples))[0] + 1
+        upslopes = [i for i in np.split(upslope, split_idxs) if len(i) >= upslope_num_samples]
+        if len(upslopes) == 0:
+            valley_index = np.argmin(valley_segment)
+        else:
+            longest_upslope = max(len(slope) for slope in upslopes)
+            valley_index = [slope[0] for slope in upslopes if len(slope) == longest_upslope][0]
+        valleys.append(peak - (search_window - valley_index))
+    return np.array(valleys)
+
+
+@pytest.mark.parametrize("test_search_num_samples", [1, 7, 50, 500])
+@pytest.mark.parametrize("test_upslope_num_samples", [1, 3.5, 10])
+@pytest.mark.parametrize("test_upslope_noise_allowance_num_samples", [0, 1.5, 4])
+def test_find_valleys__matches_searching_the_window_of_each_peak_separately(
+    test_search_num_samples, test_upslope_num_samples, test_upslope_noise_allowance_num_samples
+):
+    # noisy twitches with some windows that are shortened by the previous peak
+    test_waveform = np.sin(np.arange(5000) / 30) + np.random.normal(0, 0.05, 5000)
+    test_waveform[1000:1100] = 0
+    test_peaks = np.unique(np.random.randint(test_search_num_samples, 5000, 200))
+
+    valleys = _find_valleys(
+        test_waveform,
+        test_peaks,
+        test_search_num_samples,
+        test_upslope_num_samples,
+        test_upslope_noise_allowance_num_samples,
+    )
+
+    expected_valleys = _find_valleys_per_peak(
+        test_waveform,
+        test_peaks,
+        test_search_num_samples,
+        test_upslope_num_samples,
+        test_upslope_noise_allowance_num_samples,
+    )
+    np.testing.assert_array_equal(valleys, expected_valleys)
+
+
+@pytest.mark.slow
+def test_find_valleys__benchmark_against_searching_the_window_of_each_peak_separately():
+    # high frequency twitches, similar to a skeletal muscle recording
+    num_samples = 1_000_000
+    test_waveform = np.sin(np.arange(num_samples) / 5) + np.random.normal(0, 0.05, num_samples)
+    test_peaks, _ = signal.find_peaks(test_waveform, distance=20)
+    test_peaks = test_peaks[test_peaks >= 50]
+
+    start = time.perf_counter()
+    expected_valleys = _find_valleys_per_peak(test_waveform, test_peaks, 50, 7, 1)
+    per_peak_dur = time.perf_counter() - start
+
+    start = time.perf_counter()
+    valleys = _find_valleys(test_waveform, test_peaks, 50, 7, 1)
+    vectorized_dur = time.perf_counter() - start
+
+    np.testing.assert_array_equal(
+        valleys, expected_valleys, err_msg=f"per peak {per_peak_dur:.3f}s, vectorized {vectorized_dur:.3f}s"
+    )
+
+
 def test_find_twitch_indices__raises_error_if_not_enough_peaks_given():
     test_num_peaks = MIN_NUMBER_PEAKS - 1
     with pytest.raises(
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+import numpy as np
+from pulse3D.compression_cy import compress_filtered_magnetic_data
+from pulse3D.compression_cy import rsquared
+from pulse3D.plate_recording import WellFile
+import pytest
+
+from ..fixtures_utils import PATH_TO_H5_FILES
+
+TEST_BETA_1_WELL_FILE_PATH = os.path.join(
+    PATH_TO_H5_FILES, "v0.3.1", "MA201110001__2020_09_03_213024", "MA201110001__2020_09_03_213024__A1.h5"
+)
+
+R_SQUARE_CUTOFF = 0.94
+
+
+def _compress_by_recalculating_rsquared(data):
+    # the original algorithm, which recalculates R^2 over the whole subset each time a point is added
+    data = data.astype(np.int64)
+    time_len = data.shape[1]
+    what_to_keep = np.ones(time_len, dtype=bool)
+
+    left_idx = 0
+    while left_idx < time_len - 2:
+        right_idx = left_idx + 3
+        r_squared = rsquared(data[0, left_idx:right_idx], data[1, left_idx:right_idx])
+
+        if r_squared > np.float32(R_SQUARE_CUTOFF):
+            while r_squared > np.float32(R_SQUARE_CUTOFF) and right_idx < time_len:
+                what_to_keep[right_idx - 2] = False
+                right_idx += 1
+                r_squared = rsquared(data[0, left_idx:right_idx], data[1, left_idx:right_idx])
+            if r_squared > np.float32(R_SQUARE_CUTOFF) and right_idx == time_len:
+                what_to_keep[right_idx - 2] = False
+
+            left_idx = right_idx - 1
+        else:
+            left_idx += 1
+
+    return np.array([data[0, what_to_keep], data[1, what_to_keep]], np.int64)
+
+
+def _create_test_signal(signal_type, num_samples, sampling_period_us=9600):
+    timepoints = np.arange(num_samples) * sampling_period_us
+    if signal_type == "flat":
+        amplitudes = np.full(num_samples, 123456)
+    elif signal_type == "linear":
+        amplitudes = 50000 + np.arange(num_samples) * 7
+    else:
+        # 1 Hz twitches with a little noise
+        twitches = np.maximum(np.sin(2 * np.pi * timepoints / 1e6), 0) ** 3
+        amplitudes = 200000 * twitches + np.random.randint(-500, 500, num_samples)
+    return np.array([timepoints, amplitudes], dtype=np.int64)
+
+
+@pytest.mark.parametrize("test_signal_type", ["flat", "linear", "twitching"])
+@pytest.mark.parametrize("test_num_samples", [2, 3, 4, 1000])
+def test_compress_filtered_magnetic_data__matches_recalculating_rsquared_for_synthetic_signals(
+    test_signal_type, test_num_samples
+):
+    test_data = _create_test_signal(test_signal_type, test_num_samples)
+
+    compressed_data = compress_filtered_magnetic_data(test_data)
+
+    np.testing.assert_array_equal(compressed_data, _compress_by_recalculating_rsquared(test_data))
+
+
+@pytest.mark.parametrize("test_time_offset", [10**6, 10**9, 10**12])
+def test_compress_filtered_magnetic_data__matches_recalculating_rsquared_when_single_precision_is_imprecise(
+    test_time_offset,
+):
+    # large timepoints make the single precision calculation in rsquared round heavily, so the R^2 from the
+    # running sums must not be trusted near the cutoff
+    test_data = _create_test_signal("twitching", 3000)
+    test_data[0] += test_time_offset
+
+    compressed_data = compress_filtered_magnetic_data(test_data)
+
+    np.testing.assert_array_equal(compressed_data, _compress_by_recalculating_rsquared(test_data))
+
+
+def test_compress_filtered_magnetic_data__reports_error_if_a_subset_starts_and_ends_at_the_same_timepoint(
+    mocker,
+):
+    mocked_unraisablehook = mocker.patch.object(sys, "unraisablehook", autospec=True)
+    test_data = np.array([[0, 9600, 9600, 9600, 19200, 19200], [0, 100, 200, 300, 400, 500]], dtype=np.int64)
+
+    try:
+        expected_data = _compress_by_recalculating_rsquared(test_data)
+    except ZeroDivisionError:
+        # the error is only propagated by rsquared when compiled with Cython 3
+        with pytest.raises(ZeroDivisionError):
+            compress_filtered_magnetic_data(test_data)
+        return
+
+    # otherwise, rsquared reports the error as unraisable and returns 0, so these subsets are never compressed
+    expected_num_errors = mocked_unraisablehook.call_count
+    assert expected_num_errors > 0
+
+    compressed_data = compress_filtered_magnetic_data(test_data)
+
+    np.testing.assert_array_equal(compressed_data, expected_data)
+    assert mocked_unraisablehook.call_count == 2 * expected_num_errors
+    for call in mocked_unraisablehook.call_args_list:
+        assert call[0][0].exc_type is ZeroDivisionError
+
+
+def test_compress_filtered_magnetic_data__matches_recalculating_rsquared_for_beta_1_data():
+    test_data = WellFile(TEST_BETA_1_WELL_FILE_PATH).noise_filtered_magnetic_data
+
+    compressed_data = compress_filtered_magnetic_data(test_data)
+
+    np.testing.assert_array_equal(compressed_data, _compress_by_recalculating_rsquared(test_data))
+
+
+def test_compress_filtered_magnetic_data__produces_same_results_when_run_in_parallel_threads():
+    test_data = [_create_test_signal("twitching", 5000) for _ in range(8)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        compressed_data = list(executor.map(compress_filtered_magnetic_data, test_data))
+
+    for well_data, well_compressed_data in zip(test_data, compressed_data):
+        np.testing.assert_array_equal(well_compressed_data, compress_filtered_magnetic_data(well_data))
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("test_signal_type", ["flat", "linear", "twitching"])
+@pytest.mark.parametrize("test_num_samples", [10000, 50000])
+def test_compress_filtered_magnetic_data__benchmark_against_recalculating_rsquared(
+    test_signal_type, test_num_samples
+):
+    test_data = _create_test_signal(test_signal_type, test_num_samples)
+
+    start = time.perf_counter()
+    expected_data = _compress_by_recalculating_rsquared(test_data)
+    recalculating_dur = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compressed_data = compress_filtered_magnetic_data(test_data)
+    incremental_dur = time.perf_counter() - start
+
+    np.testing.assert_array_equal(
+        compressed_data,
+        expected_data,
+        err_msg=f"recalculating {recalculating_dur:.3f}s, incremental {incremental_dur:.3f}s",
+    )
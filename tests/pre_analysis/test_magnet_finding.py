@@ -1,25 +1,49 @@
 # -*- coding: utf-8 -*-
+import glob
+import json
 import os
 import tempfile
+import time
+import tracemalloc
 import zipfile
 
+from mantarray_magnet_finding.exceptions import UnableToConvergeError
 from mantarray_magnet_finding.utils import calculate_magnetic_flux_density_from_memsic
 from mantarray_magnet_finding.utils import load_h5_folder_as_array
 import numpy as np
 from pulse3D import magnet_finding
 from pulse3D import plate_recording
+from pulse3D.cache import ArrayCache
 from pulse3D.constants import BASELINE_MEAN_NUM_DATA_POINTS
 from pulse3D.constants import CARDIAC_STIFFNESS_FACTOR
+from pulse3D.constants import DEFAULT_MAX_IN_MEMORY_ZIP_MEMBER_SIZE
+from pulse3D.constants import INITIAL_MAGNET_FINDING_PARAMS_UUID
+from pulse3D.constants import MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES
+from pulse3D.constants import MAGNET_FINDING_CHUNK_WARMUP_NUM_SAMPLES
+from pulse3D.constants import MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES
 from pulse3D.constants import NUM_CHANNELS_24_WELL_PLATE
+from pulse3D.constants import TISSUE_SENSOR_READINGS
+from pulse3D.constants import WELL_INDEX_UUID
+from pulse3D.magnet_finding import filter_magnet_positions
+from pulse3D.magnet_finding import FILTER_PARAMS
 from pulse3D.magnet_finding import filter_raw_signal
+from pulse3D.magnet_finding import find_magnet_positions
 from pulse3D.magnet_finding import fix_dropped_samples
+from pulse3D.magnet_finding import format_well_file_data
+from pulse3D.magnet_finding import get_magnet_finding_chunk_size
+from pulse3D.magnet_finding import MagnetFindingReport
+from pulse3D.magnet_finding import stream_plate_data
 from pulse3D.plate_recording import load_files
+from pulse3D.plate_recording import load_files_from_zip
 from pulse3D.plate_recording import PlateRecording
+from pulse3D.transforms import decimate_plate_data
 import pytest
+import scipy.signal as signal
 from stdlib_utils import get_current_file_abs_directory
 
 from ..fixtures_utils import PATH_TO_H5_FILES
 from ..fixtures_utils import PATH_TO_MAGNET_FINDING_FILES
+from ..fixtures_utils import TEST_SMALL_BETA_2_FILE_PATH
 
 PATH_OF_CURRENT_FILE = get_current_file_abs_directory()
 
@@ -54,6 +78,119 @@ def test_load_files__loads_zipped_files_with_calibration_recordings_correctly():
     assert len(baseline_recordings) == 24
 
 
+@pytest.mark.parametrize("test_executor_type", ["thread", "process"])
+def test_load_files__loads_files_in_parallel_in_correct_well_order(test_executor_type):
+    path = os.path.join(PATH_TO_H5_FILES, "stim", "SmallBeta2File-NoStim.zip")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zf = zipfile.ZipFile(path)
+        zf.extractall(path=tmpdir)
+        serial_results = load_files(tmpdir, CARDIAC_STIFFNESS_FACTOR)
+        parallel_results = load_files(
+            tmpdir, CARDIAC_STIFFNESS_FACTOR, num_workers=4, executor_type=test_executor_type
+        )
+
+    for serial_well_files, parallel_well_files in zip(serial_results, parallel_results):
+        assert len(parallel_well_files) == len(serial_well_files) == 24
+        for well_idx, (serial_wf, parallel_wf) in enumerate(zip(serial_well_files, parallel_well_files)):
+            assert parallel_wf[WELL_INDEX_UUID] == well_idx
+            assert parallel_wf.file_name == serial_wf.file_name
+            np.testing.assert_array_equal(
+                parallel_wf[TISSUE_SENSOR_READINGS], serial_wf[TISSUE_SENSOR_READINGS], err_msg=well_idx
+            )
+
+
+@pytest.mark.parametrize("test_num_workers", [None, 4])
+@pytest.mark.parametrize("test_max_in_memory_member_size", [DEFAULT_MAX_IN_MEMORY_ZIP_MEMBER_SIZE, 0])
+def test_load_files_from_zip__loads_same_data_as_load_files_without_extracting_members_unless_too_large(
+    test_max_in_memory_member_size, test_num_workers
+):
+    path = os.path.join(PATH_TO_H5_FILES, "stim", "SmallBeta2File-NoStim.zip")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zipfile.ZipFile(path).extractall(path=tmpdir)
+        expected_results = load_files(tmpdir, CARDIAC_STIFFNESS_FACTOR)
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        actual_results = load_files_from_zip(
+            path,
+            CARDIAC_STIFFNESS_FACTOR,
+            num_workers=test_num_workers,
+            max_in_memory_member_size=test_max_in_memory_member_size,
+            scratch_dir=scratch_dir,
+        )
+        extracted_files = glob.glob(os.path.join(scratch_dir, "**", "*.h5"), recursive=True)
+
+    assert len(extracted_files) == (48 if test_max_in_memory_member_size == 0 else 0)
+
+    for expected_well_files, actual_well_files in zip(expected_results, actual_results):
+        assert len(actual_well_files) == len(expected_well_files) == 24
+        for well_idx, (expected_wf, actual_wf) in enumerate(zip(expected_well_files, actual_well_files)):
+            assert actual_wf[WELL_INDEX_UUID] == well_idx
+            assert actual_wf.file_name == expected_wf.file_name
+            np.testing.assert_array_equal(
+                actual_wf[TISSUE_SENSOR_READINGS], expected_wf[TISSUE_SENSOR_READINGS], err_msg=well_idx
+            )
+
+
+def test_load_files_from_zip__extracts_every_member_instead_of_keeping_it_in_memory_when_lazy_loading():
+    path = os.path.join(PATH_TO_H5_FILES, "stim", "SmallBeta2File-NoStim.zip")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zipfile.ZipFile(path).extractall(path=tmpdir)
+        expected_tissue_well_files, _ = load_files(tmpdir, CARDIAC_STIFFNESS_FACTOR)
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        actual_results = load_files_from_zip(
+            path, CARDIAC_STIFFNESS_FACTOR, lazy=True, scratch_dir=scratch_dir
+        )
+        extracted_files = glob.glob(os.path.join(scratch_dir, "**", "*.h5"), recursive=True)
+        assert len(extracted_files) == 48
+
+        for well_idx, (expected_wf, actual_wf) in enumerate(
+            zip(expected_tissue_well_files, actual_results[0])
+        ):
+            np.testing.assert_array_equal(
+                actual_wf.read_dataset(TISSUE_SENSOR_READINGS),
+                expected_wf[TISSUE_SENSOR_READINGS],
+                err_msg=well_idx,
+            )
+
+    for well_file in actual_results[0] + actual_results[1]:
+        assert well_file._file_obj is None
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("test_executor_type", ["thread", "process"])
+def test_load_files__parallel_loading_benchmark(test_executor_type):
+    test_dirs = [
+        os.path.join(PATH_TO_H5_FILES, "v0.3.1", "MA201110001__2020_09_03_213024"),
+        os.path.join(PATH_TO_H5_FILES, "stim", "SmallBeta2File-NoStim.zip"),
+    ]
+    num_workers = min(os.cpu_count() or 1, 8)
+
+    for path in test_dirs:
+        recording_name = os.path.basename(path)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            if path.endswith(".zip"):
+                zipfile.ZipFile(path).extractall(path=tmpdir)
+                path = tmpdir
+
+            start = time.perf_counter()
+            serial_tissue_recordings, _ = load_files(path, None)
+            serial_dur = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel_tissue_recordings, _ = load_files(
+                path, None, num_workers=num_workers, executor_type=test_executor_type
+            )
+            parallel_dur = time.perf_counter() - start
+
+        assert [wf.file_name for wf in parallel_tissue_recordings] == [
+            wf.file_name for wf in serial_tissue_recordings
+        ], f"{recording_name}: serial {serial_dur:.2f}s, {num_workers} workers {parallel_dur:.2f}s"
+
+
 def test_PlateRecording__creates_mean_of_baseline_data_correctly(mocker):
     # spy for easy access to baseline data array
     spied_mfd_from_memsic = mocker.spy(plate_recording, "calculate_magnetic_flux_density_from_memsic")
@@ -62,7 +199,7 @@ def test_PlateRecording__creates_mean_of_baseline_data_correctly(mocker):
         plate_recording,
         "find_magnet_positions",
         autospec=True,
-        side_effect=lambda data, *args: {"X": np.zeros((data.shape[-1], 24))},
+        side_effect=lambda data, *args, **kwargs: {"X": np.zeros((data.shape[-1], 24))},
     )
 
     PlateRecording(
@@ -80,6 +217,45 @@ def test_PlateRecording__creates_mean_of_baseline_data_correctly(mocker):
         assert actual_baseline_mean_arr[channel_idx] == expected_mean, channel_idx
 
 
+def test_PlateRecording__only_reads_end_of_calibration_recordings__and_reuses_cached_baseline_data(
+    mocker, tmp_path
+):
+    spied_mfd_from_memsic = mocker.spy(plate_recording, "calculate_magnetic_flux_density_from_memsic")
+    # mock instead of spy so magnet finding alg doesn't run
+    mocked_find_positions = mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda data, *args, **kwargs: {"X": np.zeros((data.shape[-1], 24))},
+    )
+
+    test_cache = ArrayCache(cache_dir=str(tmp_path))
+    PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, baseline_cache=test_cache)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zipfile.ZipFile(TEST_SMALL_BETA_2_FILE_PATH).extractall(path=tmpdir)
+        _, calibration_recordings = load_files(tmpdir, None)
+    full_baseline_data_mt = calculate_magnetic_flux_density_from_memsic(
+        format_well_file_data(calibration_recordings)
+    )
+    expected_baseline_mean_arr = np.mean(full_baseline_data_mt[:, -BASELINE_MEAN_NUM_DATA_POINTS:], axis=1)
+
+    assert spied_mfd_from_memsic.spy_return.shape == (
+        NUM_CHANNELS_24_WELL_PLATE,
+        BASELINE_MEAN_NUM_DATA_POINTS,
+    )
+    np.testing.assert_array_equal(mocked_find_positions.call_args[0][1], expected_baseline_mean_arr)
+
+    # baseline data should be loaded from the cache for subsequent recordings using the same calibration set
+    num_mfd_calls = spied_mfd_from_memsic.call_count
+    for cache in (test_cache, ArrayCache(cache_dir=str(tmp_path))):
+        PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, baseline_cache=cache)
+        # only the recording data should have been converted
+        assert spied_mfd_from_memsic.call_count == num_mfd_calls + 1
+        num_mfd_calls += 1
+        np.testing.assert_array_equal(mocked_find_positions.call_args[0][1], expected_baseline_mean_arr)
+
+
 def test_PlateRecording__runs_mag_finding_alg_by_default(mocker):
     # mock instead of spy so magnet finding alg doesn't run
     mocked_process_data = mocker.patch.object(PlateRecording, "_process_plate_data", autospec=True)
@@ -198,3 +374,488 @@ def test_PlateRecording__passes_initial_params_to_magnet_finding_alg_correctly__
 def test_fix_dropped_samples__makes_correct_modifications_to_input_array(test_array, expected_array):
     fixed_array = fix_dropped_samples(test_array)
     np.testing.assert_array_equal(fixed_array, expected_array)
+
+
+@pytest.mark.parametrize(
+    "test_array,expected_array",
+    [
+        (np.array([4, 0, 0, 0, 8]), np.array([4, 5, 6, 7, 8])),
+        (np.array([0, 0, 3, 0, 0, 9, 0, 0]), np.array([3, 3, 3, 5, 7, 9, 9, 9])),
+        (np.array([[0, 0, 0], [1, 0, 1]]), np.array([[0, 0, 0], [1, 1, 1]])),
+    ],
+)
+def test_fix_dropped_samples__fixes_runs_of_consecutive_dropped_samples(test_array, expected_array):
+    fixed_array = fix_dropped_samples(test_array)
+    np.testing.assert_array_equal(fixed_array, expected_array)
+
+
+def test_fix_dropped_samples__returns_dropped_sample_count_of_each_channel():
+    test_array = np.array([[[0, 1, 0, 0, 4], [1, 2, 3, 4, 5]], [[0, 0, 0, 0, 0], [5, 0, 3, 0, 1]]])
+
+    fixed_array, dropped_sample_counts = fix_dropped_samples(test_array, return_counts=True)
+
+    np.testing.assert_array_equal(dropped_sample_counts, [[3, 0], [5, 2]])
+    np.testing.assert_array_equal(fixed_array[1, 1], [5, 4, 3, 2, 1])
+
+
+@pytest.mark.parametrize("test_in_place", [True, False])
+def test_fix_dropped_samples__only_modifies_input_array_if_in_place(test_in_place):
+    test_array = np.array([[0, 1, 0, 3, 0], [5, 0, 3, 0, 1]], dtype=float)
+    original_array = test_array.copy()
+
+    fixed_array = fix_dropped_samples(test_array, in_place=test_in_place)
+
+    assert (fixed_array is test_array) is test_in_place
+    np.testing.assert_array_equal(fixed_array, [[1, 1, 2, 3, 3], [5, 4, 3, 2, 1]])
+    np.testing.assert_array_equal(test_array, fixed_array if test_in_place else original_array)
+
+
+def test_fix_dropped_samples__fixes_non_contiguous_array_in_place():
+    test_array = np.array([[0, 5], [1, 0], [0, 3], [3, 0], [0, 1]], dtype=float).T
+
+    fixed_array = fix_dropped_samples(test_array, in_place=True)
+
+    assert fixed_array is test_array
+    np.testing.assert_array_equal(test_array, [[1, 1, 2, 3, 3], [5, 4, 3, 2, 1]])
+
+
+def _filter_each_row_separately(data):
+    # reference implementation which runs filtfilt on one channel at a time
+    return np.array([signal.filtfilt(*FILTER_PARAMS, row) for row in data])
+
+
+def test_filter_raw_signal__matches_filtering_each_channel_separately():
+    test_fields = np.random.default_rng(0).normal(size=(NUM_CHANNELS_24_WELL_PLATE, 1000))
+    expected_fields = _filter_each_row_separately(test_fields)
+
+    np.testing.assert_allclose(filter_raw_signal(test_fields), expected_fields, atol=1e-10)
+
+    float32_fields = filter_raw_signal(test_fields, dtype=np.float32)
+    assert float32_fields.dtype == np.float32
+    np.testing.assert_allclose(float32_fields, expected_fields, atol=1e-4)
+
+    returned_fields = filter_raw_signal(test_fields, out=test_fields)
+    assert returned_fields is test_fields
+    np.testing.assert_allclose(test_fields, expected_fields, atol=1e-10)
+
+
+def test_filter_magnet_positions__matches_filtering_each_well_separately():
+    test_positions = np.random.default_rng(0).normal(size=(1000, 24))
+    expected_positions = _filter_each_row_separately(test_positions.T).T
+
+    np.testing.assert_allclose(filter_magnet_positions(test_positions), expected_positions, atol=1e-10)
+
+    returned_positions = filter_magnet_positions(test_positions, out=test_positions)
+    assert returned_positions is test_positions
+    np.testing.assert_allclose(test_positions, expected_positions, atol=1e-10)
+
+
+def test_filter_raw_signal__filters_blocks_of_channels_directly_into_out(mocker):
+    num_samples = 5000
+    num_channels_per_block = 10
+    mocker.patch.object(
+        magnet_finding, "MAGNET_FINDING_FILTER_BLOCK_NUM_VALUES", num_channels_per_block * num_samples
+    )
+    spied_sosfiltfilt = mocker.spy(signal, "sosfiltfilt")
+
+    test_fields = np.random.default_rng(0).normal(size=(NUM_CHANNELS_24_WELL_PLATE, num_samples))
+    expected_fields = _filter_each_row_separately(test_fields)
+    test_out = np.empty_like(test_fields)
+
+    tracemalloc.start()
+    returned_fields = filter_raw_signal(test_fields, out=test_out)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert returned_fields is test_out
+    np.testing.assert_allclose(test_out, expected_fields, atol=1e-10)
+    assert spied_sosfiltfilt.call_count == -(-NUM_CHANNELS_24_WELL_PLATE // num_channels_per_block)
+    # only the temporary arrays of a single block should be allocated, never a copy of the whole result
+    assert peak_memory < test_fields.nbytes / 4
+
+
+@pytest.mark.slow
+def test_filter_raw_signal__vectorized_filtering_benchmark():
+    test_fields = np.random.default_rng(0).normal(size=(NUM_CHANNELS_24_WELL_PLATE, 100 * 60 * 10))
+
+    start = time.perf_counter()
+    expected_fields = _filter_each_row_separately(test_fields)
+    per_channel_dur = time.perf_counter() - start
+
+    for dtype in (np.float64, np.float32):
+        start = time.perf_counter()
+        actual_fields = filter_raw_signal(test_fields, dtype=dtype)
+        vectorized_dur = time.perf_counter() - start
+
+        np.testing.assert_allclose(
+            actual_fields,
+            expected_fields,
+            atol=1e-10 if dtype == np.float64 else 1e-4,
+            err_msg=f"{np.dtype(dtype)}: per channel {per_channel_dur:.2f}s, vectorized {vectorized_dur:.2f}s",
+        )
+
+
+def _positions_from_fields(data, **kwargs):
+    # each estimated position only depends on the fields of the same sample, so chunking should not change it
+    return {"X": data[::9].T.copy(), "Y": data[1::9].T.copy()}
+
+
+@pytest.mark.parametrize("test_chunk_size,expected_num_chunks", [(1000, 5), (4500, 1), (5000, 1)])
+def test_find_magnet_positions__chunked_output_matches_unchunked_output(
+    test_chunk_size, expected_num_chunks, mocker
+):
+    mocked_get_positions = mocker.patch.object(
+        magnet_finding, "get_positions", autospec=True, side_effect=_positions_from_fields
+    )
+
+    test_fields = np.random.default_rng(0).normal(size=(NUM_CHANNELS_24_WELL_PLATE, 4500))
+    test_baseline = np.zeros(NUM_CHANNELS_24_WELL_PLATE)
+
+    expected_positions = find_magnet_positions(test_fields, test_baseline, {}, filter_inputs=False)
+    mocked_get_positions.reset_mock()
+
+    actual_positions = find_magnet_positions(
+        test_fields,
+        test_baseline,
+        {},
+        filter_inputs=False,
+        chunked=True,
+        num_workers=1,
+        chunk_size=test_chunk_size,
+    )
+
+    assert mocked_get_positions.call_count == expected_num_chunks
+    assert actual_positions.keys() == expected_positions.keys()
+    for param, expected_param_positions in expected_positions.items():
+        np.testing.assert_array_almost_equal(actual_positions[param], expected_param_positions, err_msg=param)
+
+
+def test_find_magnet_positions__blends_chunks_together_without_discontinuities(mocker):
+    # each chunk is offset by a different amount to simulate the solver settling to slightly different values
+    mocker.patch.object(
+        magnet_finding,
+        "get_positions",
+        autospec=True,
+        side_effect=lambda data, **kwargs: {"X": np.full((data.shape[-1], 24), data[0, 0])},
+    )
+
+    num_samples = 4000
+    test_fields = np.tile(np.arange(num_samples, dtype=float), (NUM_CHANNELS_24_WELL_PLATE, 1))
+
+    actual_positions = find_magnet_positions(
+        test_fields,
+        np.zeros(NUM_CHANNELS_24_WELL_PLATE),
+        {},
+        filter_inputs=False,
+        chunked=True,
+        num_workers=1,
+        chunk_size=1000,
+    )["X"]
+
+    assert actual_positions.shape == (num_samples, 24)
+    # the largest step between samples is spread over the blend region instead of occurring all at once
+    chunk_offset_diff = 1000
+    assert np.max(np.abs(np.diff(actual_positions, axis=0))) < chunk_offset_diff / 10
+
+
+def _positions_settling_from_initial_estimate(data, **kwargs):
+    # like the real solver, each sample is solved starting from the estimate of the previous sample, so the
+    # start of every solve depends on its initial estimate until the solver has settled onto the trajectory
+    target_positions = data[::9].T
+    positions = np.empty(target_positions.shape)
+    estimate = np.zeros(target_positions.shape[1])
+    for sample_idx, target in enumerate(target_positions):
+        estimate = estimate + 0.1 * (target - estimate)
+        positions[sample_idx] = estimate
+    return {"X": positions}
+
+
+def _get_chunk_seam_windows(num_samples, chunk_size):
+    # the samples around each chunk boundary that are blended or that the solver was still settling on
+    return [
+        slice(
+            chunk_start - MAGNET_FINDING_CHUNK_BLEND_NUM_SAMPLES,
+            chunk_start + MAGNET_FINDING_CHUNK_WARMUP_NUM_SAMPLES,
+        )
+        for chunk_start in range(chunk_size, num_samples, chunk_size)
+    ]
+
+
+def test_find_magnet_positions__chunked_output_matches_unchunked_output_at_seams_with_warm_started_solver(
+    mocker,
+):
+    mocker.patch.object(
+        magnet_finding, "get_positions", autospec=True, side_effect=_positions_settling_from_initial_estimate
+    )
+
+    num_samples = 4500
+    test_chunk_size = 1000
+    test_times = np.arange(num_samples) / 100
+    test_fields = np.tile(100 + 10 * np.sin(2 * np.pi * test_times), (NUM_CHANNELS_24_WELL_PLATE, 1))
+    test_baseline = np.zeros(NUM_CHANNELS_24_WELL_PLATE)
+
+    expected_positions = find_magnet_positions(test_fields, test_baseline, {}, filter_inputs=False)["X"]
+    actual_positions = find_magnet_positions(
+        test_fields,
+        test_baseline,
+        {},
+        filter_inputs=False,
+        chunked=True,
+        num_workers=1,
+        chunk_size=test_chunk_size,
+    )["X"]
+
+    seam_windows = _get_chunk_seam_windows(num_samples, test_chunk_size)
+    assert len(seam_windows) == 4
+    for seam_window in seam_windows:
+        np.testing.assert_allclose(
+            actual_positions[seam_window], expected_positions[seam_window], atol=1e-6, err_msg=seam_window
+        )
+    np.testing.assert_allclose(actual_positions, expected_positions, atol=1e-6)
+
+
+def _load_test_v1_recording_fields():
+    test_zip_file_path = os.path.join(
+        PATH_TO_H5_FILES, "v1.1.0", "ML2022126006_Position 1 Baseline_2022_06_15_004655.zip"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zipfile.ZipFile(test_zip_file_path).extractall(path=tmpdir)
+        tissue_recordings, calibration_recordings = load_files(tmpdir, None)
+        fields = calculate_magnetic_flux_density_from_memsic(format_well_file_data(tissue_recordings))
+        baseline_data = calculate_magnetic_flux_density_from_memsic(
+            format_well_file_data(calibration_recordings)
+        )
+    baseline = np.mean(baseline_data[:, -BASELINE_MEAN_NUM_DATA_POINTS:], axis=1)
+    initial_params = json.loads(tissue_recordings[0].get(INITIAL_MAGNET_FINDING_PARAMS_UUID, r"{}"))
+    return fields, baseline, initial_params
+
+
+def _assert_chunked_positions_match_at_seams(actual_positions, expected_positions, chunk_size, err_msg=""):
+    num_samples = len(next(iter(expected_positions.values())))
+    seam_windows = _get_chunk_seam_windows(num_samples, chunk_size)
+    assert len(seam_windows) > 1
+    for param, expected_param_positions in expected_positions.items():
+        for seam_window in seam_windows:
+            np.testing.assert_allclose(
+                actual_positions[param][seam_window],
+                expected_param_positions[seam_window],
+                atol=1e-3,
+                err_msg=f"{param} {seam_window} {err_msg}",
+            )
+
+
+def test_find_magnet_positions__chunked_solve_matches_unchunked_solve_at_seams_of_short_synthetic_signal():
+    recorded_fields, test_baseline, test_initial_params = _load_test_v1_recording_fields()
+    # move back and forth between two recorded states of the magnets, like a 1 Hz twitch, so that the solver
+    # has to follow a moving trajectory through each seam
+    resting_fields = recorded_fields[:, :1]
+    contracted_fields = recorded_fields[
+        :, [np.argmax(np.sum(np.abs(recorded_fields - resting_fields), axis=0))]
+    ]
+    num_samples = 1000
+    test_chunk_size = 400
+    contraction = (1 - np.cos(2 * np.pi * np.arange(num_samples) / 100)) / 2
+    test_fields = resting_fields + (contracted_fields - resting_fields) * contraction
+
+    expected_positions = find_magnet_positions(test_fields, test_baseline, test_initial_params)
+    actual_positions = find_magnet_positions(
+        test_fields,
+        test_baseline,
+        test_initial_params,
+        chunked=True,
+        num_workers=1,
+        chunk_size=test_chunk_size,
+    )
+
+    _assert_chunked_positions_match_at_seams(actual_positions, expected_positions, test_chunk_size)
+
+
+@pytest.mark.slow
+def test_find_magnet_positions__chunked_solve_matches_unchunked_solve_at_chunk_seams():
+    test_fields, test_baseline, test_initial_params = _load_test_v1_recording_fields()
+    test_chunk_size = 1000
+
+    start = time.perf_counter()
+    expected_positions = find_magnet_positions(test_fields, test_baseline, test_initial_params)
+    unchunked_dur = time.perf_counter() - start
+    start = time.perf_counter()
+    actual_positions = find_magnet_positions(
+        test_fields, test_baseline, test_initial_params, chunked=True, chunk_size=test_chunk_size
+    )
+    chunked_dur = time.perf_counter() - start
+
+    _assert_chunked_positions_match_at_seams(
+        actual_positions,
+        expected_positions,
+        test_chunk_size,
+        err_msg=f"unchunked {unchunked_dur:.2f}s, chunked {chunked_dur:.2f}s",
+    )
+
+
+def test_find_magnet_positions__raises_error_if_chunk_size_is_too_small():
+    with pytest.raises(ValueError, match="chunk_size"):
+        find_magnet_positions(
+            np.zeros((NUM_CHANNELS_24_WELL_PLATE, 100)),
+            np.zeros(NUM_CHANNELS_24_WELL_PLATE),
+            {},
+            filter_inputs=False,
+            chunked=True,
+            num_workers=1,
+            chunk_size=10,
+        )
+
+
+def test_get_magnet_finding_chunk_size__splits_recording_between_workers_and_limits_chunks_by_free_memory(
+    mocker,
+):
+    mocked_get_available_memory = mocker.patch.object(
+        magnet_finding, "_get_available_memory", autospec=True, return_value=None
+    )
+    num_samples = 100 * MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES
+
+    assert get_magnet_finding_chunk_size(num_samples, 4) == 25 * MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES
+    # chunks are never smaller than the min size
+    assert get_magnet_finding_chunk_size(num_samples, 1000) == MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES
+
+    mocked_get_available_memory.return_value = 4 * 10 * MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES * (
+        magnet_finding.MAGNET_FINDING_MEMORY_PER_SAMPLE
+    )
+    assert get_magnet_finding_chunk_size(num_samples, 4) == 10 * MIN_MAGNET_FINDING_CHUNK_NUM_SAMPLES
+
+
+@pytest.mark.parametrize("test_track_memory", [True, False])
+def test_find_magnet_positions__records_each_phase_and_chunk_in_report(test_track_memory, mocker):
+    mocker.patch.object(magnet_finding, "get_positions", autospec=True, side_effect=_positions_from_fields)
+
+    test_report = MagnetFindingReport(track_memory=test_track_memory)
+    find_magnet_positions(
+        np.random.default_rng(0).normal(size=(NUM_CHANNELS_24_WELL_PLATE, 2500)),
+        np.zeros(NUM_CHANNELS_24_WELL_PLATE),
+        {},
+        filter_outputs=True,
+        chunked=True,
+        num_workers=1,
+        chunk_size=1000,
+        report=test_report,
+    )
+
+    report_dict = test_report.to_dict()
+    assert list(report_dict["phases"]) == ["input_filtering", "solve", "output_filtering"]
+    for phase, phase_info in report_dict["phases"].items():
+        assert phase_info["completed"] is True, phase
+        assert phase_info["wall_time_secs"] >= 0, phase
+        assert ("peak_memory_bytes" in phase_info) is test_track_memory, phase
+        if magnet_finding.resource is not None:
+            assert phase_info["max_rss_bytes"] > 0, phase
+            assert 0 <= phase_info["max_rss_increase_bytes"] <= phase_info["max_rss_bytes"], phase
+            assert phase_info["max_worker_rss_bytes"] >= 0, phase
+    if test_track_memory:
+        # the filtered copy of the input is allocated during this phase
+        assert report_dict["phases"]["input_filtering"]["peak_memory_bytes"] >= 2500 * 8
+
+    assert [(chunk["start_idx"], chunk["num_samples"]) for chunk in report_dict["chunks"]] == [
+        (0, 1000),
+        (700, 1300),
+        (1700, 800),
+    ]
+    assert report_dict["total_wall_time_secs"] == sum(
+        phase_info["wall_time_secs"] for phase_info in report_dict["phases"].values()
+    )
+
+
+@pytest.mark.skipif(magnet_finding.resource is None, reason="peak RSS is only available on Unix")
+def test_MagnetFindingReport__records_peak_rss_of_each_phase():
+    test_report = MagnetFindingReport()
+    test_num_bytes = 200 * 1024**2
+
+    with test_report.measure_phase("allocate"):
+        # touch every page so that all of it becomes resident
+        test_array = np.ones(test_num_bytes // 8)
+    with test_report.measure_phase("reuse"):
+        test_array[:] = 2
+
+    allocate_phase_info = test_report.phases["allocate"]
+    reuse_phase_info = test_report.phases["reuse"]
+    # the peak could already be above the size of the array before the phase, so only check the final peak
+    assert allocate_phase_info["max_rss_bytes"] >= test_num_bytes
+    # no new memory is needed, so the peak does not grow
+    assert reuse_phase_info["max_rss_increase_bytes"] < test_num_bytes / 10
+    assert reuse_phase_info["max_rss_bytes"] >= allocate_phase_info["max_rss_bytes"]
+
+
+def test_PlateRecording__records_all_magnet_finding_phases_in_report__including_failed_phase(mocker):
+    mocked_get_positions = mocker.patch.object(
+        magnet_finding,
+        "get_positions",
+        autospec=True,
+        side_effect=lambda data, **kwargs: {"X": np.zeros((data.shape[-1], 24))},
+    )
+
+    pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH)
+    assert list(pr.magnet_finding_report.phases) == [
+        "fix_dropped_samples",
+        "memsic_conversion",
+        "input_filtering",
+        "solve",
+    ]
+    assert len(pr.magnet_finding_report.chunks) == 1
+
+    mocked_get_positions.side_effect = UnableToConvergeError()
+    test_report = MagnetFindingReport()
+    with pytest.raises(UnableToConvergeError):
+        PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, magnet_finding_report=test_report)
+    assert test_report.phases["solve"]["completed"] is False
+    assert test_report.chunks == []
+
+
+@pytest.mark.parametrize("test_chunk_size", [400, 1000, 10**9])
+@pytest.mark.parametrize("test_decimation_factor", [1, 3])
+@pytest.mark.parametrize("test_window", [slice(None), slice(150, 1350)])
+def test_stream_plate_data__matches_processing_whole_recording_at_once(
+    test_window, test_decimation_factor, test_chunk_size
+):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zipfile.ZipFile(TEST_SMALL_BETA_2_FILE_PATH).extractall(path=tmpdir)
+        well_files, _ = load_files(tmpdir, None)
+
+    test_baseline = np.random.default_rng(0).normal(size=NUM_CHANNELS_24_WELL_PLATE)
+
+    plate_data, expected_dropped_sample_counts = fix_dropped_samples(
+        format_well_file_data(well_files, test_window), return_counts=True
+    )
+    plate_data_mt = calculate_magnetic_flux_density_from_memsic(plate_data)
+    if test_decimation_factor > 1:
+        processed_plate_data = decimate_plate_data(plate_data_mt, test_decimation_factor)
+    else:
+        processed_plate_data = filter_raw_signal(plate_data_mt)
+    expected_solver_input = (processed_plate_data.T - test_baseline).T
+
+    actual_solver_input, actual_dropped_sample_counts = stream_plate_data(
+        well_files,
+        test_baseline,
+        test_window,
+        chunk_size=test_chunk_size,
+        decimation_factor=test_decimation_factor,
+    )
+
+    np.testing.assert_allclose(actual_solver_input, expected_solver_input, atol=1e-8)
+    np.testing.assert_array_equal(actual_dropped_sample_counts, expected_dropped_sample_counts)
+
+
+def test_PlateRecording__streaming_ingest_passes_same_data_to_magnet_finding_alg(mocker):
+    mocked_get_positions = mocker.patch.object(
+        magnet_finding,
+        "get_positions",
+        autospec=True,
+        side_effect=lambda data, **kwargs: {"X": np.zeros((data.shape[-1], 24))},
+    )
+
+    PlateRecording(TEST_SMALL_BETA_2_FILE_PATH)
+    expected_solver_input = mocked_get_positions.call_args[0][0]
+
+    pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, ingest_chunk_size=500, lazy_load=True)
+    actual_solver_input = mocked_get_positions.call_args[0][0]
+
+    np.testing.assert_allclose(actual_solver_input, expected_solver_input, atol=1e-8)
+    assert "streaming_ingest" in pr.magnet_finding_report.phases
+    assert pr.dropped_sample_counts.shape == (NUM_CHANNELS_24_WELL_PLATE,)
@@ -1,24 +1,41 @@
 # -*- coding: utf-8 -*-
 from collections import defaultdict
+import io
 import os
 from secrets import choice
+import shutil
+import zipfile
 
 import numpy as np
 from pulse3D import plate_recording
+from pulse3D.cache import hash_file_contents
+from pulse3D.cache import WaveformCache
+from pulse3D.constants import BETA_1_DATA_NAMES
+from pulse3D.constants import INTERPOLATED_DATA_PERIOD_US
+from pulse3D.constants import MAX_PYRAMID_TOP_LEVEL_NUM_BUCKETS
 from pulse3D.constants import MICRO_TO_BASE_CONVERSION
+from pulse3D.constants import MIN_PYRAMID_BUCKET_NUM_SAMPLES
 from pulse3D.constants import NOT_APPLICABLE_H5_METADATA
 from pulse3D.constants import NOT_APPLICABLE_LABEL
 from pulse3D.constants import PLATEMAP_LABEL_UUID
 from pulse3D.constants import PLATEMAP_NAME_UUID
+from pulse3D.constants import REFERENCE_SENSOR_READINGS
+from pulse3D.constants import TIME_OFFSETS
 from pulse3D.constants import TISSUE_SAMPLING_PERIOD_UUID
+from pulse3D.constants import TISSUE_SENSOR_READINGS
 from pulse3D.constants import TWENTY_FOUR_WELL_PLATE
 from pulse3D.constants import WELL_INDEX_UUID
 from pulse3D.constants import WELL_NAME_UUID
 from pulse3D.exceptions import DuplicateWellsFoundError
 from pulse3D.exceptions import IncorrectOpticalFileFormatError
+from pulse3D.magnet_finding import fix_dropped_samples
 from pulse3D.magnet_finding import format_well_file_data
 from pulse3D.plate_recording import PlateRecording
 from pulse3D.plate_recording import WellFile
+from pulse3D.transforms import calculate_displacement_from_voltage
+from pulse3D.transforms import calculate_force_from_displacement
+from pulse3D.transforms import calculate_voltage_from_gmr
+from pulse3D.transforms import NOISE_FILTER_BANK
 import pytest
 
 from ..fixtures_utils import PATH_TO_H5_FILES
@@ -26,7 +43,10 @@ from ..fixtures_utils import PATH_TO_MAGNET_FINDING_FILES
 from ..fixtures_utils import TEST_OPTICAL_FILE_ALL_WELLS
 from ..fixtures_utils import TEST_OPTICAL_FILE_CONTAINS_OUTPUT_XLSX
 from ..fixtures_utils import TEST_OPTICAL_FILE_DUPLICATES
+from ..fixtures_utils import TEST_OPTICAL_FILE_NO_DUPLICATES
 from ..fixtures_utils import TEST_OPTICAL_FILE_ONE_PATH
+from ..fixtures_utils import TEST_OPTICAL_FILE_THREE_PATH
+from ..fixtures_utils import TEST_OPTICAL_FILE_TWO_PATH
 from ..fixtures_utils import TEST_SMALL_BETA_1_FILE_PATH
 from ..fixtures_utils import TEST_SMALL_BETA_2_FILE_PATH
 
@@ -38,6 +58,10 @@ TEST_VAR_STIM_SESSIONS_FILE_PATH = os.path.join(
     PATH_TO_H5_FILES, "stim", "StimInterpolationTest-VariableSessions.zip"
 )
 
+TEST_BETA_1_WELL_FILE_PATH = os.path.join(
+    PATH_TO_H5_FILES, "v0.3.1", "MA201110001__2020_09_03_213024", "MA201110001__2020_09_03_213024__A1.h5"
+)
+
 
 @pytest.mark.parametrize(
     "test_platemap_name,test_label_meta_options",
@@ -124,6 +148,79 @@ def test_PlateRecording__force_timepoints_start_at_zero(test_file_path, mocker):
         assert wf.force[0, 0] == 0, well_idx
 
 
+def test_PlateRecording__stores_V1_waveforms_of_all_wells_in_a_single_array(mocker):
+    mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda x, *args, **kwargs: {"X": np.random.rand(x.shape[-1], 24)},
+    )
+
+    pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH)
+
+    plate_waveforms = pr.plate_waveforms
+    assert plate_waveforms.data.flags.c_contiguous
+    assert plate_waveforms.num_wells == 24
+
+    for well_idx, wf in enumerate(pr):
+        for well_waveform in (wf.displacement, wf.force):
+            assert np.shares_memory(well_waveform, plate_waveforms.data), well_idx
+            assert not well_waveform.flags.writeable, well_idx
+            np.testing.assert_array_equal(well_waveform[0], plate_waveforms.time_indices)
+
+        np.testing.assert_array_equal(wf.displacement[1], plate_waveforms.displacement[well_idx])
+        np.testing.assert_array_equal(wf.force[1], plate_waveforms.force[well_idx])
+        np.testing.assert_array_equal(
+            wf.force, calculate_force_from_displacement(wf.displacement, stiffness_factor=wf.stiffness_factor)
+        )
+
+
+def test_PlateRecording__get_force_pyramid__creates_pyramid_of_all_V1_wells_at_once(mocker):
+    mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda x, *args, **kwargs: {"X": np.random.rand(x.shape[-1], 24)},
+    )
+    spied_create_pyramid = mocker.spy(plate_recording, "create_min_max_pyramid")
+
+    pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH)
+    pyramid = pr.get_force_pyramid()
+    assert pr.get_force_pyramid() is pyramid
+    assert spied_create_pyramid.call_count == 1
+
+    levels = pyramid.levels
+    assert levels[-1].shape[-1] <= MAX_PYRAMID_TOP_LEVEL_NUM_BUCKETS
+    for well_idx, wf in enumerate(pr):
+        well_pyramid = pr.get_force_pyramid(well_idx)
+        for level in range(pyramid.num_levels):
+            bucket_times, mins, maxs = well_pyramid.get_level(level)
+            bucket_size = pyramid.get_bucket_size(level)
+            np.testing.assert_array_equal(bucket_times, wf.force[0, ::bucket_size])
+            buckets = [wf.force[1, i : i + bucket_size] for i in range(0, wf.force.shape[1], bucket_size)]
+            np.testing.assert_array_equal(mins[0], [bucket.min() for bucket in buckets])
+            np.testing.assert_array_equal(maxs[0], [bucket.max() for bucket in buckets])
+            np.testing.assert_array_equal(maxs[0], levels[level][1, well_idx])
+    assert spied_create_pyramid.call_count == 1
+
+
+def test_PlateRecording__get_force_pyramid__creates_pyramid_of_each_optical_well_individually():
+    pr = PlateRecording(TEST_OPTICAL_FILE_ONE_PATH)
+
+    with pytest.raises(ValueError, match="well index must be given"):
+        pr.get_force_pyramid()
+
+    for well_idx, wf in enumerate(pr.wells):
+        if not wf:
+            continue
+        well_pyramid = pr.get_force_pyramid(well_idx)
+        assert pr.get_force_pyramid(well_idx) is well_pyramid
+        bucket_times, mins, maxs = well_pyramid.get_level(0)
+        np.testing.assert_array_equal(bucket_times, wf.force[0, ::MIN_PYRAMID_BUCKET_NUM_SAMPLES])
+        assert mins.min() == wf.force[1].min()
+        assert maxs.max() == wf.force[1].max()
+
+
 def test_PlateRecording__stim_timepoints_start_at_zero_or_earlier(mocker):
     # mock so magnet finding alg doesn't run
     mocker.patch.object(
@@ -151,7 +248,7 @@ def test_PlateRecording__removes_dropped_samples_from_raw_tissue_signal_before_c
         plate_recording,
         "find_magnet_positions",
         autospec=True,
-        side_effect=lambda data, *args: {"X": np.zeros((data[0].shape[-1], 24))},
+        side_effect=lambda data, *args, **kwargs: {"X": np.zeros((data[0].shape[-1], 24))},
     )
 
     pr = PlateRecording(
@@ -160,10 +257,233 @@ def test_PlateRecording__removes_dropped_samples_from_raw_tissue_signal_before_c
             "MA200440001__2020_02_09_190359__with_calibration_recordings__zipped_as_folder.zip",
         )
     )
+    # the plate data is fixed in place, so compare against the fixed version of the original data
     actual_plate_data = spied_fix.call_args[0][0]
-    expected_plate_data = format_well_file_data(pr.wells)
+    expected_plate_data, expected_dropped_sample_counts = fix_dropped_samples(
+        format_well_file_data(pr.wells), return_counts=True
+    )
     np.testing.assert_array_equal(actual_plate_data, expected_plate_data)
-    np.testing.assert_array_equal(spied_mfd.call_args_list[0][0][0], spied_fix.spy_return)
+    fixed_plate_data, _ = spied_fix.spy_return
+    np.testing.assert_array_equal(spied_mfd.call_args_list[0][0][0], fixed_plate_data)
+    np.testing.assert_array_equal(pr.dropped_sample_counts, expected_dropped_sample_counts)
+
+
+def test_PlateRecording__lazy_load_produces_same_data_as_eager_load_without_reading_unused_datasets(mocker):
+    spied_fix = mocker.spy(plate_recording, "fix_dropped_samples")
+    # mock instead of spy so magnet finding alg doesn't run
+    mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda data, *args, **kwargs: {
+            "X": np.tile(np.arange(data.shape[-1]), (24, 1)).T.astype(float)
+        },
+    )
+
+    eager_pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH)
+    eager_plate_data = spied_fix.call_args[0][0]
+    lazy_pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, lazy_load=True)
+    lazy_plate_data = spied_fix.call_args[0][0]
+
+    np.testing.assert_array_equal(lazy_plate_data, eager_plate_data)
+    for eager_wf, lazy_wf in zip(eager_pr, lazy_pr):
+        np.testing.assert_array_equal(lazy_wf.force, eager_wf.force)
+        # datasets not needed for the V1 analysis should never be read into memory
+        assert REFERENCE_SENSOR_READINGS not in lazy_wf.attrs
+        assert TIME_OFFSETS not in lazy_wf.attrs
+        assert TISSUE_SENSOR_READINGS not in lazy_wf.attrs
+
+
+def test_WellFile__lean_retention_produces_same_data_as_full_retention_without_keeping_intermediates():
+    full_wf = WellFile(TEST_BETA_1_WELL_FILE_PATH, retention="full")
+    lean_wf = WellFile(TEST_BETA_1_WELL_FILE_PATH)
+
+    assert lean_wf.retention == "lean"
+    assert list(full_wf._beta_1_data) == list(BETA_1_DATA_NAMES)
+    assert lean_wf._beta_1_data == {}
+
+    np.testing.assert_array_equal(lean_wf.displacement, full_wf.displacement)
+    np.testing.assert_array_equal(lean_wf.force, full_wf.force)
+    # displacement and force should share a single time row
+    assert np.shares_memory(lean_wf.displacement, lean_wf.force)
+
+    for name in BETA_1_DATA_NAMES:
+        np.testing.assert_array_equal(getattr(lean_wf, name), getattr(full_wf, name), err_msg=name)
+    # only the compressed arrays are kept after being accessed
+    assert sorted(lean_wf._beta_1_data) == sorted(
+        name for name in BETA_1_DATA_NAMES if name.startswith("compressed_")
+    )
+
+
+def test_WellFile__fused_transform_produces_same_data_as_individual_transforms():
+    wf = WellFile(TEST_BETA_1_WELL_FILE_PATH)
+
+    expected_displacement = calculate_displacement_from_voltage(
+        calculate_voltage_from_gmr(wf.noise_filtered_magnetic_data)
+    )
+    expected_force = calculate_force_from_displacement(
+        expected_displacement, stiffness_factor=wf.stiffness_factor, in_mm=False
+    )
+
+    np.testing.assert_array_equal(wf.displacement, expected_displacement)
+    np.testing.assert_array_equal(wf.force, expected_force)
+
+
+def test_WellFile__noise_filters_in_blocks_when_given_block_size():
+    wf = WellFile(TEST_BETA_1_WELL_FILE_PATH)
+    block_wf = WellFile(TEST_BETA_1_WELL_FILE_PATH, noise_filter_block_size=1000)
+
+    expected_data = NOISE_FILTER_BANK.filter_in_blocks(
+        wf.fully_calibrated_magnetic_data,
+        wf.noise_filter_uuid,
+        wf.tissue_sampling_period,
+        block_num_samples=1000,
+    )
+    np.testing.assert_array_equal(block_wf.noise_filtered_magnetic_data, expected_data)
+    # only the samples near the seams between blocks can differ
+    np.testing.assert_allclose(
+        block_wf.noise_filtered_magnetic_data, wf.noise_filtered_magnetic_data, rtol=0, atol=1
+    )
+
+
+@pytest.mark.parametrize("test_extract", [True, False])
+def test_PlateRecording__noise_filters_beta_1_files_in_blocks_of_ingest_chunk_size(
+    test_extract, mocker, tmp_path
+):
+    test_path = TEST_SMALL_BETA_1_FILE_PATH
+    if test_extract:
+        # dirs of H5 files and zip files are loaded separately
+        shutil.unpack_archive(test_path, tmp_path)
+        test_path = str(tmp_path)
+
+    spied_filter_in_blocks = mocker.spy(NOISE_FILTER_BANK, "filter_in_blocks")
+
+    pr = PlateRecording(test_path, ingest_chunk_size=1000)
+
+    assert spied_filter_in_blocks.call_count == len([wf for wf in pr if wf])
+    for call in spied_filter_in_blocks.call_args_list:
+        assert call.kwargs["block_num_samples"] == 1000
+
+
+@pytest.mark.parametrize("test_hash_contents", [True, False])
+def test_WellFile__does_not_keep_in_memory_calibration_file_after_loading_it(test_hash_contents):
+    with zipfile.ZipFile(TEST_SMALL_BETA_2_FILE_PATH) as zf:
+        test_member_name = next(name for name in zf.namelist() if "Calibration" in name)
+        test_contents = zf.read(test_member_name)
+
+    wf = WellFile(test_member_name, file_obj=io.BytesIO(test_contents), hash_contents=test_hash_contents)
+
+    assert wf._file_obj is None
+    if test_hash_contents:
+        assert wf.get_content_hash() == hash_file_contents([io.BytesIO(test_contents)])
+
+
+def test_WellFile__raises_error_if_retention_is_invalid():
+    with pytest.raises(ValueError, match="Invalid retention"):
+        WellFile(TEST_BETA_1_WELL_FILE_PATH, retention="none")
+
+
+def test_PlateRecording__only_reads_data_in_analysis_window_when_given_start_and_end_time(mocker):
+    spied_fix = mocker.spy(plate_recording, "fix_dropped_samples")
+    spied_read_direct = mocker.spy(plate_recording.h5py.Dataset, "read_direct")
+    # mock instead of spy so magnet finding alg doesn't run
+    mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda data, *args, **kwargs: {
+            "X": np.tile(np.arange(data.shape[-1]), (24, 1)).T.astype(float)
+        },
+    )
+
+    test_start_time = 1
+    test_end_time = 3.6
+
+    eager_pr = PlateRecording(
+        TEST_SMALL_BETA_2_FILE_PATH, start_time=test_start_time, end_time=test_end_time, lazy_load=False
+    )
+    eager_plate_data = spied_fix.call_args[0][0]
+    assert spied_read_direct.call_count == 0
+
+    lazy_pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, start_time=test_start_time, end_time=test_end_time)
+    lazy_plate_data = spied_fix.call_args[0][0]
+
+    sampling_freq = MICRO_TO_BASE_CONVERSION / lazy_pr.wells[0][TISSUE_SAMPLING_PERIOD_UUID]
+    expected_window = slice(int(test_start_time * sampling_freq), int(test_end_time * sampling_freq))
+    # the recording and calibration data of each well should have been read directly from the file
+    assert spied_read_direct.call_count == 48
+    for call in spied_read_direct.call_args_list[:24]:
+        assert call.kwargs["source_sel"] == (Ellipsis, expected_window)
+
+    np.testing.assert_array_equal(lazy_plate_data, eager_plate_data)
+    for eager_wf, lazy_wf in zip(eager_pr, lazy_pr):
+        np.testing.assert_array_equal(lazy_wf.force, eager_wf.force)
+
+
+def test_PlateRecording__loads_cached_waveforms_instead_of_running_magnet_finding_again(mocker, tmp_path):
+    # mock instead of spy so magnet finding alg doesn't run
+    mocked_find_positions = mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda data, *args, **kwargs: {"X": np.random.rand(data.shape[-1], 24)},
+    )
+
+    pr = PlateRecording(TEST_TWO_STIM_SESSIONS_FILE_PATH, waveform_cache=WaveformCache(str(tmp_path)))
+    assert mocked_find_positions.call_count == 1
+
+    cached_pr = PlateRecording(TEST_TWO_STIM_SESSIONS_FILE_PATH, waveform_cache=WaveformCache(str(tmp_path)))
+    assert mocked_find_positions.call_count == 1
+
+    for wf, cached_wf in zip(pr, cached_pr):
+        np.testing.assert_array_equal(cached_wf.displacement, wf.displacement)
+        np.testing.assert_array_equal(cached_wf.force, wf.force)
+        assert len(cached_wf.stim_sessions) == len(wf.stim_sessions)
+        for stim_session, cached_stim_session in zip(wf.stim_sessions, cached_wf.stim_sessions):
+            np.testing.assert_array_equal(cached_stim_session, stim_session)
+    assert cached_pr.contains_stim_data is pr.contains_stim_data is True
+
+    # the force pyramid should be cached alongside the waveforms
+    spied_create_pyramid = mocker.spy(plate_recording, "create_min_max_pyramid")
+    cached_pyramid = cached_pr.get_force_pyramid()
+    assert spied_create_pyramid.call_count == 0
+    for level_arr, cached_level_arr in zip(pr.get_force_pyramid().levels, cached_pyramid.levels):
+        np.testing.assert_array_equal(cached_level_arr, level_arr)
+
+    # changing an arg that affects the waveforms should not use the cached waveforms
+    PlateRecording(TEST_TWO_STIM_SESSIONS_FILE_PATH, end_time=5, waveform_cache=WaveformCache(str(tmp_path)))
+    assert mocked_find_positions.call_count == 2
+
+
+def test_PlateRecording__restores_results_from_waveform_cache_without_hashing_unmodified_files_again(
+    mocker, tmp_path
+):
+    # mock instead of spy so magnet finding alg doesn't run
+    mocked_find_positions = mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda data, *args, **kwargs: {"X": np.random.rand(data.shape[-1], 24)},
+    )
+    spied_hash_file_contents = mocker.spy(plate_recording, "hash_file_contents")
+
+    test_file_path = shutil.copy(TEST_TWO_STIM_SESSIONS_FILE_PATH, tmp_path)
+    test_cache = WaveformCache(str(tmp_path / "cache"))
+
+    pr = PlateRecording(test_file_path, waveform_cache=test_cache)
+    assert spied_hash_file_contents.call_count == 1
+
+    cached_pr = PlateRecording(test_file_path, waveform_cache=test_cache)
+    assert mocked_find_positions.call_count == 1
+    assert spied_hash_file_contents.call_count == 1
+    np.testing.assert_array_equal(cached_pr.dropped_sample_counts, pr.dropped_sample_counts)
+    assert cached_pr.magnet_finding_report.to_dict() == pr.magnet_finding_report.to_dict()
+
+    # the contents of the file have not changed, so the entry should still be found after hashing them
+    os.utime(test_file_path, ns=(0, 0))
+    PlateRecording(test_file_path, waveform_cache=test_cache)
+    assert mocked_find_positions.call_count == 1
+    assert spied_hash_file_contents.call_count == 2
 
 
 def test_PlateRecording__slices_data_before_analysis(mocker):
@@ -172,7 +492,7 @@ def test_PlateRecording__slices_data_before_analysis(mocker):
         plate_recording,
         "find_magnet_positions",
         autospec=True,
-        side_effect=lambda data, *args: {"X": np.zeros((data[0].shape[-1], 24))},
+        side_effect=lambda data, *args, **kwargs: {"X": np.zeros((data[0].shape[-1], 24))},
     )
 
     test_start_time = 1
@@ -238,12 +558,14 @@ def test_PlateRecording__v1_data_loaded_from_dataframe_will_equal_original_well_
         # 0.0, 10000.0, 20003.0, 30000.0, 40001.0, 50000.0, 60001.0, 70001.0, 80001.0, 90001.0 and to_dataframe makes them
         # 0.0, 10000.0, 20000.0, 30000.0, 40000.0, 50000.0, 60000.0, 70000.0, 80000.0, 90000.0
 
-        # convert to seconds and then only check two decimal places
-        original_wf.force[0] /= MICRO_TO_BASE_CONVERSION
+        # convert to seconds and then only check two decimal places.
+        # The original force is a read-only view into the plate waveforms, so it must be copied first
+        original_force = original_wf.force.copy()
+        original_force[0] /= MICRO_TO_BASE_CONVERSION
         recreated_wf.force[0] /= MICRO_TO_BASE_CONVERSION
 
         np.testing.assert_array_almost_equal(
-            recreated_wf.force, original_wf.force, decimal=2, err_msg=f"Well {well_idx} force"
+            recreated_wf.force, original_force, decimal=2, err_msg=f"Well {well_idx} force"
         )
 
         assert len(original_wf.stim_sessions) == len(recreated_wf.stim_sessions), f"Well {well_idx}"
@@ -346,6 +668,65 @@ def test_PlateRecording__loads_from_zipped_xlsx_correctly():
     assert all(pr.wells)
 
 
+@pytest.mark.parametrize("test_executor_type", ["thread", "process"])
+def test_PlateRecording__loads_zipped_xlsx_files_in_parallel_correctly(test_executor_type):
+    serial_pr = PlateRecording(TEST_OPTICAL_FILE_NO_DUPLICATES)
+    parallel_pr = PlateRecording(
+        TEST_OPTICAL_FILE_NO_DUPLICATES, load_workers=2, load_executor_type=test_executor_type
+    )
+
+    assert len(parallel_pr.wells) == len(serial_pr.wells) > 1
+    for serial_wf, parallel_wf in zip(serial_pr, parallel_pr):
+        assert parallel_wf[WELL_NAME_UUID] == serial_wf[WELL_NAME_UUID]
+        np.testing.assert_array_equal(parallel_wf.force, serial_wf.force)
+
+
+@pytest.mark.parametrize("test_prefetch", [1, 3])
+def test_PlateRecording_from_directory__prefetching_yields_same_recordings_in_same_order(
+    test_prefetch, tmp_path
+):
+    for test_file_path in (
+        TEST_OPTICAL_FILE_ONE_PATH,
+        TEST_OPTICAL_FILE_TWO_PATH,
+        TEST_OPTICAL_FILE_THREE_PATH,
+    ):
+        shutil.copy(test_file_path, tmp_path)
+
+    expected_recordings = list(PlateRecording.from_directory(str(tmp_path)))
+    actual_recordings = list(PlateRecording.from_directory(str(tmp_path), prefetch=test_prefetch))
+
+    assert [pr.path for pr in actual_recordings] == [pr.path for pr in expected_recordings]
+    for expected_pr, actual_pr in zip(expected_recordings, actual_recordings):
+        np.testing.assert_array_equal(actual_pr.wells[0].force, expected_pr.wells[0].force)
+
+
+def test_PlateRecording_from_directory__prefetching_raises_loading_error_for_recording_it_belongs_to(
+    mocker, tmp_path
+):
+    test_paths = [str(tmp_path / f"recording_{i}.xlsx") for i in range(6)]
+    mocker.patch.object(
+        plate_recording, "_get_recording_paths_in_dir", autospec=True, return_value=test_paths
+    )
+
+    def load_recording_se(path, *args, **kwargs):
+        if path == test_paths[1]:
+            raise IncorrectOpticalFileFormatError(path)
+        return path
+
+    mocked_init = mocker.patch.object(
+        plate_recording, "PlateRecording", autospec=True, side_effect=load_recording_se
+    )
+
+    recordings = PlateRecording.from_directory(str(tmp_path), prefetch=2)
+    assert next(recordings) == test_paths[0]
+    with pytest.raises(IncorrectOpticalFileFormatError, match=test_paths[1]):
+        next(recordings)
+    # no more recordings should be yielded after an error
+    assert next(recordings, None) is None
+    # prefetching should never load more than the current recording and the given number of upcoming recordings
+    assert mocked_init.call_count <= 2 + 2
+
+
 def test_PlateRecording__raises_error_when_duplicate_wells_found_in_optical_files():
     with pytest.raises(DuplicateWellsFoundError):
         PlateRecording(TEST_OPTICAL_FILE_DUPLICATES)
@@ -356,3 +737,43 @@ def test_PlateRecording__raises_error_when_xlsx_output_found_in_zipped_optical_f
         IncorrectOpticalFileFormatError, match="Incorrect number of sheets found for file xlsx_test_full.xlsx"
     ):
         PlateRecording(TEST_OPTICAL_FILE_CONTAINS_OUTPUT_XLSX)
+
+
+@pytest.mark.parametrize("test_decimation_factor", [2, 5])
+def test_PlateRecording__preview_mode_decimates_data_before_magnet_finding_and_upsamples_results(
+    test_decimation_factor, mocker
+):
+    mocked_find_positions = mocker.patch.object(
+        plate_recording,
+        "find_magnet_positions",
+        autospec=True,
+        side_effect=lambda data, *args, **kwargs: {
+            "X": np.tile(np.arange(data.shape[-1]), (24, 1)).T.astype(float)
+        },
+    )
+
+    full_pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH)
+    full_num_samples = mocked_find_positions.call_args[0][0].shape[-1]
+    assert mocked_find_positions.call_args[1]["filter_inputs"] is True
+    assert full_pr.decimation_factor == 1
+
+    preview_pr = PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, preview_decimation_factor=test_decimation_factor)
+    preview_num_samples = mocked_find_positions.call_args[0][0].shape[-1]
+    # decimation low-pass filters the data, so the input filter should not be applied again
+    assert mocked_find_positions.call_args[1]["filter_inputs"] is False
+    assert preview_pr.decimation_factor == test_decimation_factor
+    assert preview_num_samples == -(-full_num_samples // test_decimation_factor)
+
+    preview_time_indices = preview_pr.plate_waveforms.time_indices
+    assert preview_time_indices[0] == 0
+    assert set(np.diff(preview_time_indices)) == {INTERPOLATED_DATA_PERIOD_US}
+    # the preview should cover the same time range as the full data, minus at most one decimated sample
+    full_duration = full_pr.plate_waveforms.time_indices[-1]
+    preview_duration = preview_time_indices[-1]
+    assert full_duration - preview_duration <= (test_decimation_factor + 1) * INTERPOLATED_DATA_PERIOD_US
+
+
+@pytest.mark.parametrize("test_decimation_factor", [0, -1, 1.5])
+def test_PlateRecording__raises_error_if_preview_decimation_factor_is_invalid(test_decimation_factor):
+    with pytest.raises(ValueError, match="preview_decimation_factor"):
+        PlateRecording(TEST_SMALL_BETA_2_FILE_PATH, preview_decimation_factor=test_decimation_factor)
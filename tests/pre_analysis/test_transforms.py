@@ -1,13 +1,29 @@
 # -*- coding: utf-8 -*-
 from random import randint
+import time
 
 import numpy as np
+import pandas as pd
+from pulse3D import transforms
+from pulse3D.constants import BESSEL_LOWPASS_10_UUID
+from pulse3D.constants import BUTTERWORTH_LOWPASS_30_UUID
 from pulse3D.constants import CARDIAC_STIFFNESS_FACTOR
+from pulse3D.constants import INTERPOLATED_DATA_PERIOD_US
 from pulse3D.constants import MILLI_TO_BASE_CONVERSION
 from pulse3D.constants import NEWTONS_PER_MILLIMETER
 from pulse3D.constants import SKM_STIFFNESS_FACTOR
+from pulse3D.transforms import apply_noise_filtering
 from pulse3D.transforms import calculate_force_from_displacement
+from pulse3D.transforms import create_filter
+from pulse3D.transforms import create_min_max_pyramid
+from pulse3D.transforms import decimate_plate_data
+from pulse3D.transforms import NoiseFilterBank
+from pulse3D.transforms import resample_plate_data
+from pulse3D.utils import TimeAxis
+from pulse3D.utils import truncate
 import pytest
+from scipy import interpolate
+from scipy import signal
 
 
 @pytest.mark.parametrize("test_stiffness_factor", [CARDIAC_STIFFNESS_FACTOR, SKM_STIFFNESS_FACTOR, None])
@@ -45,3 +61,215 @@ def test_calculate_force_from_displacement__returns_correct_values__with_in_mm_s
 
     np.testing.assert_array_equal(force_arr[0, :], test_timepoints)
     np.testing.assert_array_almost_equal(force_arr[1, :], expected_force)
+
+
+def _create_test_plate_waveforms(num_samples, num_wells=24, sampling_period_us=10000):
+    # V1 recordings have the same time values for every well
+    timepoints = np.arange(num_samples, dtype=np.float64) * sampling_period_us
+    return [np.array([timepoints, np.random.rand(num_samples)]) for _ in range(num_wells)]
+
+
+def test_resample_plate_data__returns_same_values_as_interp1d_for_each_well():
+    test_waveforms = _create_test_plate_waveforms(1000, num_wells=4)
+    # add a well with different time values and a missing well
+    test_waveforms.append(np.array([np.arange(3, 600, dtype=np.float64) * 7321, np.random.rand(597)]))
+    test_waveforms.append(None)
+    test_timepoints = np.arange(0, 1000 * 10000 + 5000, 2500, dtype=np.float64)
+
+    resampled_data, bounds = resample_plate_data(test_waveforms, test_timepoints)
+    assert resampled_data.shape == (len(test_waveforms), len(test_timepoints))
+
+    for well_idx, waveform in enumerate(test_waveforms):
+        if waveform is None:
+            assert np.isnan(resampled_data[well_idx]).all()
+            assert list(bounds[well_idx]) == [-1, -1]
+            continue
+
+        expected_bounds = truncate(test_timepoints, waveform[0, 0], waveform[0, -1])
+        assert tuple(bounds[well_idx]) == expected_bounds, well_idx
+
+        start_idx, end_idx = expected_bounds
+        expected_data = interpolate.interp1d(*waveform)(test_timepoints[start_idx : end_idx + 1])
+        np.testing.assert_array_equal(
+            resampled_data[well_idx, start_idx : end_idx + 1], expected_data, err_msg=well_idx
+        )
+        assert np.isnan(resampled_data[well_idx, :start_idx]).all()
+        assert np.isnan(resampled_data[well_idx, end_idx + 1 :]).all()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("test_duration_mins", [1, 10, 60])
+def test_resample_plate_data__benchmark_against_per_well_interpolation(test_duration_mins):
+    # 100 Hz recording
+    test_waveforms = _create_test_plate_waveforms(test_duration_mins * 60 * 100)
+    test_timepoints = np.arange(0, test_waveforms[0][0, -1], INTERPOLATED_DATA_PERIOD_US, dtype=np.float64)
+
+    start = time.perf_counter()
+    expected_data = []
+    for waveform in test_waveforms:
+        start_idx, end_idx = truncate(test_timepoints, waveform[0, 0], waveform[0, -1])
+        interp_fn = interpolate.interp1d(*waveform)
+        expected_data.append(pd.Series(interp_fn(test_timepoints[start_idx : end_idx + 1])))
+    per_well_dur = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resampled_data, _ = resample_plate_data(test_waveforms, test_timepoints)
+    plate_dur = time.perf_counter() - start
+
+    np.testing.assert_array_equal(
+        resampled_data,
+        np.array(expected_data),
+        err_msg=f"{test_duration_mins} min: per well {per_well_dur:.3f}s, plate {plate_dur:.3f}s",
+    )
+
+
+@pytest.mark.parametrize("test_window", [(0, 1199), (250, 700), (900, 1100), (700, 650)])
+def test_resample_plate_data__only_resamples_timepoints_in_window(test_window):
+    test_waveforms = _create_test_plate_waveforms(1000)
+    # wells that start late, end early, and a missing well
+    test_waveforms[1][0] += 200 * INTERPOLATED_DATA_PERIOD_US
+    test_waveforms[2] = test_waveforms[2][:, :500]
+    test_waveforms[3] = None
+    test_timepoints = TimeAxis(0, INTERPOLATED_DATA_PERIOD_US, 1200)
+
+    all_resampled_data, all_bounds = resample_plate_data(test_waveforms, test_timepoints)
+    resampled_data, bounds = resample_plate_data(test_waveforms, test_timepoints, window=test_window)
+
+    first_idx, last_idx = test_window
+    np.testing.assert_array_equal(resampled_data, all_resampled_data[:, first_idx : last_idx + 1])
+    for well_idx, (actual_bounds, full_bounds) in enumerate(zip(bounds, all_bounds)):
+        if test_waveforms[well_idx] is None:
+            assert tuple(actual_bounds) == (-1, -1)
+        else:
+            expected_bounds = (max(full_bounds[0], first_idx), min(full_bounds[1], last_idx))
+            assert tuple(actual_bounds) == expected_bounds, well_idx
+
+
+@pytest.mark.parametrize("test_decimation_factor,expected_num_samples", [(2, 500), (3, 334), (10, 100)])
+def test_decimate_plate_data__keeps_every_nth_sample_of_low_frequency_signals(
+    test_decimation_factor, expected_num_samples
+):
+    sample_times = np.arange(1000) / 100
+    # 1 Hz signal at 100 Hz, well below the Nyquist frequency after decimation
+    test_plate_data = np.array([np.sin(2 * np.pi * sample_times + phase) for phase in range(24)])
+
+    decimated_data = decimate_plate_data(test_plate_data, test_decimation_factor)
+
+    assert decimated_data.shape == (24, expected_num_samples)
+    # ignore the edges where the filter has transients
+    np.testing.assert_allclose(
+        decimated_data[:, 10:-10], test_plate_data[:, ::test_decimation_factor][:, 10:-10], atol=0.01
+    )
+
+
+@pytest.mark.parametrize("test_decimation_factor", [2, 3, 10])
+def test_decimate_plate_data__removes_frequencies_above_the_new_nyquist_frequency(test_decimation_factor):
+    sample_times = np.arange(1000) / 100
+    new_nyquist_freq = 100 / test_decimation_factor / 2
+    test_plate_data = np.sin(2 * np.pi * 1.2 * new_nyquist_freq * sample_times)[np.newaxis, :]
+
+    decimated_data = decimate_plate_data(test_plate_data, test_decimation_factor)
+
+    assert np.abs(decimated_data[:, 10:-10]).max() < 0.01
+
+
+def _create_test_gmr_data(num_samples, sampling_period_us):
+    timepoints = np.arange(num_samples) * sampling_period_us
+    amplitudes = np.random.randint(-100000, 100000, num_samples) + 500000 * np.sin(timepoints / 1e5)
+    return np.array([timepoints, amplitudes], dtype=np.int32)
+
+
+def test_NoiseFilterBank__only_creates_coefficients_once_for_each_filter_and_sampling_period(mocker):
+    spied_create_filter = mocker.spy(transforms, "create_filter")
+    filter_bank = NoiseFilterBank()
+
+    first_sos = filter_bank.get_sos_coefficients(BESSEL_LOWPASS_10_UUID, 9600)
+    assert filter_bank.get_sos_coefficients(BESSEL_LOWPASS_10_UUID, 9600) is first_sos
+    filter_bank.get_sos_coefficients(BESSEL_LOWPASS_10_UUID, 1600)
+    filter_bank.get_sos_coefficients(BUTTERWORTH_LOWPASS_30_UUID, 1600)
+
+    assert spied_create_filter.call_count == 3
+    assert len(filter_bank) == 3
+    np.testing.assert_array_equal(first_sos, create_filter(BESSEL_LOWPASS_10_UUID, 9600))
+
+
+@pytest.mark.parametrize(
+    "test_filter_uuid,test_sampling_period",
+    [(BESSEL_LOWPASS_10_UUID, 9600), (BUTTERWORTH_LOWPASS_30_UUID, 1600)],
+)
+@pytest.mark.parametrize("test_block_num_samples", [1000, 3333, 20000])
+def test_NoiseFilterBank__filter_in_blocks__matches_filtering_all_at_once_within_tolerance(
+    test_filter_uuid, test_sampling_period, test_block_num_samples
+):
+    test_gmr_data = _create_test_gmr_data(20000, test_sampling_period)
+    filter_bank = NoiseFilterBank()
+
+    filtered_data = filter_bank.filter_in_blocks(
+        test_gmr_data, test_filter_uuid, test_sampling_period, block_num_samples=test_block_num_samples
+    )
+
+    expected_data = apply_noise_filtering(
+        test_gmr_data, filter_bank.get_sos_coefficients(test_filter_uuid, test_sampling_period)
+    )
+    np.testing.assert_array_equal(filtered_data[0], expected_data[0])
+    np.testing.assert_allclose(filtered_data[1], expected_data[1], rtol=0, atol=1)
+
+
+def test_NoiseFilterBank__filter_in_blocks__merges_last_block_into_previous_block_if_too_short_to_filter():
+    test_gmr_data = _create_test_gmr_data(1010, 1600)
+    filter_bank = NoiseFilterBank()
+    sos = filter_bank.get_sos_coefficients(BUTTERWORTH_LOWPASS_30_UUID, 1600)
+
+    # without any overlap, a last block of 10 samples is shorter than the padding of the filter
+    filtered_data = filter_bank.filter_in_blocks(
+        test_gmr_data, BUTTERWORTH_LOWPASS_30_UUID, 1600, block_num_samples=500, overlap_num_samples=0
+    )
+
+    expected_values = np.concatenate(
+        [
+            signal.sosfiltfilt(sos, test_gmr_data[1, :500]),
+            signal.sosfiltfilt(sos, test_gmr_data[1, 500:]),
+        ]
+    )
+    np.testing.assert_array_equal(filtered_data[1], np.rint(expected_values))
+
+
+def test_NoiseFilterBank__filter_in_blocks__raises_error_if_blocks_are_too_short_to_filter():
+    test_gmr_data = _create_test_gmr_data(1000, 1600)
+    with pytest.raises(ValueError, match="must be > 15"):
+        NoiseFilterBank().filter_in_blocks(
+            test_gmr_data, BUTTERWORTH_LOWPASS_30_UUID, 1600, block_num_samples=10, overlap_num_samples=5
+        )
+
+
+@pytest.mark.parametrize("test_num_samples", [1, 16, 100, 4096, 10001])
+def test_create_min_max_pyramid__creates_levels_with_min_and_max_of_each_bucket(test_num_samples):
+    test_waveforms = np.random.rand(3, test_num_samples)
+    test_min_bucket_size = 4
+    test_max_top_level_num_buckets = 10
+
+    levels = create_min_max_pyramid(test_waveforms, test_min_bucket_size, test_max_top_level_num_buckets)
+
+    for level, level_arr in enumerate(levels):
+        bucket_size = test_min_bucket_size * 2**level
+        bucket_starts = range(0, test_num_samples, bucket_size)
+        assert level_arr.shape == (2, 3, len(bucket_starts))
+        for row_idx, waveform in enumerate(test_waveforms):
+            buckets = [waveform[start : start + bucket_size] for start in bucket_starts]
+            np.testing.assert_array_equal(level_arr[0, row_idx], [bucket.min() for bucket in buckets])
+            np.testing.assert_array_equal(level_arr[1, row_idx], [bucket.max() for bucket in buckets])
+
+    assert levels[-1].shape[-1] <= test_max_top_level_num_buckets
+    if len(levels) > 1:
+        assert levels[-2].shape[-1] > test_max_top_level_num_buckets
+
+
+@pytest.mark.parametrize("test_min_bucket_size", [0, 3, 12])
+def test_create_min_max_pyramid__raises_error_if_min_bucket_size_is_not_a_power_of_two(test_min_bucket_size):
+    with pytest.raises(ValueError, match="must be a power of two"):
+        create_min_max_pyramid(np.random.rand(1, 100), test_min_bucket_size)
+
+
+def test_create_min_max_pyramid__raises_error_if_waveforms_are_empty():
+    with pytest.raises(ValueError, match="must contain at least one sample"):
+        create_min_max_pyramid(np.empty((2, 0)))
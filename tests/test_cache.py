@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import time
+
+import numpy as np
+from pulse3D.cache import ArrayCache
+from pulse3D.cache import create_cache_key
+from pulse3D.cache import get_file_stats
+from pulse3D.cache import hash_file_contents
+from pulse3D.cache import WaveformCache
+import pytest
+
+
+def test_create_cache_key__creates_different_keys_for_different_parts():
+    assert create_cache_key("ab", "c") != create_cache_key("a", "bc")
+    assert create_cache_key(1, "x") == create_cache_key(1, "x")
+
+
+def test_hash_file_contents__creates_same_hash_for_file_path_and_file_obj_with_same_contents(tmp_path):
+    test_contents = os.urandom(3 * 1024**2)
+    test_file_path = str(tmp_path / "test.h5")
+    with open(test_file_path, "wb") as f:
+        f.write(test_contents)
+
+    test_file_obj = io.BytesIO(test_contents)
+    test_file_obj.seek(10)
+
+    assert hash_file_contents([test_file_path]) == hash_file_contents([test_file_obj])
+    # position of file obj should not be changed
+    assert test_file_obj.tell() == 10
+
+
+def test_get_file_stats__changes_when_file_is_modified_but_not_when_file_is_read(tmp_path):
+    test_file_path = str(tmp_path / "test.h5")
+    with open(test_file_path, "wb") as f:
+        f.write(b"abc")
+    os.utime(test_file_path, ns=(0, 0))
+
+    original_stats = get_file_stats([test_file_path])
+    assert original_stats == [(test_file_path, 3, 0)]
+
+    hash_file_contents([test_file_path])
+    assert get_file_stats([test_file_path]) == original_stats
+
+    with open(test_file_path, "ab") as f:
+        f.write(b"d")
+    assert get_file_stats([test_file_path]) != original_stats
+
+
+def test_ArrayCache__raises_error_if_max_entries_is_less_than_one():
+    with pytest.raises(ValueError, match="'max_entries' must be >= 1"):
+        ArrayCache(max_entries=0)
+
+
+def test_ArrayCache__removes_least_recently_used_arrays_from_memory():
+    cache = ArrayCache(max_entries=2)
+    cache.set("a", np.zeros(3))
+    cache.set("b", np.ones(3))
+    # access "a" so that "b" is the least recently used
+    cache.get("a")
+    cache.set("c", np.arange(3))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    np.testing.assert_array_equal(cache.get("a"), np.zeros(3))
+    np.testing.assert_array_equal(cache.get("c"), np.arange(3))
+
+
+def test_ArrayCache__loads_arrays_stored_on_disk_by_another_cache(tmp_path):
+    test_arr = np.random.rand(24)
+
+    ArrayCache(cache_dir=str(tmp_path)).set("key", test_arr)
+
+    new_cache = ArrayCache(cache_dir=str(tmp_path))
+    assert "key" in new_cache
+    np.testing.assert_array_equal(new_cache.get("key"), test_arr)
+    assert new_cache.get("other_key") is None
+    # no temp files should be left behind
+    assert os.listdir(tmp_path) == ["key.npy"]
+
+
+def test_WaveformCache__loads_copy_on_write_memory_mapped_arrays(tmp_path):
+    test_arrays = {"force": np.random.rand(2, 100), "stim": np.arange(10)}
+
+    WaveformCache(str(tmp_path)).set("key", test_arrays)
+
+    new_cache = WaveformCache(str(tmp_path))
+    assert "key" in new_cache
+    assert new_cache.get("other_key") is None
+
+    cached_arrays = new_cache.get("key")
+    assert cached_arrays.keys() == test_arrays.keys()
+    for name, arr in cached_arrays.items():
+        assert isinstance(arr, np.memmap)
+        np.testing.assert_array_equal(arr, test_arrays[name])
+
+    # modifying a loaded array should not modify the cached entry
+    cached_arrays["stim"] += 1
+    np.testing.assert_array_equal(new_cache.get("key")["stim"], test_arrays["stim"])
+
+
+def test_WaveformCache__removes_least_recently_used_entries_when_max_size_exceeded(tmp_path):
+    test_arr = np.zeros(1000)
+    # each entry will be slightly larger than the array itself due to the .npy header
+    cache = WaveformCache(str(tmp_path), max_size=int(test_arr.nbytes * 2.5))
+
+    cache.set("a", {"arr": test_arr})
+    time.sleep(0.01)
+    cache.set("b", {"arr": test_arr})
+    time.sleep(0.01)
+    # access "a" so that "b" is the least recently used
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", {"arr": test_arr})
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_WaveformCache__aliases_point_to_keys_until_their_entries_are_removed(tmp_path):
+    test_arr = np.zeros(1000)
+    cache = WaveformCache(str(tmp_path), max_size=int(test_arr.nbytes * 1.5))
+    assert cache.get_alias("alias_a") is None
+
+    cache.set("a", {"arr": test_arr})
+    cache.set_alias("alias_a", "a")
+    assert WaveformCache(str(tmp_path)).get_alias("alias_a") == "a"
+
+    time.sleep(0.01)
+    # "a" is removed to make room for "b", so its alias should be removed too
+    cache.set("b", {"arr": test_arr})
+    cache.set_alias("alias_b", "b")
+
+    assert cache.get_alias("alias_a") is None
+    assert cache.get_alias("alias_b") == "b"
+    # no temp files should be left behind
+    assert sorted(os.listdir(tmp_path)) == ["alias_b.alias", "b"]
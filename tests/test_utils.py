@@ -3,22 +3,28 @@ from random import choice
 from random import randint
 from string import ascii_uppercase
 
+import numpy as np
 from pulse3D.constants import CARDIAC_STIFFNESS_FACTOR
 from pulse3D.constants import CARDIAC_STIFFNESS_LABEL
+from pulse3D.constants import INTERPOLATED_DATA_PERIOD_US
 from pulse3D.constants import MAX_CARDIAC_EXPERIMENT_ID
 from pulse3D.constants import MAX_EXPERIMENT_ID
 from pulse3D.constants import MAX_MINI_CARDIAC_EXPERIMENT_ID
 from pulse3D.constants import MAX_MINI_SKM_EXPERIMENT_ID
 from pulse3D.constants import MAX_SKM_EXPERIMENT_ID
 from pulse3D.constants import MAX_VARIABLE_EXPERIMENT_ID
+from pulse3D.constants import MICRO_TO_BASE_CONVERSION
 from pulse3D.constants import MIN_EXPERIMENT_ID
 from pulse3D.constants import ROW_LABEL_TO_VARIABLE_STIFFNESS_FACTOR
 from pulse3D.constants import SKM_STIFFNESS_FACTOR
 from pulse3D.constants import SKM_STIFFNESS_LABEL
 from pulse3D.constants import VARIABLE_STIFFNESS_LABEL
+from pulse3D.transforms import get_time_window_indices
 from pulse3D.utils import get_experiment_id
 from pulse3D.utils import get_stiffness_factor
 from pulse3D.utils import get_stiffness_label
+from pulse3D.utils import TimeAxis
+from pulse3D.utils import truncate
 import pytest
 
 
@@ -113,3 +119,85 @@ def test_get_stiffness_factor__raises_value_error_if_invalid_experiment_id_given
         ValueError, match=f"Experiment ID must be in the range 000-999, not {test_experiment_id}"
     ):
         get_stiffness_factor(test_experiment_id, random_well_name())
+
+
+@pytest.mark.parametrize(
+    "test_start,test_stop,test_period",
+    [(0, 1234567.0, 10000), (250.5, 99999, 37.3), (0.1, 1, 0.01), (5, 5, 1)],
+)
+def test_TimeAxis_from_range__has_same_values_as_arange(test_start, test_stop, test_period):
+    expected_values = np.arange(test_start, test_stop, test_period)
+    time_axis = TimeAxis.from_range(test_start, test_stop, test_period)
+
+    assert len(time_axis) == len(expected_values)
+    np.testing.assert_array_equal(time_axis.values, expected_values)
+    np.testing.assert_array_equal(np.asarray(time_axis), expected_values)
+    np.testing.assert_array_equal(time_axis[3:-2], expected_values[3:-2])
+    if len(expected_values):
+        assert time_axis[-1] == expected_values[-1]
+
+
+@pytest.mark.parametrize(
+    "test_lower_bound,test_upper_bound",
+    [(0, 10), (0.3, 7.77), (4.5, 4.5), (-1, 100), (3.005, 3.009)],
+)
+def test_TimeAxis__window_lookups_match_searching_materialized_values(test_lower_bound, test_upper_bound):
+    time_axis = TimeAxis.from_range(0, 10 * 10**6, 10000)
+    time_values = np.arange(0, 10 * 10**6, 10000)
+    time_values_secs = time_values / 10**6
+
+    assert time_axis.get_window_bounds(
+        test_lower_bound * 10**6, test_upper_bound * 10**6
+    ) == truncate(time_values, test_lower_bound * 10**6, test_upper_bound * 10**6)
+    assert time_axis.get_window_bounds(test_lower_bound, test_upper_bound, unit="s") == (
+        np.searchsorted(time_values_secs, test_lower_bound, side="left"),
+        np.searchsorted(time_values_secs, test_upper_bound, side="right") - 1,
+    )
+    np.testing.assert_array_equal(
+        get_time_window_indices(time_axis, test_lower_bound * 10**6, test_upper_bound * 10**6),
+        get_time_window_indices(time_values, test_lower_bound * 10**6, test_upper_bound * 10**6),
+    )
+
+
+@pytest.mark.parametrize("test_period", [INTERPOLATED_DATA_PERIOD_US, 10**6 / 30, 1600])
+def test_TimeAxis_get_window_bounds__matches_searching_time_values_converted_to_seconds(test_period):
+    # the xlsx analysis window used to be found by dividing the time values into seconds and searching them,
+    # so the window must not move when the rounding of the division and of converting the bounds differs
+    time_axis = TimeAxis.from_range(0, 300 * 10**6, test_period)
+    time_values_secs = np.arange(0, 300 * 10**6, test_period) / MICRO_TO_BASE_CONVERSION
+
+    for test_lower_bound in np.round(np.arange(0, 290, 0.01), 2):
+        test_upper_bound = round(test_lower_bound + 7.31, 2)
+        assert time_axis.get_window_bounds(test_lower_bound, test_upper_bound, unit="s") == (
+            np.searchsorted(time_values_secs, test_lower_bound, side="left"),
+            np.searchsorted(time_values_secs, test_upper_bound, side="right") - 1,
+        ), test_lower_bound
+
+
+def test_TimeAxis_from_array__only_returns_time_axis_for_uniformly_sampled_values():
+    time_axis = TimeAxis.from_array(np.arange(100, 5000, 10.0))
+    assert (time_axis.start, time_axis.period, len(time_axis)) == (100, 10, 490)
+
+    assert TimeAxis.from_array(np.array([0, 1, 2, 4])) is None
+    assert TimeAxis.from_array(np.array([0])) is None
+
+
+@pytest.mark.parametrize("test_lower_bound,test_upper_bound", [(20, 30), (-5, -1)])
+def test_TimeAxis__window_lookups_outside_of_time_axis_are_empty(test_lower_bound, test_upper_bound):
+    time_axis = TimeAxis.from_range(0, 10, 0.01, unit="s")
+
+    first_idx, last_idx = time_axis.get_window_bounds(test_lower_bound, test_upper_bound)
+    assert last_idx < first_idx
+    assert len(time_axis.get_window_indices(test_lower_bound, test_upper_bound)) == 0
+
+
+def test_TimeAxis_to_unit__converts_start_and_period():
+    time_axis = TimeAxis(2 * 10**6, 10000, 100).to_unit("s")
+    assert (time_axis.start, time_axis.period, len(time_axis), time_axis.unit) == (2, 0.01, 100, "s")
+    assert time_axis.to_unit("us").period == 10000
+
+
+@pytest.mark.parametrize("test_kwargs", [{"period": 0}, {"length": -1}, {"unit": "ms"}])
+def test_TimeAxis__raises_error_if_params_are_invalid(test_kwargs):
+    with pytest.raises(ValueError):
+        TimeAxis(**{"start": 0, "period": 1, "length": 10, **test_kwargs})
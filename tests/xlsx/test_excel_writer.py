@@ -425,3 +425,30 @@ def test_write_xlsx__stim_chart_axis_bounds_set_correctly(
     for call in mocked_create_waveform_charts.call_args_list:
         assert call[0][0]["stim"] == expected_stim_chart_bounds
         assert call[0][-4]["chart_format"] == test_stim_waveform_format
+
+
+def test_write_xlsx__analyzes_wells_in_worker_processes_with_same_results_as_serial_analysis(
+    patch_get_positions, mocker
+):
+    mocked_write_xlsx_helper = mocker.patch.object(excel_writer, "_write_xlsx", autospec=True)
+
+    pr = PlateRecording(TEST_FILE_PATH)
+    write_xlsx(pr)
+    write_xlsx(pr, analysis_workers=4)
+
+    serial_call, parallel_call = mocked_write_xlsx_helper.call_args_list
+    serial_plotting_info = serial_call[1]["recording_plotting_info"]
+    parallel_plotting_info = parallel_call[1]["recording_plotting_info"]
+
+    assert [info["well_index"] for info in parallel_plotting_info] == list(range(24))
+    assert len(parallel_plotting_info) == len(serial_plotting_info)
+    for parallel_info, serial_info in zip(parallel_plotting_info, serial_plotting_info):
+        assert parallel_info["well_name"] == serial_info["well_name"]
+        assert parallel_info.get("error_msg") == serial_info.get("error_msg")
+        np.testing.assert_array_equal(parallel_info["tissue_data"], serial_info["tissue_data"])
+        for parallel_indices, serial_indices in zip(
+            parallel_info["peaks_and_valleys"], serial_info["peaks_and_valleys"]
+        ):
+            np.testing.assert_array_equal(parallel_indices, serial_indices)
+        for parallel_df, serial_df in zip(parallel_info["metrics"], serial_info["metrics"]):
+            pd.testing.assert_frame_equal(parallel_df, serial_df)